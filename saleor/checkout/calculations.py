@@ -1,4 +1,6 @@
-from typing import TYPE_CHECKING, Iterable, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from django.utils.functional import cached_property
 
 from ..core.prices import quantize_price
 from ..core.taxes import zero_taxed_money
@@ -7,6 +9,7 @@ from ..plugins.manager import get_plugins_manager
 
 if TYPE_CHECKING:
     from prices import TaxedMoney
+    from ..plugins.manager import PluginsManager
     from .models import Checkout, CheckoutLine
 
 
@@ -83,3 +86,58 @@ def checkout_line_total(
         line, discounts or []
     )
     return quantize_price(calculated_line_total, line.checkout.currency)
+
+
+class CheckoutPricingContext:
+    """Checkout prices calculated by plugins at most once.
+
+    Meant to be used by a single operation, like the checkout completion,
+    which needs the same prices in many places. The checkout and its lines
+    must not be changed while the context is in use.
+    """
+
+    def __init__(
+        self,
+        *,
+        checkout: "Checkout",
+        lines: Iterable["CheckoutLine"],
+        discounts: Optional[Iterable[DiscountInfo]] = None,
+        manager: Optional["PluginsManager"] = None,
+    ):
+        self.checkout = checkout
+        self.lines = list(lines)
+        self.discounts = discounts or []
+        self.manager = manager or get_plugins_manager()
+        self._line_totals: Dict[int, "TaxedMoney"] = {}
+
+    def line_total(self, line: "CheckoutLine") -> "TaxedMoney":
+        if line.pk not in self._line_totals:
+            self._line_totals[line.pk] = self.manager.calculate_checkout_line_total(
+                line, self.discounts
+            )
+        return self._line_totals[line.pk]
+
+    @cached_property
+    def subtotal(self) -> "TaxedMoney":
+        return self.manager.calculate_checkout_subtotal(
+            self.checkout,
+            self.lines,
+            self.discounts,
+            line_totals=[self.line_total(line) for line in self.lines],
+        )
+
+    @cached_property
+    def shipping_price(self) -> "TaxedMoney":
+        return self.manager.calculate_checkout_shipping(
+            self.checkout, self.lines, self.discounts
+        )
+
+    @cached_property
+    def total(self) -> "TaxedMoney":
+        return self.manager.calculate_checkout_total(
+            self.checkout,
+            self.lines,
+            self.discounts,
+            subtotal=self.subtotal,
+            shipping_price=self.shipping_price,
+        )
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from ..discount import DiscountInfo
 from ..payment import gateway, models as payment_models
 from ..payment.error_codes import PaymentErrorCode
+from .calculations import CheckoutPricingContext
 from .error_codes import CheckoutErrorCode
 from .models import Checkout, CheckoutLine
 from .utils import is_fully_paid, is_valid_shipping_method
@@ -15,6 +16,7 @@ def clean_checkout_shipping(
     lines: Iterable[CheckoutLine],
     discounts: Iterable[DiscountInfo],
     error_code: Union[Type[CheckoutErrorCode], Type[PaymentErrorCode]],
+    pricing: Optional[CheckoutPricingContext] = None,
 ):
     if checkout.is_shipping_required():
         if not checkout.shipping_method:
@@ -35,7 +37,7 @@ def clean_checkout_shipping(
                     )
                 }
             )
-        if not is_valid_shipping_method(checkout, lines, discounts):
+        if not is_valid_shipping_method(checkout, lines, discounts, pricing):
             raise ValidationError(
                 {
                     "shipping_method": ValidationError(
@@ -67,9 +69,10 @@ def clean_checkout_payment(
     discounts: Iterable[DiscountInfo],
     error_code: Type[CheckoutErrorCode],
     last_payment: Optional[payment_models.Payment],
+    pricing: Optional[CheckoutPricingContext] = None,
 ):
     clean_billing_address(checkout, error_code)
-    if not is_fully_paid(checkout, lines, discounts):
+    if not is_fully_paid(checkout, lines, discounts, pricing):
         gateway.payment_refund_or_void(last_payment)
         raise ValidationError(
             "Provided payment methods can not cover the checkout's total amount",
@@ -1,6 +1,6 @@
 from datetime import date
 from decimal import Decimal
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
@@ -17,7 +17,6 @@ from ..core.exceptions import InsufficientStock
 from ..core.prices import quantize_price
 from ..core.taxes import TaxError, zero_taxed_money
 from ..core.utils.url import validate_storefront_url
-from ..discount import DiscountInfo
 from ..discount.models import NotApplicable
 from ..discount.utils import (
     add_voucher_usage_by_customer,
@@ -31,9 +30,8 @@ from ..order.models import Order, OrderLine
 from ..payment import PaymentError, gateway
 from ..payment.models import Payment, Transaction
 from ..payment.utils import store_customer_id
-from ..plugins.manager import get_plugins_manager
 from ..warehouse.availability import check_stock_quantity
-from ..warehouse.management import allocate_stock
+from ..warehouse.management import allocate_stocks
 from . import AddressType, models
 from .checkout_cleaner import clean_checkout_payment, clean_checkout_shipping
 from .models import Checkout, CheckoutLine
@@ -123,7 +121,9 @@ def _validate_gift_cards(checkout: Checkout):
         raise NotApplicable(msg)
 
 
-def _create_line_for_order(checkout_line: "CheckoutLine", discounts) -> OrderLine:
+def _create_line_for_order(
+    checkout_line: "CheckoutLine", pricing: calculations.CheckoutPricingContext
+) -> OrderLine:
     """Create a line for the given order.
 
     :raises InsufficientStock: when there is not enough items in stock for this variant.
@@ -147,8 +147,7 @@ def _create_line_for_order(checkout_line: "CheckoutLine", discounts) -> OrderLin
     if translated_variant_name == variant_name:
         translated_variant_name = ""
 
-    manager = get_plugins_manager()
-    total_line_price = manager.calculate_checkout_line_total(checkout_line, discounts)
+    total_line_price = pricing.line_total(checkout_line)
     unit_price = quantize_price(
         total_line_price / checkout_line.quantity, total_line_price.currency
     )
@@ -174,25 +173,31 @@ def _create_line_for_order(checkout_line: "CheckoutLine", discounts) -> OrderLin
 
 
 def _prepare_order_data(
-    *, checkout: Checkout, lines: Iterable[CheckoutLine], discounts
+    *,
+    checkout: Checkout,
+    lines: Iterable[CheckoutLine],
+    discounts,
+    pricing: Optional[calculations.CheckoutPricingContext] = None,
 ) -> dict:
     """Run checks and return all the data from a given checkout to create an order.
 
+    Prices already calculated in `pricing` context are reused.
+
     :raises NotApplicable InsufficientStock:
     """
     order_data = {}
+    if pricing is None:
+        pricing = calculations.CheckoutPricingContext(
+            checkout=checkout, lines=lines, discounts=discounts
+        )
 
-    manager = get_plugins_manager()
-    taxed_total = calculations.checkout_total(
-        checkout=checkout, lines=lines, discounts=discounts
-    )
+    taxed_total = quantize_price(pricing.total, checkout.currency)
     cards_total = checkout.get_total_gift_cards_balance()
-    taxed_total.gross -= cards_total
-    taxed_total.net -= cards_total
+    taxed_total -= cards_total
 
     taxed_total = max(taxed_total, zero_taxed_money(checkout.currency))
 
-    shipping_total = manager.calculate_checkout_shipping(checkout, lines, discounts)
+    shipping_total = pricing.shipping_price
     order_data.update(_process_shipping_data_for_order(checkout, shipping_total))
     order_data.update(_process_user_data_for_order(checkout))
     order_data.update(
@@ -204,8 +209,8 @@ def _prepare_order_data(
     )
 
     order_data["lines"] = [
-        _create_line_for_order(checkout_line=line, discounts=discounts)
-        for line in lines
+        _create_line_for_order(checkout_line=line, pricing=pricing)
+        for line in pricing.lines
     ]
 
     # validate checkout gift cards
@@ -217,12 +222,10 @@ def _prepare_order_data(
     # assign gift cards to the order
 
     order_data["total_price_left"] = (
-        manager.calculate_checkout_subtotal(checkout, lines, discounts)
-        + shipping_total
-        - checkout.discount
+        pricing.subtotal + shipping_total - checkout.discount
     ).gross
 
-    manager.preprocess_order_creation(checkout, discounts)
+    pricing.manager.preprocess_order_creation(checkout, pricing.discounts)
     return order_data
 
 
@@ -254,10 +257,10 @@ def _create_order(*, checkout: Checkout, order_data: dict, user: User) -> Order:
     order_lines = OrderLine.objects.bulk_create(order_lines)
 
     # allocate stocks from the lines
-    for line in order_lines:  # type: OrderLine
-        variant = line.variant
-        if variant and variant.track_inventory:
-            allocate_stock(line, checkout.get_country(), line.quantity)
+    lines_to_allocate = [
+        line for line in order_lines if line.variant and line.variant.track_inventory
+    ]
+    allocate_stocks(lines_to_allocate, checkout.get_country())
 
     # Add gift cards to the order
     for gift_card in checkout.gift_cards.select_for_update():
@@ -285,14 +288,23 @@ def _create_order(*, checkout: Checkout, order_data: dict, user: User) -> Order:
 
 
 def _prepare_checkout(
-    checkout: models.Checkout, discounts, tracking_code, redirect_url, payment
+    pricing: calculations.CheckoutPricingContext, tracking_code, redirect_url, payment
 ):
     """Prepare checkout object to complete the checkout process."""
-    lines = list(checkout)
+    checkout = pricing.checkout
+    lines = pricing.lines
+    discounts = pricing.discounts
 
-    clean_checkout_shipping(checkout, lines, discounts, CheckoutErrorCode)
+    clean_checkout_shipping(
+        checkout, lines, discounts, CheckoutErrorCode, pricing=pricing
+    )
     clean_checkout_payment(
-        checkout, lines, discounts, CheckoutErrorCode, last_payment=payment
+        checkout,
+        lines,
+        discounts,
+        CheckoutErrorCode,
+        last_payment=payment,
+        pricing=pricing,
     )
 
     if redirect_url:
@@ -325,11 +337,14 @@ def release_voucher_usage(order_data: dict):
             remove_voucher_usage_by_customer(voucher, order_data["user_email"])
 
 
-def _get_order_data(checkout: models.Checkout, discounts: List[DiscountInfo]) -> dict:
+def _get_order_data(pricing: calculations.CheckoutPricingContext) -> dict:
     """Prepare data that will be converted to order and its lines."""
     try:
         order_data = _prepare_order_data(
-            checkout=checkout, lines=list(checkout), discounts=discounts,
+            checkout=pricing.checkout,
+            lines=pricing.lines,
+            discounts=pricing.discounts,
+            pricing=pricing,
         )
     except InsufficientStock as e:
         raise ValidationError(f"Insufficient product stock: {e.item}", code=e.code)
@@ -388,16 +403,19 @@ def complete_checkout(
     :raises ValidationError
     """
     payment = checkout.get_last_active_payment()
+    # Prices are calculated by plugins once and reused by all the steps below
+    pricing = calculations.CheckoutPricingContext(
+        checkout=checkout, lines=list(checkout), discounts=discounts
+    )
     _prepare_checkout(
-        checkout=checkout,
-        discounts=discounts,
+        pricing=pricing,
         tracking_code=tracking_code,
         redirect_url=redirect_url,
         payment=payment,
     )
 
     try:
-        order_data = _get_order_data(checkout, discounts)
+        order_data = _get_order_data(pricing)
     except ValidationError as error:
         gateway.payment_refund_or_void(payment)
         raise error
@@ -850,6 +850,26 @@ def test_is_fully_paid_partially_paid(checkout_with_item, payment_dummy):
     assert not is_paid
 
 
+def test_is_fully_paid_with_unquantized_total_from_plugins(
+    checkout_with_item, payment_dummy
+):
+    checkout = checkout_with_item
+    total = Money("10.004", checkout.currency)
+    manager = Mock(calculate_checkout_total=Mock(return_value=TaxedMoney(total, total)))
+    pricing = calculations.CheckoutPricingContext(
+        checkout=checkout, lines=list(checkout), manager=manager
+    )
+    payment = payment_dummy
+    payment.is_active = True
+    payment.order = None
+    payment.total = "10.00"
+    payment.currency = checkout.currency
+    payment.checkout = checkout
+    payment.save()
+    is_paid = is_fully_paid(checkout, list(checkout), None, pricing=pricing)
+    assert is_paid
+
+
 def test_is_fully_paid_no_payment(checkout_with_item):
     checkout = checkout_with_item
     is_paid = is_fully_paid(checkout, list(checkout), None)
@@ -429,23 +429,31 @@ def get_valid_shipping_methods_for_checkout(
     lines: Iterable[CheckoutLine],
     discounts: Iterable[DiscountInfo],
     country_code: Optional[str] = None,
+    pricing: Optional[calculations.CheckoutPricingContext] = None,
 ):
-    manager = get_plugins_manager()
+    if pricing:
+        subtotal = pricing.subtotal
+    else:
+        manager = get_plugins_manager()
+        subtotal = manager.calculate_checkout_subtotal(checkout, lines, discounts)
     return ShippingMethod.objects.applicable_shipping_methods_for_instance(
-        checkout,
-        price=manager.calculate_checkout_subtotal(checkout, lines, discounts).gross,
-        country_code=country_code,
+        checkout, price=subtotal.gross, country_code=country_code
     )
 
 
 def is_valid_shipping_method(
-    checkout: Checkout, lines: Iterable[CheckoutLine], discounts: Iterable[DiscountInfo]
+    checkout: Checkout,
+    lines: Iterable[CheckoutLine],
+    discounts: Iterable[DiscountInfo],
+    pricing: Optional[calculations.CheckoutPricingContext] = None,
 ):
     """Check if shipping method is valid and remove (if not)."""
     if not checkout.shipping_method:
         return False
 
-    valid_methods = get_valid_shipping_methods_for_checkout(checkout, lines, discounts)
+    valid_methods = get_valid_shipping_methods_for_checkout(
+        checkout, lines, discounts, pricing=pricing
+    )
     if valid_methods is None or checkout.shipping_method not in valid_methods:
         clear_shipping_method(checkout)
         return False
@@ -489,7 +497,10 @@ def clear_shipping_method(checkout: Checkout):
 
 
 def is_fully_paid(
-    checkout: Checkout, lines: Iterable[CheckoutLine], discounts: Iterable[DiscountInfo]
+    checkout: Checkout,
+    lines: Iterable[CheckoutLine],
+    discounts: Iterable[DiscountInfo],
+    pricing: Optional[calculations.CheckoutPricingContext] = None,
 ):
     """Check if provided payment methods cover the checkout's total amount.
 
@@ -497,10 +508,13 @@ def is_fully_paid(
     """
     payments = [payment for payment in checkout.payments.all() if payment.is_active]
     total_paid = sum([p.total for p in payments])
-    checkout_total = (
-        calculations.checkout_total(checkout=checkout, lines=lines, discounts=discounts)
-        - checkout.get_total_gift_cards_balance()
-    )
+    if pricing:
+        checkout_total = quantize_price(pricing.total, checkout.currency)
+    else:
+        checkout_total = calculations.checkout_total(
+            checkout=checkout, lines=lines, discounts=discounts
+        )
+    checkout_total -= checkout.get_total_gift_cards_balance()
     checkout_total = max(
         checkout_total, zero_taxed_money(checkout_total.currency)
     ).gross
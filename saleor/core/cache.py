@@ -0,0 +1,52 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Backends which keep data in the memory of a single process
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+def is_cache_shared() -> bool:
+    """Return whether the default cache is shared by all processes.
+
+    Data cached across requests is invalidated by bumping its version in the
+    cache, so it can only be cached when every web process and worker sees the
+    same cache. Otherwise changes made in one process would stay invisible to
+    the others until the cached data expires.
+    """
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def get_cache_version(key: str) -> str:
+    """Return the current version of data invalidated by `bump_cache_version`.
+
+    Versions are kept in the Django cache, so every worker sharing the cache
+    sees a change made by any of them.
+    """
+    version = cache.get(key)
+    if version is None:
+        # Use add so concurrent workers agree on a single version
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    # Without a shared cache every call gets a new version and misses
+    return version or uuid.uuid4().hex
+
+
+def bump_cache_version(key: str):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def invalidate_now_and_on_commit(invalidate):
+    """Call `invalidate` right away and once more when the transaction commits.
+
+    Until the commit other workers still read the old rows, so data they cache
+    in the meantime would outlive the first invalidation. Running it again on
+    commit drops that data as soon as the change becomes visible to them.
+    """
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from ....warehouse.models import Allocation, Stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the denormalized allocated quantity of all stocks "
+        "from their allocations and fix the stocks that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report stocks with invalid allocated quantity.",
+        )
+
+    def handle(self, **options):
+        allocated = (
+            Allocation.objects.filter(stock=OuterRef("pk"))
+            .values("stock")
+            .annotate(total=Sum("quantity_allocated"))
+            .values("total")
+        )
+        with transaction.atomic():
+            stocks = (
+                Stock.objects.select_for_update(of=("self",))
+                .annotate(expected=Coalesce(Subquery(allocated), 0))
+                .exclude(quantity_allocated=F("expected"))
+                .order_by("pk")
+            )
+            drifted = list(stocks.values_list("pk", "quantity_allocated", "expected"))
+            for pk, quantity_allocated, expected in drifted:
+                self.stdout.write(
+                    f"Stock {pk}: allocated quantity {quantity_allocated}, "
+                    f"expected {expected}."
+                )
+            if drifted and not options["dry_run"]:
+                Stock.objects.filter(pk__in=[pk for pk, *_ in drifted]).update(
+                    quantity_allocated=Coalesce(Subquery(allocated), 0)
+                )
+        action = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(f"{action} {len(drifted)} stocks with invalid allocations.")
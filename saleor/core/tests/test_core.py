@@ -325,3 +325,29 @@ def test_cleardb_preserves_data(admin_user, app, site_settings, staff_user):
     app.refresh_from_db()
     site_settings.refresh_from_db()
     staff_user.refresh_from_db()
+
+
+def test_reconcile_stock_allocations(allocation):
+    stock = allocation.stock
+    stock.quantity_allocated = 0
+    stock.save(update_fields=["quantity_allocated"])
+    out = io.StringIO()
+
+    call_command("reconcile_stock_allocations", stdout=out)
+
+    stock.refresh_from_db()
+    assert stock.quantity_allocated == allocation.quantity_allocated
+    assert "Fixed 1 stocks" in out.getvalue()
+
+
+def test_reconcile_stock_allocations_dry_run(allocation):
+    stock = allocation.stock
+    stock.quantity_allocated = 0
+    stock.save(update_fields=["quantity_allocated"])
+    out = io.StringIO()
+
+    call_command("reconcile_stock_allocations", "--dry-run", stdout=out)
+
+    stock.refresh_from_db()
+    assert stock.quantity_allocated == 0
+    assert "Found 1 stocks" in out.getvalue()
@@ -0,0 +1,23 @@
+# Generated by Django 3.1 on 2020-08-24 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("csv", "0003_auto_20200810_1415"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportfile",
+            name="processed_shards",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exportfile",
+            name="total_shards",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.utils import timezone
 
 from ..account.models import User
 from ..app.models import App
+from ..core import JobStatus
 from ..core.models import Job
 from ..core.utils.json_serializer import CustomJsonEncoder
 from . import ExportEvents
@@ -17,6 +18,37 @@ class ExportFile(Job):
         App, related_name="export_files", on_delete=models.CASCADE, null=True
     )
     content_file = models.FileField(upload_to="export_files", null=True)
+    total_shards = models.PositiveIntegerField(default=0)
+    processed_shards = models.PositiveIntegerField(default=0)
+
+    @property
+    def progress(self) -> float:
+        if self.status == JobStatus.SUCCESS:
+            return 1.0
+        if not self.total_shards:
+            return 0.0
+        return self.processed_shards / self.total_shards
+
+
+class ImportFile(Job):
+    user = models.ForeignKey(
+        User, related_name="import_files", on_delete=models.CASCADE, null=True
+    )
+    app = models.ForeignKey(
+        App, related_name="import_files", on_delete=models.CASCADE, null=True
+    )
+    content_file = models.FileField(upload_to="import_files")
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    errors = JSONField(blank=True, default=list, encoder=CustomJsonEncoder)
+
+    @property
+    def progress(self) -> float:
+        if self.status == JobStatus.SUCCESS:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return self.processed_rows / self.total_rows
 
 
 class ExportEvent(models.Model):
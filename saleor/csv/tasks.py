@@ -1,20 +1,36 @@
 from typing import Dict, Union
 
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
 from ..celeryconf import app
 from ..core import JobStatus
 from . import events
 from .emails import send_export_failed_info
-from .models import ExportFile
-from .utils.export import export_products
+from .models import ExportFile, ImportFile
+from .utils.export import (
+    delete_export_parts,
+    export_products_shard,
+    get_export_shards,
+    get_product_queryset,
+    merge_products_export_parts,
+)
+from .utils.import_products import import_products
 
 
 def on_task_failure(self, exc, task_id, args, kwargs, einfo):
     export_file_id = args[0]
     export_file = ExportFile.objects.get(pk=export_file_id)
+    if export_file.status == JobStatus.FAILED:
+        # other shard of the same export has already failed
+        return
 
     export_file.content_file = None
     export_file.status = JobStatus.FAILED
     export_file.save(update_fields=["status", "updated_at", "content_file"])
+    delete_export_parts(export_file)
 
     events.export_failed_event(
         export_file=export_file,
@@ -40,13 +56,110 @@ def on_task_success(self, retval, task_id, args, kwargs):
     )
 
 
-@app.task(on_success=on_task_success, on_failure=on_task_failure)
+@app.task(on_failure=on_task_failure)
 def export_products_task(
     export_file_id: int,
     scope: Dict[str, Union[str, dict]],
     export_info: Dict[str, list],
     file_type: str,
     delimiter: str = ";",
+):
+    """Split the export into shards and schedule a task for every shard.
+
+    The last processed shard schedules merging of the part files.
+    """
+    shards = get_export_shards(get_product_queryset(scope))
+
+    ExportFile.objects.filter(pk=export_file_id).update(
+        total_shards=len(shards), processed_shards=0
+    )
+
+    if not shards:
+        merge_products_export_parts_task.delay(
+            export_file_id, export_info, file_type, delimiter
+        )
+        return
+
+    for shard_index, (start_pk, end_pk) in enumerate(shards):
+        export_products_shard_task.delay(
+            export_file_id,
+            scope,
+            export_info,
+            file_type,
+            delimiter,
+            shard_index,
+            start_pk,
+            end_pk,
+        )
+
+
+@app.task(on_failure=on_task_failure)
+def export_products_shard_task(
+    export_file_id: int,
+    scope: Dict[str, Union[str, dict]],
+    export_info: Dict[str, list],
+    file_type: str,
+    delimiter: str,
+    shard_index: int,
+    start_pk: int,
+    end_pk: int,
 ):
     export_file = ExportFile.objects.get(pk=export_file_id)
-    export_products(export_file, scope, export_info, file_type, delimiter)
+    if export_file.status == JobStatus.FAILED:
+        return
+
+    export_products_shard(
+        export_file,
+        scope,
+        export_info,
+        file_type,
+        delimiter,
+        shard_index,
+        (start_pk, end_pk),
+    )
+
+    with transaction.atomic():
+        ExportFile.objects.filter(pk=export_file_id).update(
+            processed_shards=F("processed_shards") + 1, updated_at=timezone.now()
+        )
+        export_file = ExportFile.objects.get(pk=export_file_id)
+
+    if export_file.processed_shards == export_file.total_shards:
+        merge_products_export_parts_task.delay(
+            export_file_id, export_info, file_type, delimiter
+        )
+
+
+@app.task(on_success=on_task_success, on_failure=on_task_failure)
+def merge_products_export_parts_task(
+    export_file_id: int,
+    export_info: Dict[str, list],
+    file_type: str,
+    delimiter: str = ";",
+):
+    export_file = ExportFile.objects.get(pk=export_file_id)
+    merge_products_export_parts(export_file, export_info, file_type, delimiter)
+
+
+def on_import_task_failure(self, exc, task_id, args, kwargs, einfo):
+    import_file_id = args[0]
+    import_file = ImportFile.objects.get(pk=import_file_id)
+
+    message = "; ".join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+    import_file.status = JobStatus.FAILED
+    import_file.message = message[:255]
+    import_file.save(update_fields=["status", "message", "updated_at"])
+
+
+def on_import_task_success(self, retval, task_id, args, kwargs):
+    import_file_id = args[0]
+
+    import_file = ImportFile.objects.get(pk=import_file_id)
+    import_file.status = JobStatus.SUCCESS
+    import_file.save(update_fields=["status", "updated_at"])
+
+
+@app.task(on_success=on_import_task_success, on_failure=on_import_task_failure)
+def import_products_task(import_file_id: int, delimiter: str = ";"):
+    import_file = ImportFile.objects.get(pk=import_file_id)
+    import_products(import_file, delimiter)
@@ -0,0 +1,125 @@
+import tracemalloc
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
+
+from .....product.models import Product, ProductVariant
+from ....utils.export import CSVWriter, queryset_in_batches
+from ....utils.products_data import (
+    ProductExportFields,
+    get_export_fields_and_headers_info,
+    get_products_relations_data,
+    get_products_rows,
+    get_products_values_queryset,
+    get_variants_relations_data,
+)
+
+PRODUCTS_COUNT = 500
+VARIANTS_PER_PRODUCT = 4
+BATCH_SIZE = 1000
+
+NARROW_EXPORT_INFO = {
+    "fields": ["variant sku", "variant price"],
+    "warehouses": [],
+    "attributes": [],
+}
+
+
+def _generate_catalog(product_type, category):
+    products = Product.objects.bulk_create(
+        [
+            Product(
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                description="Description " * 20,
+                product_type=product_type,
+                category=category,
+            )
+            for i in range(PRODUCTS_COUNT)
+        ]
+    )
+    ProductVariant.objects.bulk_create(
+        [
+            ProductVariant(
+                product=product,
+                sku=f"{product.pk}-{i}",
+                price_amount=Decimal(10),
+                cost_price_amount=Decimal(5),
+            )
+            for product in products
+            for i in range(VARIANTS_PER_PRODUCT)
+        ]
+    )
+
+
+def _get_products_data(queryset, export_fields):
+    """Return exported values of variants as dicts, with all relations data."""
+    product_fields = set(
+        ProductExportFields.HEADERS_TO_FIELDS_MAPPING["fields"].values()
+    )
+    product_export_fields = export_fields & product_fields
+    product_export_fields.add("variants__id")
+    products_data = get_products_values_queryset(
+        queryset, product_export_fields
+    ).values(*product_export_fields)
+    products_relations_data = get_products_relations_data(queryset, export_fields, [])
+    variants_relations_data = get_variants_relations_data(
+        queryset, export_fields, [], []
+    )
+    for product_data in products_data:
+        variant_pk = product_data.pop("variants__id")
+        yield {
+            **product_data,
+            **products_relations_data.get(product_data["id"], {}),
+            **variants_relations_data.get(variant_pk, {}),
+        }
+
+
+def _export_products_data(queryset, export_fields, headers, writer):
+    """Export rows the way it was done before projecting columns."""
+    for batch_pks in queryset_in_batches(queryset, BATCH_SIZE):
+        product_batch = Product.objects.filter(pk__in=batch_pks).prefetch_related(
+            "attributes",
+            "variants",
+            "collections",
+            "images",
+            "product_type",
+            "category",
+        )
+        export_data = list(_get_products_data(product_batch, export_fields))
+        writer.writerows(
+            [data.get(header, " ") for header in headers] for data in export_data
+        )
+
+
+def _export_products_rows(queryset, export_fields, headers, writer):
+    for batch_pks in queryset_in_batches(queryset, BATCH_SIZE):
+        product_batch = Product.objects.filter(pk__in=batch_pks)
+        writer.writerows(
+            get_products_rows(product_batch, export_fields, headers, [], [])
+        )
+
+
+def _measure(export):
+    export_fields, _, headers = get_export_fields_and_headers_info(NARROW_EXPORT_INFO)
+    queryset = Product.objects.order_by("pk")
+    with NamedTemporaryFile() as temporary_file:
+        writer = CSVWriter(temporary_file, ";")
+        tracemalloc.start()
+        export(queryset, set(export_fields), headers, writer)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        writer.close()
+        temporary_file.seek(0)
+        content = temporary_file.read()
+    return content, peak
+
+
+def test_narrow_export_memory(product_type, category):
+    _generate_catalog(product_type, category)
+
+    old_content, old_peak = _measure(_export_products_data)
+    new_content, new_peak = _measure(_export_products_rows)
+
+    assert new_content == old_content
+    assert new_content.count(b"\r\n") == PRODUCTS_COUNT * VARIANTS_PER_PRODUCT
+    assert new_peak < old_peak
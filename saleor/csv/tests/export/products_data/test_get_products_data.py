@@ -1,8 +1,16 @@
+from collections import ChainMap
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from measurement.measures import Weight
 
 from .....product.models import Attribute, Product, ProductVariant, VariantImage
 from .....warehouse.models import Warehouse
-from ....utils.products_data import ProductExportFields, get_products_data
+from ....utils.products_data import (
+    ProductExportFields,
+    get_export_fields_and_headers_info,
+    get_products_rows,
+)
 from .utils import (
     add_product_attribute_data_to_expected_data,
     add_stocks_to_expected_data,
@@ -10,7 +18,13 @@ from .utils import (
 )
 
 
-def test_get_products_data(product, product_with_image, collection, image):
+def _get_expected_rows(expected_data, headers):
+    return [
+        tuple(data.get(header, " ") for header in headers) for data in expected_data
+    ]
+
+
+def test_get_products_rows(product, product_with_image, collection, image):
     # given
     product.weight = Weight(kg=5)
     product.save()
@@ -21,11 +35,6 @@ def test_get_products_data(product, product_with_image, collection, image):
     VariantImage.objects.create(variant=variant, image=product.images.first())
 
     products = Product.objects.all()
-    export_fields = set(
-        value
-        for mapping in ProductExportFields.HEADERS_TO_FIELDS_MAPPING.values()
-        for value in mapping.values()
-    )
     warehouse_ids = [str(warehouse.pk) for warehouse in Warehouse.objects.all()]
     attribute_ids = [str(attr.pk) for attr in Attribute.objects.all()]
 
@@ -44,9 +53,20 @@ def test_get_products_data(product, product_with_image, collection, image):
         variants.append(variant)
     ProductVariant.objects.bulk_update(variants, ["weight"])
 
+    export_info = {
+        "fields": list(
+            ChainMap(*ProductExportFields.HEADERS_TO_FIELDS_MAPPING.values()).keys()
+        ),
+        "warehouses": warehouse_ids,
+        "attributes": attribute_ids,
+    }
+    export_fields, _, headers = get_export_fields_and_headers_info(export_info)
+
     # when
-    result_data = get_products_data(
-        products, export_fields, attribute_ids, warehouse_ids
+    result_rows = list(
+        get_products_rows(
+            products, set(export_fields), headers, attribute_ids, warehouse_ids
+        )
     )
 
     # then
@@ -109,19 +129,22 @@ def test_get_products_data(product, product_with_image, collection, image):
 
             expected_data.append(data)
 
-    assert result_data == expected_data
+    assert result_rows == _get_expected_rows(expected_data, headers)
 
 
-def test_get_products_data_for_specified_attributes(
+def test_get_products_rows_for_specified_attributes(
     product, product_with_variant_with_two_attributes
 ):
     # given
     products = Product.objects.all()
-    export_fields = {"id", "variants__sku"}
     attribute_ids = [str(attr.pk) for attr in Attribute.objects.all()][:1]
+    export_info = {"fields": ["variant sku"], "attributes": attribute_ids}
+    export_fields, _, headers = get_export_fields_and_headers_info(export_info)
 
     # when
-    result_data = get_products_data(products, export_fields, attribute_ids, [])
+    result_rows = list(
+        get_products_rows(products, set(export_fields), headers, attribute_ids, [])
+    )
 
     # then
     expected_data = []
@@ -142,23 +165,26 @@ def test_get_products_data_for_specified_attributes(
 
             expected_data.append(data)
 
-    assert result_data == expected_data
+    assert result_rows == _get_expected_rows(expected_data, headers)
 
 
-def test_get_products_data_for_specified_warehouses(
+def test_get_products_rows_for_specified_warehouses(
     product, product_with_image, variant_with_many_stocks
 ):
     # given
     product.variants.add(variant_with_many_stocks)
 
     products = Product.objects.all()
-    export_fields = {"id", "variants__sku"}
     warehouse_ids = [str(warehouse.pk) for warehouse in Warehouse.objects.all()][:2]
     attribute_ids = []
+    export_info = {"fields": ["variant sku"], "warehouses": warehouse_ids}
+    export_fields, _, headers = get_export_fields_and_headers_info(export_info)
 
     # when
-    result_data = get_products_data(
-        products, export_fields, attribute_ids, warehouse_ids
+    result_rows = list(
+        get_products_rows(
+            products, set(export_fields), headers, attribute_ids, warehouse_ids
+        )
     )
 
     # then
@@ -174,11 +200,12 @@ def test_get_products_data_for_specified_warehouses(
 
             expected_data.append(data)
 
-    for res in result_data:
-        assert res in expected_data
+    expected_rows = _get_expected_rows(expected_data, headers)
+    for row in result_rows:
+        assert row in expected_rows
 
 
-def test_get_products_data_for_specified_warehouses_and_attributes(
+def test_get_products_rows_for_specified_warehouses_and_attributes(
     product,
     variant_with_many_stocks,
     product_with_image,
@@ -188,13 +215,20 @@ def test_get_products_data_for_specified_warehouses_and_attributes(
     product.variants.add(variant_with_many_stocks)
 
     products = Product.objects.all()
-    export_fields = {"id", "variants__sku"}
     warehouse_ids = [str(warehouse.pk) for warehouse in Warehouse.objects.all()]
     attribute_ids = [str(attr.pk) for attr in Attribute.objects.all()]
+    export_info = {
+        "fields": ["variant sku"],
+        "warehouses": warehouse_ids,
+        "attributes": attribute_ids,
+    }
+    export_fields, _, headers = get_export_fields_and_headers_info(export_info)
 
     # when
-    result_data = get_products_data(
-        products, export_fields, attribute_ids, warehouse_ids
+    result_rows = list(
+        get_products_rows(
+            products, set(export_fields), headers, attribute_ids, warehouse_ids
+        )
     )
 
     # then
@@ -217,4 +251,26 @@ def test_get_products_data_for_specified_warehouses_and_attributes(
 
             expected_data.append(data)
 
-    assert result_data == expected_data
+    assert result_rows == _get_expected_rows(expected_data, headers)
+
+
+def test_get_products_rows_selects_only_exported_columns(product_list):
+    # given
+    products = Product.objects.all()
+    export_fields = {"id", "variants__sku", "variants__price_amount"}
+    headers = ["id", "variants__sku", "variants__price_amount"]
+
+    # when
+    with CaptureQueriesContext(connection) as queries:
+        rows = list(get_products_rows(products, export_fields, headers, [], []))
+
+    # then
+    assert rows == [
+        (variant.product_id, variant.sku, variant.price_amount)
+        for variant in ProductVariant.objects.order_by("product_id", "pk")
+    ]
+    assert len(queries) == 1
+    sql = queries[0]["sql"]
+    assert "product_category" not in sql
+    assert "product_producttype" not in sql
+    assert "weight" not in sql
@@ -1,24 +1,27 @@
 import shutil
 from tempfile import NamedTemporaryFile
-from unittest.mock import ANY, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import openpyxl
-import petl as etl
 import pytest
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from freezegun import freeze_time
 
-from ....core import JobStatus
 from ....graphql.csv.enums import ProductFieldEnum
 from ....product.models import Product
 from ... import FileTypes
 from ...utils.export import (
-    append_to_file,
-    create_file_with_headers,
-    export_products,
+    CSVWriter,
+    XLSXWriter,
     export_products_in_batches,
+    export_products_shard,
+    get_export_shards,
     get_filename,
+    get_part_file_name,
     get_product_queryset,
+    merge_products_export_parts,
     save_csv_file_in_export_file,
 )
 
@@ -26,18 +29,13 @@ from ...utils.export import (
 @pytest.mark.parametrize(
     "file_type", [FileTypes.CSV, FileTypes.XLSX],
 )
-@patch("saleor.csv.utils.export.create_file_with_headers")
 @patch("saleor.csv.utils.export.export_products_in_batches")
-@patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
-@patch("saleor.csv.utils.export.save_csv_file_in_export_file")
-def test_export_products(
-    save_file_mock,
-    send_email_mock,
+def test_export_products_shard(
     export_products_in_batches_mock,
-    create_file_with_headers_mock,
     product_list,
     user_export_file,
     file_type,
+    media_root,
 ):
     # given
     export_info = {
@@ -45,133 +43,129 @@ def test_export_products(
         "warehouses": [],
         "attributes": [],
     }
-
-    mock_file = MagicMock(spec=File)
-    create_file_with_headers_mock.return_value = mock_file
+    pks = sorted(product.pk for product in product_list)
 
     # when
-    export_products(user_export_file, {"all": ""}, export_info, file_type)
+    export_products_shard(
+        user_export_file, {"all": ""}, export_info, file_type, ";", 1, (pks[1], pks[-1])
+    )
 
     # then
-    create_file_with_headers_mock.assert_called_once_with(
-        ["id", "name"], ";", file_type
-    )
     assert export_products_in_batches_mock.call_count == 1
     args, kwargs = export_products_in_batches_mock.call_args
-    assert set(args[0].values_list("pk", flat=True)) == set(
-        Product.objects.all().values_list("pk", flat=True)
-    )
-    assert args[1:] == (
-        export_info,
-        {"id", "name"},
-        ["id", "name"],
-        ";",
-        mock_file,
-        file_type,
-    )
-    send_email_mock.assert_called_once_with(
-        user_export_file, user_export_file.user.email, "export_products_success"
-    )
-    save_file_mock.assert_called_once_with(user_export_file, mock_file, ANY)
+    assert set(args[0].values_list("pk", flat=True)) == set(pks[1:])
+    assert args[1:4] == (export_info, {"id", "name"}, ["id", "name"])
+    assert default_storage.exists(get_part_file_name(user_export_file, 1))
 
 
-@patch("saleor.csv.utils.export.create_file_with_headers")
 @patch("saleor.csv.utils.export.export_products_in_batches")
-@patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
-@patch("saleor.csv.utils.export.save_csv_file_in_export_file")
-def test_export_products_ids(
-    save_file_mock,
-    send_email_mock,
-    export_products_in_batches_mock,
-    create_file_with_headers_mock,
-    product_list,
-    user_export_file,
+def test_export_products_shard_ids(
+    export_products_in_batches_mock, product_list, user_export_file, media_root
 ):
     # given
-    pks = [product.pk for product in product_list[:2]]
+    pks = sorted(product.pk for product in product_list[:2])
     export_info = {"fields": [], "warehouses": [], "attributes": []}
-    file_type = FileTypes.CSV
-
-    assert user_export_file.status == JobStatus.PENDING
-    assert not user_export_file.content_file
-
-    mock_file = MagicMock(spec=File)
-    create_file_with_headers_mock.return_value = mock_file
 
     # when
-    export_products(user_export_file, {"ids": pks}, export_info, file_type)
+    export_products_shard(
+        user_export_file,
+        {"ids": pks},
+        export_info,
+        FileTypes.CSV,
+        ";",
+        0,
+        (pks[0], product_list[-1].pk),
+    )
 
     # then
-    create_file_with_headers_mock.assert_called_once_with(["id"], ";", file_type)
-
-    assert export_products_in_batches_mock.call_count == 1
     args, kwargs = export_products_in_batches_mock.call_args
-    assert set(args[0].values_list("pk", flat=True)) == set(
-        Product.objects.filter(pk__in=pks).values_list("pk", flat=True)
-    )
-    assert args[1:] == (export_info, {"id"}, ["id"], ";", mock_file, file_type,)
-    send_email_mock.assert_called_once_with(
-        user_export_file, user_export_file.user.email, "export_products_success"
-    )
-    save_file_mock.assert_called_once_with(user_export_file, mock_file, ANY)
+    assert set(args[0].values_list("pk", flat=True)) == set(pks)
+    assert args[1:4] == (export_info, {"id"}, ["id"])
 
 
-@patch("saleor.csv.utils.export.create_file_with_headers")
 @patch("saleor.csv.utils.export.export_products_in_batches")
-@patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
-@patch("saleor.csv.utils.export.save_csv_file_in_export_file")
-def test_export_products_filter(
-    save_file_mock,
-    send_email_mock,
-    export_products_in_batches_mock,
-    create_file_with_headers_mock,
-    product_list,
-    user_export_file,
+def test_export_products_shard_filter(
+    export_products_in_batches_mock, product_list, user_export_file, media_root
 ):
     # given
     product_list[0].is_published = False
     product_list[0].save(update_fields=["is_published"])
+    pks = sorted(product.pk for product in product_list)
 
     export_info = {"fields": [], "warehouses": [], "attributes": []}
-    file_type = FileTypes.CSV
-
-    assert user_export_file.status == JobStatus.PENDING
-    assert not user_export_file.content_file
-
-    mock_file = MagicMock(spec=File)
-    create_file_with_headers_mock.return_value = mock_file
 
     # when
-    export_products(
-        user_export_file, {"filter": {"is_published": True}}, export_info, file_type
+    export_products_shard(
+        user_export_file,
+        {"filter": {"is_published": True}},
+        export_info,
+        FileTypes.CSV,
+        ";",
+        0,
+        (pks[0], pks[-1]),
     )
 
     # then
-    create_file_with_headers_mock.assert_called_once_with(["id"], ";", file_type)
-
-    assert export_products_in_batches_mock.call_count == 1
     args, kwargs = export_products_in_batches_mock.call_args
     assert set(args[0].values_list("pk", flat=True)) == set(
         Product.objects.filter(is_published=True).values_list("pk", flat=True)
     )
-    assert args[1:] == (export_info, {"id"}, ["id"], ";", mock_file, file_type,)
+
+
+@patch("saleor.csv.utils.export.SHARD_SIZE", 2)
+def test_get_export_shards(product_list):
+    # given
+    pks = sorted(product.pk for product in product_list)
+
+    # when
+    shards = get_export_shards(Product.objects.order_by("pk"))
+
+    # then
+    assert shards == [(pks[0], pks[1]), (pks[2], pks[2])]
+
+
+def test_get_export_shards_no_products(db):
+    assert get_export_shards(Product.objects.order_by("pk")) == []
+
+
+@patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
+def test_merge_products_export_parts_csv(
+    send_email_mock, user_export_file, tmpdir, media_root
+):
+    # given
+    export_info = {
+        "fields": [ProductFieldEnum.NAME.value],
+        "warehouses": [],
+        "attributes": [],
+    }
+    user_export_file.total_shards = 2
+    user_export_file.save(update_fields=["total_shards"])
+    default_storage.save(
+        get_part_file_name(user_export_file, 0), ContentFile(b"1;A\r\n")
+    )
+    default_storage.save(
+        get_part_file_name(user_export_file, 1), ContentFile(b"2;B\r\n")
+    )
+
+    # when
+    merge_products_export_parts(user_export_file, export_info, FileTypes.CSV, ";")
+
+    # then
+    user_export_file.refresh_from_db()
+    file_content = user_export_file.content_file.read().decode()
+    assert file_content == "id;name\r\n1;A\r\n2;B\r\n"
+    assert not default_storage.exists(get_part_file_name(user_export_file, 0))
+    assert not default_storage.exists(get_part_file_name(user_export_file, 1))
     send_email_mock.assert_called_once_with(
         user_export_file, user_export_file.user.email, "export_products_success"
     )
-    save_file_mock.assert_called_once_with(user_export_file, mock_file, ANY)
+
+    shutil.rmtree(tmpdir)
 
 
-@patch("saleor.csv.utils.export.create_file_with_headers")
-@patch("saleor.csv.utils.export.export_products_in_batches")
 @patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
-@patch("saleor.csv.utils.export.save_csv_file_in_export_file")
-def test_export_products_by_app(
-    save_file_mock,
-    send_email_mock,
-    export_products_in_batches_mock,
-    create_file_with_headers_mock,
-    product_list,
-    app_export_file,
+def test_merge_products_export_parts_xlsx(
+    send_email_mock, app_export_file, tmpdir, media_root
 ):
     # given
     export_info = {
@@ -179,36 +173,32 @@ def test_export_products_by_app(
         "warehouses": [],
         "attributes": [],
     }
-    file_type = FileTypes.CSV
-
-    mock_file = MagicMock(spec=File)
-    create_file_with_headers_mock.return_value = mock_file
+    app_export_file.total_shards = 2
+    app_export_file.save(update_fields=["total_shards"])
+    for shard_index, rows in enumerate([[[1, "A"], [2, "B"]], [[3, "C"]]]):
+        part_file = NamedTemporaryFile(suffix=".xlsx")
+        writer = XLSXWriter(part_file)
+        writer.writerows(rows)
+        writer.close()
+        default_storage.save(
+            get_part_file_name(app_export_file, shard_index), File(part_file)
+        )
 
     # when
-    export_products(app_export_file, {"all": ""}, export_info, file_type)
+    merge_products_export_parts(app_export_file, export_info, FileTypes.XLSX, ";")
 
     # then
-    create_file_with_headers_mock.assert_called_once_with(
-        ["id", "name"], ";", file_type
-    )
-
-    assert export_products_in_batches_mock.call_count == 1
-    args, kwargs = export_products_in_batches_mock.call_args
-    assert set(args[0].values_list("pk", flat=True)) == set(
-        Product.objects.all().values_list("pk", flat=True)
-    )
-    assert args[1:] == (
-        export_info,
-        {"id", "name"},
+    app_export_file.refresh_from_db()
+    sheet_obj = openpyxl.load_workbook(app_export_file.content_file).active
+    assert [list(row) for row in sheet_obj.iter_rows(values_only=True)] == [
         ["id", "name"],
-        ";",
-        mock_file,
-        file_type,
-    )
-
+        [1, "A"],
+        [2, "B"],
+        [3, "C"],
+    ]
     send_email_mock.assert_not_called()
 
-    save_file_mock.assert_called_once_with(app_export_file, mock_file, ANY)
+    shutil.rmtree(tmpdir)
 
 
 def test_get_filename_csv():
@@ -248,48 +238,6 @@ def get_product_queryset_filter(product_list):
     assert queryset.count() == len(product_list) - 1
 
 
-def test_create_file_with_headers_csv(user_export_file, tmpdir, media_root):
-    # given
-    file_headers = ["id", "name", "collections"]
-
-    assert not user_export_file.content_file
-
-    # when
-    csv_file = create_file_with_headers(file_headers, ";", FileTypes.CSV)
-
-    # then
-    assert csv_file
-
-    file_content = csv_file.read().decode().split("\r\n")
-
-    assert ";".join(file_headers) in file_content
-
-    shutil.rmtree(tmpdir)
-
-
-def test_create_file_with_headers_xlsx(user_export_file, tmpdir, media_root):
-    # given
-    file_headers = ["id", "name", "collections"]
-
-    assert not user_export_file.content_file
-
-    # when
-    xlsx_file = create_file_with_headers(file_headers, ";", FileTypes.XLSX)
-
-    # then
-    assert xlsx_file
-
-    wb_obj = openpyxl.load_workbook(xlsx_file)
-
-    sheet_obj = wb_obj.active
-    max_col = sheet_obj.max_column
-    headers = [sheet_obj.cell(row=1, column=i).value for i in range(1, max_col + 1)]
-
-    assert headers == file_headers
-
-    shutil.rmtree(tmpdir)
-
-
 def test_save_csv_file_in_export_file(user_export_file, tmpdir, media_root):
     file_mock = MagicMock(spec=File)
     file_mock.name = "temp_file.csv"
@@ -305,80 +253,66 @@ def test_save_csv_file_in_export_file(user_export_file, tmpdir, media_root):
     shutil.rmtree(tmpdir)
 
 
-def test_append_to_file_for_csv(user_export_file, tmpdir, media_root):
+def test_csv_writer(tmpdir):
     # given
-    export_data = [
-        {"id": "123", "name": "test1", "collections": "coll1"},
-        {"id": "345", "name": "test2"},
-    ]
+    rows = [("123", "test1", "coll1"), ("345", "test2", " ")]
     headers = ["id", "name", "collections"]
-    delimiter = ";"
-
-    table = etl.fromdicts([{"id": "1", "name": "A"}], header=headers, missing=" ")
 
     temp_file = NamedTemporaryFile()
-    etl.tocsv(table, temp_file.name, delimiter=delimiter)
+    writer = CSVWriter(temp_file, ";")
 
     # when
-    append_to_file(export_data, headers, temp_file, FileTypes.CSV, delimiter)
+    writer.writerows([headers])
+    writer.writerows(rows)
+    writer.close()
 
     # then
-    user_export_file.refresh_from_db()
-
+    temp_file.seek(0)
     file_content = temp_file.read().decode().split("\r\n")
-    assert ";".join(headers) in file_content
-    assert ";".join(export_data[0].values()) in file_content
-    assert (";".join(export_data[1].values()) + "; ") in file_content
+    assert file_content == ["id;name;collections", "123;test1;coll1", "345;test2; ", ""]
 
     temp_file.close()
-    shutil.rmtree(tmpdir)
 
 
-def test_append_to_file_for_xlsx(user_export_file, tmpdir, media_root):
+def test_xlsx_writer(tmpdir):
     # given
-    export_data = [
-        {"id": "123", "name": "test1", "collections": "coll1"},
-        {"id": "345", "name": "test2"},
-    ]
-    expected_headers = ["id", "name", "collections"]
-    delimiter = ";"
-
-    table = etl.fromdicts(
-        [{"id": "1", "name": "A"}], header=expected_headers, missing=" "
-    )
+    rows = [(123, "test1", "coll1"), (345, "test2", " ")]
+    headers = ["id", "name", "collections"]
 
     temp_file = NamedTemporaryFile(suffix=".xlsx")
-    etl.io.xlsx.toxlsx(table, temp_file.name)
+    writer = XLSXWriter(temp_file)
 
     # when
-    append_to_file(export_data, expected_headers, temp_file, FileTypes.XLSX, delimiter)
+    writer.writerows([headers])
+    writer.writerows(rows)
+    writer.close()
 
     # then
-    user_export_file.refresh_from_db()
+    sheet_obj = openpyxl.load_workbook(temp_file).active
+    data = [list(row) for row in sheet_obj.iter_rows(values_only=True)]
 
-    wb_obj = openpyxl.load_workbook(temp_file)
+    assert data == [headers, [123, "test1", "coll1"], [345, "test2", " "]]
 
-    sheet_obj = wb_obj.active
-    max_col = sheet_obj.max_column
-    max_row = sheet_obj.max_row
-    expected_headers = expected_headers
-    headers = [sheet_obj.cell(row=1, column=i).value for i in range(1, max_col + 1)]
-    data = []
-    for i in range(2, max_row + 1):
-        row = []
-        for j in range(1, max_col + 1):
-            row.append(sheet_obj.cell(row=i, column=j).value)
-        data.append(row)
+    temp_file.close()
 
-    assert headers == expected_headers
-    assert list(export_data[0].values()) in data
-    row2 = list(export_data[1].values())
-    # add string with space for collections column
-    row2.append(" ")
-    assert row2 in data
 
-    temp_file.close()
-    shutil.rmtree(tmpdir)
+def test_csv_writer_append_part(tmpdir):
+    # given
+    temp_file = NamedTemporaryFile()
+    writer = CSVWriter(temp_file, ";")
+    part_file = NamedTemporaryFile()
+    part_file.write(b"1;A\r\n")
+    part_file.seek(0)
+
+    # when
+    writer.writerows([["id", "name"]])
+    writer.append_part(part_file)
+    writer.writerows([["2", "B"]])
+    writer.close()
+
+    # then
+    temp_file.seek(0)
+    assert temp_file.read() == b"id;name\r\n1;A\r\n2;B\r\n"
 
 
 @patch("saleor.csv.utils.export.BATCH_SIZE", 1)
@@ -395,23 +329,18 @@ def test_export_products_in_batches_for_csv(
     export_fields = ["id", "name", "variants__sku"]
     expected_headers = ["id", "name", "variant sku"]
 
-    table = etl.wrap([expected_headers])
-
     temp_file = NamedTemporaryFile()
-    etl.tocsv(table, temp_file.name, delimiter=";")
+    writer = CSVWriter(temp_file, ";")
+    writer.writerows([expected_headers])
 
     # when
     export_products_in_batches(
-        qs,
-        export_info,
-        set(export_fields),
-        export_fields,
-        ";",
-        temp_file,
-        FileTypes.CSV,
+        qs, export_info, set(export_fields), export_fields, writer
     )
+    writer.close()
 
     # then
+    temp_file.seek(0)
 
     expected_data = []
     for product in qs.order_by("pk"):
@@ -448,21 +377,15 @@ def test_export_products_in_batches_for_xlsx(
     export_fields = ["id", "name", "variants__sku"]
     expected_headers = ["id", "name", "variant sku"]
 
-    table = etl.wrap([expected_headers])
-
     temp_file = NamedTemporaryFile(suffix=".xlsx")
-    etl.io.xlsx.toxlsx(table, temp_file.name)
+    writer = XLSXWriter(temp_file)
+    writer.writerows([expected_headers])
 
     # when
     export_products_in_batches(
-        qs,
-        export_info,
-        set(export_fields),
-        export_fields,
-        ";",
-        temp_file,
-        FileTypes.XLSX,
+        qs, export_info, set(export_fields), export_fields, writer
     )
+    writer.close()
 
     # then
     expected_data = []
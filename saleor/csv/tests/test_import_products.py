@@ -0,0 +1,267 @@
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from measurement.measures import Weight
+
+from ...product.models import AssignedVariantAttribute, ProductVariant
+from ...warehouse.models import Stock
+from ..error_codes import ImportErrorCode
+from ..models import ImportFile
+from ..utils.export import XLSXWriter
+from ..utils.import_products import import_products
+
+
+def create_import_file(user, rows, file_name="products.csv"):
+    content = "\r\n".join(";".join(row) for row in rows) + "\r\n"
+    import_file = ImportFile(user=user)
+    import_file.content_file.save(file_name, ContentFile(content.encode()))
+    return import_file
+
+
+@patch("saleor.csv.utils.import_products.invalidate_product_availabilities")
+def test_import_products(invalidate_mock, staff_user, product, warehouse, media_root):
+    # given
+    variant = product.variants.get()
+    import_file = create_import_file(
+        staff_user,
+        [
+            ["id", "name", "visible", "variant sku", "variant price", "cost price"],
+            [str(product.pk), "New name", "False", variant.sku, "15.50", "3"],
+        ],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    product.refresh_from_db()
+    variant.refresh_from_db()
+    assert product.name == "New name"
+    assert not product.is_published
+    assert variant.price_amount == Decimal("15.50")
+    assert variant.cost_price_amount == Decimal("3")
+    assert product.minimal_variant_price_amount == Decimal("15.50")
+    import_file.refresh_from_db()
+    assert import_file.total_rows == 1
+    assert import_file.processed_rows == 1
+    assert import_file.errors == []
+    invalidate_mock.assert_called_once_with()
+
+
+def test_import_products_stocks(staff_user, product, warehouse, warehouses, media_root):
+    # given
+    variant = product.variants.get()
+    import_file = create_import_file(
+        staff_user,
+        [
+            [
+                "variant sku",
+                f"{warehouse.slug} (warehouse quantity)",
+                f"{warehouses[0].slug} (warehouse quantity)",
+            ],
+            [variant.sku, "25", "7"],
+        ],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    quantities = dict(variant.stocks.values_list("warehouse__slug", "quantity"))
+    assert quantities == {warehouse.slug: 25, warehouses[0].slug: 7}
+
+
+def test_import_products_variant_attributes(
+    staff_user, product, size_attribute, media_root
+):
+    # given
+    variant = product.variants.get()
+    import_file = create_import_file(
+        staff_user, [["variant sku", "size (variant attribute)"], [variant.sku, "big"]],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    assigned_attribute = AssignedVariantAttribute.objects.get(variant=variant)
+    assert list(assigned_attribute.values.values_list("slug", flat=True)) == ["big"]
+
+
+def test_import_products_assigns_missing_product_attribute(
+    staff_user, product, color_attribute, media_root
+):
+    # given
+    product.attributes.all().delete()
+    import_file = create_import_file(
+        staff_user,
+        [["id", "color (product attribute)"], [str(product.pk), "red, blue"]],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    assigned_attribute = product.attributes.get()
+    assert set(assigned_attribute.values.values_list("slug", flat=True)) == {
+        "red",
+        "blue",
+    }
+    assert assigned_attribute.values_sort_key == "Red,Blue"
+
+
+def test_import_products_skips_invalid_rows(
+    staff_user, product, product_with_single_variant, media_root
+):
+    # given
+    variant = product.variants.get()
+    other_variant = product_with_single_variant.variants.get()
+    import_file = create_import_file(
+        staff_user,
+        [
+            ["id", "variant sku", "variant price", "size (variant attribute)"],
+            [str(product.pk), variant.sku, "wrong", " "],
+            [str(product.pk), "unknown-sku", "20", " "],
+            [str(product.pk), other_variant.sku, "20", " "],
+            [str(product.pk), variant.sku, "20", "unknown-value"],
+            [str(product_with_single_variant.pk), other_variant.sku, "30", " "],
+        ],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    variant.refresh_from_db()
+    other_variant.refresh_from_db()
+    assert variant.price_amount == Decimal(10)
+    assert other_variant.price_amount == Decimal(30)
+    import_file.refresh_from_db()
+    assert import_file.processed_rows == 5
+    assert [
+        (error["row"], error["field"], error["code"]) for error in import_file.errors
+    ] == [
+        (2, "variant price", ImportErrorCode.INVALID.value),
+        (3, "variant sku", ImportErrorCode.NOT_FOUND.value),
+        (4, "id", ImportErrorCode.INVALID.value),
+        (5, "size (variant attribute)", ImportErrorCode.NOT_FOUND.value),
+    ]
+
+
+def test_import_products_price_exceeding_field_precision(
+    staff_user, product, media_root
+):
+    # given
+    variant = product.variants.get()
+    import_file = create_import_file(
+        staff_user,
+        [
+            ["variant sku", "variant price", "cost price"],
+            [variant.sku, "1e20", "5"],
+            [variant.sku, "12", "1.0001"],
+            [variant.sku, "12", "5"],
+        ],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    variant.refresh_from_db()
+    assert variant.price_amount == Decimal(12)
+    assert variant.cost_price_amount == Decimal(5)
+    import_file.refresh_from_db()
+    assert [
+        (error["row"], error["field"], error["code"]) for error in import_file.errors
+    ] == [
+        (2, "variant price", ImportErrorCode.INVALID.value),
+        (3, "cost price", ImportErrorCode.INVALID.value),
+    ]
+
+
+def test_import_products_unknown_warehouse(staff_user, product, media_root):
+    # given
+    variant = product.variants.get()
+    import_file = create_import_file(
+        staff_user,
+        [
+            ["variant sku", "variant price", "unknown (warehouse quantity)"],
+            [variant.sku, "12", "5"],
+        ],
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    variant.refresh_from_db()
+    assert variant.price_amount == Decimal(12)
+    import_file.refresh_from_db()
+    assert import_file.errors == [
+        {
+            "row": 1,
+            "field": "unknown (warehouse quantity)",
+            "message": "Warehouse unknown does not exist.",
+            "code": ImportErrorCode.NOT_FOUND.value,
+        }
+    ]
+
+
+def test_import_products_without_key_column(staff_user, product, media_root):
+    # given
+    import_file = create_import_file(staff_user, [["name"], ["New name"]])
+
+    # when
+    with pytest.raises(ValidationError) as error:
+        import_products(import_file)
+
+    # then
+    assert error.value.code == ImportErrorCode.REQUIRED.value
+
+
+@patch("saleor.csv.utils.import_products.BATCH_SIZE", 1)
+@patch("saleor.csv.utils.import_products.MAX_ERRORS", 1)
+def test_import_products_limits_stored_errors(staff_user, product, media_root):
+    # given
+    import_file = create_import_file(
+        staff_user, [["variant sku"], ["unknown-1"], ["unknown-2"]]
+    )
+
+    # when
+    import_products(import_file)
+
+    # then
+    import_file.refresh_from_db()
+    assert len(import_file.errors) == 1
+    assert import_file.message == "Found 2 errors, showing first 1."
+
+
+def test_import_products_xlsx(staff_user, product, warehouse, media_root):
+    # given
+    variant = product.variants.get()
+    with NamedTemporaryFile(suffix=".xlsx") as temporary_file:
+        writer = XLSXWriter(temporary_file)
+        writer.writerows(
+            [
+                ["variant sku", "variant price", "variant weight"],
+                [variant.sku, 11.5, "250.0 g"],
+            ]
+        )
+        writer.close()
+        import_file = ImportFile(user=staff_user)
+        import_file.content_file.save("products.xlsx", File(temporary_file))
+
+    # when
+    import_products(import_file)
+
+    # then
+    variant.refresh_from_db()
+    assert variant.price_amount == Decimal("11.5")
+    assert variant.weight == Weight(g=250)
+    assert ProductVariant.objects.get(pk=variant.pk).updated_at
+    assert Stock.objects.get(product_variant=variant).quantity == 10
@@ -1,20 +1,30 @@
 import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytz
+from django.core.exceptions import ValidationError
 from freezegun import freeze_time
 
 from ...core import JobStatus
 from .. import ExportEvents, FileTypes
-from ..models import ExportEvent
-from ..tasks import export_products_task, on_task_failure, on_task_success
+from ..models import ExportEvent, ImportFile
+from ..tasks import (
+    export_products_shard_task,
+    export_products_task,
+    import_products_task,
+    on_task_failure,
+    on_task_success,
+)
 
 
-@patch("saleor.csv.tasks.export_products")
-def test_export_products_task(export_products_mock, user_export_file):
+@patch("saleor.csv.utils.export.SHARD_SIZE", 2)
+@patch("saleor.csv.utils.export.send_email_with_link_to_download_file")
+def test_export_products_task(
+    send_email_mock, product_list, user_export_file, media_root
+):
     # given
     scope = {"all": ""}
-    export_info = {"fields": "name"}
+    export_info = {"fields": [], "warehouses": [], "attributes": []}
     file_type = FileTypes.CSV
     delimiter = ";"
 
@@ -22,7 +32,92 @@ def test_export_products_task(export_products_mock, user_export_file):
     export_products_task(user_export_file.id, scope, export_info, file_type, delimiter)
 
     # then
-    export_products_mock.called_once_with()
+    user_export_file.refresh_from_db()
+    assert user_export_file.status == JobStatus.SUCCESS
+    assert user_export_file.total_shards == 2
+    assert user_export_file.processed_shards == 2
+    assert user_export_file.progress == 1.0
+
+    file_content = user_export_file.content_file.read().decode().split("\r\n")
+    assert file_content == ["id"] + [
+        str(pk) for pk in sorted(product.pk for product in product_list)
+    ] + [""]
+    send_email_mock.assert_called_once()
+
+
+@patch("saleor.csv.tasks.merge_products_export_parts_task.delay")
+@patch("saleor.csv.tasks.export_products_shard_task.delay")
+def test_export_products_task_schedules_shards(
+    shard_task_mock, merge_task_mock, product_list, user_export_file
+):
+    # given
+    export_info = {"fields": [], "warehouses": [], "attributes": []}
+    pks = sorted(product.pk for product in product_list)
+
+    # when
+    with patch("saleor.csv.utils.export.SHARD_SIZE", 2):
+        export_products_task(user_export_file.id, {"all": ""}, export_info, "csv")
+
+    # then
+    user_export_file.refresh_from_db()
+    assert user_export_file.total_shards == 2
+    assert user_export_file.progress == 0.0
+    args = (user_export_file.id, {"all": ""}, export_info, "csv", ";")
+    assert shard_task_mock.call_args_list == [
+        call(*args, 0, pks[0], pks[1]),
+        call(*args, 1, pks[2], pks[2]),
+    ]
+    merge_task_mock.assert_not_called()
+
+
+@patch("saleor.csv.tasks.merge_products_export_parts_task.delay")
+@patch("saleor.csv.tasks.export_products_shard")
+def test_export_products_shard_task_merges_after_last_shard(
+    export_products_shard_mock, merge_task_mock, user_export_file
+):
+    # given
+    user_export_file.total_shards = 2
+    user_export_file.save(update_fields=["total_shards"])
+    export_info = {"fields": [], "warehouses": [], "attributes": []}
+    args = (user_export_file.id, {"all": ""}, export_info, "csv", ";")
+
+    # when
+    export_products_shard_task(*args, 0, 1, 2)
+
+    # then
+    user_export_file.refresh_from_db()
+    assert user_export_file.progress == 0.5
+    merge_task_mock.assert_not_called()
+
+    # when
+    export_products_shard_task(*args, 1, 3, 4)
+
+    # then
+    user_export_file.refresh_from_db()
+    assert user_export_file.processed_shards == 2
+    merge_task_mock.assert_called_once_with(
+        user_export_file.id, export_info, "csv", ";"
+    )
+
+
+@patch("saleor.csv.tasks.export_products_shard")
+def test_export_products_shard_task_export_failed(
+    export_products_shard_mock, user_export_file
+):
+    # given
+    user_export_file.status = JobStatus.FAILED
+    user_export_file.total_shards = 2
+    user_export_file.save(update_fields=["status", "total_shards"])
+
+    # when
+    export_products_shard_task(
+        user_export_file.id, {"all": ""}, {}, "csv", ";", 0, 1, 2
+    )
+
+    # then
+    export_products_shard_mock.assert_not_called()
+    user_export_file.refresh_from_db()
+    assert user_export_file.processed_shards == 0
 
 
 @patch("saleor.csv.tasks.send_export_failed_info")
@@ -129,3 +224,49 @@ def test_on_task_success(user_export_file):
         user=user_export_file.user,
         type=ExportEvents.EXPORT_SUCCESS,
     )
+
+
+@patch("saleor.csv.tasks.send_export_failed_info")
+def test_on_task_failure_export_already_failed(
+    send_export_failed_info_mock, user_export_file
+):
+    # given
+    user_export_file.status = JobStatus.FAILED
+    user_export_file.save(update_fields=["status"])
+    args = [user_export_file.pk, {"all": ""}]
+
+    # when
+    on_task_failure(None, Exception("Test"), "task_id", args, {}, Mock(type="Test"))
+
+    # then
+    assert not ExportEvent.objects.filter(export_file=user_export_file).exists()
+    send_export_failed_info_mock.assert_not_called()
+
+
+@patch("saleor.csv.tasks.import_products")
+def test_import_products_task(import_products_mock, staff_user):
+    # given
+    import_file = ImportFile.objects.create(user=staff_user)
+
+    # when
+    import_products_task.apply(args=[import_file.pk])
+
+    # then
+    import_products_mock.assert_called_once_with(import_file, ";")
+    import_file.refresh_from_db()
+    assert import_file.status == JobStatus.SUCCESS
+
+
+@patch("saleor.csv.tasks.import_products")
+def test_import_products_task_failed(import_products_mock, staff_user):
+    # given
+    import_file = ImportFile.objects.create(user=staff_user)
+    import_products_mock.side_effect = ValidationError("Invalid file.")
+
+    # when
+    import_products_task.apply(args=[import_file.pk])
+
+    # then
+    import_file.refresh_from_db()
+    assert import_file.status == JobStatus.FAILED
+    assert import_file.message == "Invalid file."
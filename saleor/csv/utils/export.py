@@ -1,13 +1,18 @@
+import csv
+import io
+import shutil
 from tempfile import NamedTemporaryFile
-from typing import IO, TYPE_CHECKING, Any, Dict, List, Set, Union
+from typing import IO, TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-import petl as etl
+import openpyxl
+from django.core.files import File
+from django.core.files.storage import default_storage
 from django.utils import timezone
 
 from ...product.models import Product
 from .. import FileTypes
 from ..emails import send_email_with_link_to_download_file
-from .products_data import get_export_fields_and_headers_info, get_products_data
+from .products_data import get_export_fields_and_headers_info, get_products_rows
 
 if TYPE_CHECKING:
     # flake8: noqa
@@ -16,36 +21,74 @@ if TYPE_CHECKING:
 
 
 BATCH_SIZE = 10000
+# number of products exported by a single shard task
+SHARD_SIZE = 50000
 
 
-def export_products(
+def get_export_shards(queryset: "QuerySet") -> List[Tuple[int, int]]:
+    """Split the exported queryset into ranges of primary keys.
+
+    Every range covers at most SHARD_SIZE products and is processed by a separate
+    task, so shards can be exported in parallel by different workers.
+    """
+    return [
+        (batch_pks[0], batch_pks[-1])
+        for batch_pks in queryset_in_batches(queryset, SHARD_SIZE)
+    ]
+
+
+def export_products_shard(
     export_file: "ExportFile",
     scope: Dict[str, Union[str, dict]],
     export_info: Dict[str, list],
     file_type: str,
+    delimiter: str,
+    shard_index: int,
+    pk_range: Tuple[int, int],
+):
+    """Export products from the given range of primary keys to a part file.
+
+    Part files contain data rows only, headers are added when the parts are merged.
+    """
+    start_pk, end_pk = pk_range
+    queryset = get_product_queryset(scope).filter(pk__gte=start_pk, pk__lte=end_pk)
+
+    export_fields, _, data_headers = get_export_fields_and_headers_info(export_info)
+
+    with NamedTemporaryFile("w+b", suffix=f".{file_type}") as temporary_file:
+        writer = get_writer(temporary_file, file_type, delimiter)
+        export_products_in_batches(
+            queryset, export_info, set(export_fields), data_headers, writer
+        )
+        writer.close()
+
+        part_file_name = get_part_file_name(export_file, shard_index)
+        default_storage.delete(part_file_name)
+        default_storage.save(part_file_name, File(temporary_file))
+
+
+def merge_products_export_parts(
+    export_file: "ExportFile",
+    export_info: Dict[str, list],
+    file_type: str,
     delimiter: str = ";",
 ):
+    """Merge part files of all export shards into the final export file."""
     file_name = get_filename("product", file_type)
-    queryset = get_product_queryset(scope)
+    _, file_headers, _ = get_export_fields_and_headers_info(export_info)
 
-    export_fields, file_headers, data_headers = get_export_fields_and_headers_info(
-        export_info
-    )
+    with NamedTemporaryFile("w+b", suffix=f".{file_type}") as temporary_file:
+        writer = get_writer(temporary_file, file_type, delimiter)
+        writer.writerows([file_headers])
+        for shard_index in range(export_file.total_shards):
+            part_file_name = get_part_file_name(export_file, shard_index)
+            with default_storage.open(part_file_name, "rb") as part_file:
+                writer.append_part(part_file)
+        writer.close()
 
-    temporary_file = create_file_with_headers(file_headers, delimiter, file_type)
+        save_csv_file_in_export_file(export_file, temporary_file, file_name)
 
-    export_products_in_batches(
-        queryset,
-        export_info,
-        set(export_fields),
-        data_headers,
-        delimiter,
-        temporary_file,
-        file_type,
-    )
-
-    save_csv_file_in_export_file(export_file, temporary_file, file_name)
-    temporary_file.close()
+    delete_export_parts(export_file)
 
     if export_file.user:
         send_email_with_link_to_download_file(
@@ -53,6 +96,15 @@ def export_products(
         )
 
 
+def get_part_file_name(export_file: "ExportFile", shard_index: int) -> str:
+    return f"export_files/parts/{export_file.pk}/{shard_index:05d}"
+
+
+def delete_export_parts(export_file: "ExportFile"):
+    for shard_index in range(export_file.total_shards):
+        default_storage.delete(get_part_file_name(export_file, shard_index))
+
+
 def get_filename(model_name: str, file_type: str) -> str:
     return "{}_data_{}.{}".format(
         model_name, timezone.now().strftime("%d_%m_%Y"), file_type
@@ -75,15 +127,16 @@ def get_product_queryset(scope: Dict[str, Union[str, dict]]) -> "QuerySet":
     return queryset
 
 
-def queryset_in_batches(queryset):
+def queryset_in_batches(queryset, batch_size: Optional[int] = None):
     """Slice a queryset into batches.
 
     Input queryset should be sorted be pk.
     """
+    batch_size = batch_size or BATCH_SIZE
     start_pk = 0
 
     while True:
-        qs = queryset.filter(pk__gt=start_pk)[:BATCH_SIZE]
+        qs = queryset.filter(pk__gt=start_pk)[:batch_size]
         pks = list(qs.values_list("pk", flat=True))
 
         if not pks:
@@ -99,56 +152,73 @@ def export_products_in_batches(
     export_info: Dict[str, list],
     export_fields: Set[str],
     headers: List[str],
-    delimiter: str,
-    temporary_file: Any,
-    file_type: str,
+    writer: Union["CSVWriter", "XLSXWriter"],
 ):
     warehouses = export_info.get("warehouses")
     attributes = export_info.get("attributes")
 
     for batch_pks in queryset_in_batches(queryset):
-        product_batch = Product.objects.filter(pk__in=batch_pks).prefetch_related(
-            "attributes",
-            "variants",
-            "collections",
-            "images",
-            "product_type",
-            "category",
-        )
+        product_batch = Product.objects.filter(pk__in=batch_pks)
 
-        export_data = get_products_data(
-            product_batch, export_fields, attributes, warehouses
+        export_rows = get_products_rows(
+            product_batch, export_fields, headers, attributes, warehouses
         )
 
-        append_to_file(export_data, headers, temporary_file, file_type, delimiter)
+        writer.writerows(export_rows)
 
 
-def create_file_with_headers(file_headers: List[str], delimiter: str, file_type: str):
-    table = etl.wrap([file_headers])
+class CSVWriter:
+    """Write rows to a binary file in CSV format."""
 
-    if file_type == FileTypes.CSV:
-        temp_file = NamedTemporaryFile("ab+", suffix=".csv")
-        etl.tocsv(table, temp_file.name, delimiter=delimiter)
-    else:
-        temp_file = NamedTemporaryFile("ab+", suffix=".xlsx")
-        etl.io.xlsx.toxlsx(table, temp_file.name)
+    def __init__(self, file_obj: IO[bytes], delimiter: str):
+        self.file_obj = file_obj
+        self.stream = io.TextIOWrapper(file_obj, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.stream, delimiter=delimiter)
 
-    return temp_file
+    def writerows(self, rows: Iterable[list]):
+        self.writer.writerows(rows)
 
+    def append_part(self, part_file: IO[bytes]):
+        """Copy rows of a part file written with the same delimiter."""
+        self.stream.flush()
+        shutil.copyfileobj(part_file, self.file_obj)
+
+    def close(self):
+        self.stream.flush()
+        self.stream.detach()
+
+
+class XLSXWriter:
+    """Write rows to a binary file in XLSX format.
+
+    The workbook is created in write-only mode, so rows are streamed to disk
+    instead of being kept in memory.
+    """
+
+    def __init__(self, file_obj: IO[bytes]):
+        self.file_obj = file_obj
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+
+    def writerows(self, rows: Iterable[list]):
+        for row in rows:
+            self.sheet.append(row)
+
+    def append_part(self, part_file: IO[bytes]):
+        part_workbook = openpyxl.load_workbook(part_file, read_only=True)
+        self.writerows(part_workbook.active.iter_rows(values_only=True))
+        part_workbook.close()
+
+    def close(self):
+        self.workbook.save(self.file_obj)
 
-def append_to_file(
-    export_data: List[Dict[str, Union[str, bool]]],
-    headers: List[str],
-    temporary_file: Any,
-    file_type: str,
-    delimiter: str,
-):
-    table = etl.fromdicts(export_data, header=headers, missing=" ")
 
+def get_writer(
+    file_obj: IO[bytes], file_type: str, delimiter: str
+) -> Union[CSVWriter, XLSXWriter]:
     if file_type == FileTypes.CSV:
-        etl.io.csv.appendcsv(table, temporary_file.name, delimiter=delimiter)
-    else:
-        etl.io.xlsx.appendxlsx(table, temporary_file.name)
+        return CSVWriter(file_obj, delimiter)
+    return XLSXWriter(file_obj)
 
 
 def save_csv_file_in_export_file(
@@ -0,0 +1,748 @@
+import csv
+import io
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import openpyxl
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from measurement.measures import Weight
+
+from ...product.models import (
+    AssignedProductAttribute,
+    AssignedVariantAttribute,
+    Attribute,
+    AttributeProduct,
+    AttributeValue,
+    AttributeVariant,
+    Product,
+    ProductVariant,
+)
+from ...product.utils.attributes import update_products_attributes_sort_keys
+from ...product.utils.availability import invalidate_product_availabilities
+from ...product.utils.variant_prices import (
+    update_products_minimal_variant_prices_of_catalogues,
+)
+from ...warehouse.models import Stock, Warehouse
+from .. import FileTypes
+from ..error_codes import ImportErrorCode
+
+if TYPE_CHECKING:
+    # flake8: noqa
+    from ..models import ImportFile
+
+
+BATCH_SIZE = 1000
+# only the first errors are stored, the rest is counted in the import file message
+MAX_ERRORS = 100
+
+PRODUCT_ID_HEADER = "id"
+VARIANT_SKU_HEADER = "variant sku"
+
+# exported columns which can be imported, other exported columns are ignored
+PRODUCT_FIELDS = {
+    "name": "name",
+    "visible": "is_published",
+    "searchable": "visible_in_listings",
+    "charge taxes": "charge_taxes",
+    "product weight": "weight",
+}
+VARIANT_FIELDS = {
+    "variant price": "price_amount",
+    "cost price": "cost_price_amount",
+    "variant weight": "weight",
+}
+
+ATTRIBUTE_HEADER = re.compile(
+    r"^(?P<slug>.+) \((?P<owner>product|variant) attribute\)$"
+)
+WAREHOUSE_HEADER = re.compile(r"^(?P<slug>.+) \(warehouse quantity\)$")
+
+
+@dataclass
+class ImportColumns:
+    """Headers of the imported file mapped to the updated data."""
+
+    product_fields: Dict[str, str] = field(default_factory=dict)
+    variant_fields: Dict[str, str] = field(default_factory=dict)
+    product_attributes: Dict[str, int] = field(default_factory=dict)
+    variant_attributes: Dict[str, int] = field(default_factory=dict)
+    warehouses: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ImportRow:
+    """Cleaned values of a single row of the imported file."""
+
+    number: int
+    product_id: Optional[int] = None
+    sku: Optional[str] = None
+    product_values: Dict[str, Any] = field(default_factory=dict)
+    variant_values: Dict[str, Any] = field(default_factory=dict)
+    # attribute pk to slugs of the values
+    product_attributes: Dict[int, List[str]] = field(default_factory=dict)
+    variant_attributes: Dict[int, List[str]] = field(default_factory=dict)
+    # warehouse pk to quantity
+    stocks: Dict[Any, int] = field(default_factory=dict)
+
+
+def import_products(import_file: "ImportFile", delimiter: str = ";"):
+    """Update products, variants, stocks and attributes from the imported file.
+
+    The file has the same layout as the file created by the product export.
+    Rows are identified by the variant SKU or, if it's not given, by the product ID.
+    Rows are validated and saved in batches; rows with invalid values are skipped
+    and their errors are stored on the import file.
+    """
+    file_type = get_file_type(import_file.content_file.name)
+
+    with import_file.content_file.open("rb") as file_obj:
+        import_file.total_rows = count_rows(file_obj, file_type, delimiter)
+        import_file.processed_rows = 0
+        import_file.errors = []
+        import_file.save(
+            update_fields=["total_rows", "processed_rows", "errors", "updated_at"]
+        )
+
+        file_obj.seek(0)
+        rows = read_rows(file_obj, file_type, delimiter)
+        headers = [str(header).strip() if header else "" for header in next(rows, [])]
+        errors: List[dict] = []
+        columns = get_import_columns(headers, errors)
+
+        price_changed_product_ids: Set[int] = set()
+        errors_count = len(errors)
+        for batch in rows_in_batches(rows, headers):
+            batch_errors: List[dict] = []
+            price_changed_product_ids.update(
+                import_products_batch(batch, columns, batch_errors)
+            )
+            errors_count += len(batch_errors)
+            errors.extend(batch_errors[: max(MAX_ERRORS - len(errors), 0)])
+
+            import_file.processed_rows += len(batch)
+            import_file.errors = errors
+            import_file.save(update_fields=["processed_rows", "errors", "updated_at"])
+
+    if errors_count > len(errors):
+        import_file.message = (
+            f"Found {errors_count} errors, showing first {MAX_ERRORS}."
+        )
+        import_file.save(update_fields=["message", "updated_at"])
+
+    product_ids = sorted(price_changed_product_ids)
+    for start in range(0, len(product_ids), BATCH_SIZE):
+        end = start + BATCH_SIZE
+        update_products_minimal_variant_prices_of_catalogues(
+            product_ids=product_ids[start:end]
+        )
+    invalidate_product_availabilities()
+
+
+def get_file_type(file_name: str) -> str:
+    if file_name.lower().endswith(f".{FileTypes.XLSX}"):
+        return FileTypes.XLSX
+    return FileTypes.CSV
+
+
+def count_rows(file_obj: IO[bytes], file_type: str, delimiter: str) -> int:
+    """Return the number of data rows in the file, the header is not counted."""
+    if file_type == FileTypes.XLSX:
+        workbook = openpyxl.load_workbook(file_obj, read_only=True)
+        rows_count = workbook.active.max_row or 0
+        workbook.close()
+    else:
+        rows_count = sum(1 for _ in read_rows(file_obj, file_type, delimiter))
+    return max(rows_count - 1, 0)
+
+
+def read_rows(file_obj: IO[bytes], file_type: str, delimiter: str) -> Iterator[list]:
+    if file_type == FileTypes.XLSX:
+        workbook = openpyxl.load_workbook(file_obj, read_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        stream = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(stream, delimiter=delimiter)
+        finally:
+            # keep the file open for the caller
+            if not file_obj.closed:
+                stream.detach()
+
+
+def rows_in_batches(
+    rows: Iterator[list], headers: List[str]
+) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Group rows into batches of rows numbers and values mapped to headers.
+
+    Row numbers are counted from 1, the first row is the header.
+    """
+    batch = []
+    for number, row in enumerate(rows, start=2):
+        batch.append((number, dict(zip(headers, row))))
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_import_columns(headers: List[str], errors: List[dict]) -> ImportColumns:
+    """Map headers to the imported fields, attributes and warehouses.
+
+    Columns which can't be imported are ignored.
+    """
+    if PRODUCT_ID_HEADER not in headers and VARIANT_SKU_HEADER not in headers:
+        raise ValidationError(
+            "The file must contain the id or the variant sku column.",
+            code=ImportErrorCode.REQUIRED.value,
+        )
+
+    columns = ImportColumns()
+    attribute_headers = {}
+    warehouse_headers = {}
+    for header in headers:
+        if header in PRODUCT_FIELDS:
+            columns.product_fields[header] = PRODUCT_FIELDS[header]
+        elif header in VARIANT_FIELDS:
+            columns.variant_fields[header] = VARIANT_FIELDS[header]
+        elif ATTRIBUTE_HEADER.match(header):
+            attribute_headers[header] = ATTRIBUTE_HEADER.match(header).group("slug")
+        elif WAREHOUSE_HEADER.match(header):
+            warehouse_headers[header] = WAREHOUSE_HEADER.match(header).group("slug")
+
+    attributes = dict(
+        Attribute.objects.filter(slug__in=attribute_headers.values()).values_list(
+            "slug", "pk"
+        )
+    )
+    for header, slug in attribute_headers.items():
+        if slug not in attributes:
+            errors.append(
+                get_error(
+                    1,
+                    header,
+                    f"Attribute {slug} does not exist.",
+                    ImportErrorCode.NOT_FOUND.value,
+                )
+            )
+        elif ATTRIBUTE_HEADER.match(header).group("owner") == "product":
+            columns.product_attributes[header] = attributes[slug]
+        else:
+            columns.variant_attributes[header] = attributes[slug]
+
+    warehouses = dict(
+        Warehouse.objects.filter(slug__in=warehouse_headers.values()).values_list(
+            "slug", "pk"
+        )
+    )
+    for header, slug in warehouse_headers.items():
+        if slug not in warehouses:
+            errors.append(
+                get_error(
+                    1,
+                    header,
+                    f"Warehouse {slug} does not exist.",
+                    ImportErrorCode.NOT_FOUND.value,
+                )
+            )
+        else:
+            columns.warehouses[header] = warehouses[slug]
+
+    return columns
+
+
+def get_error(row: int, header: Optional[str], message: str, code: str) -> dict:
+    return {"row": row, "field": header, "message": message, "code": code}
+
+
+def import_products_batch(
+    batch: List[Tuple[int, Dict[str, Any]]], columns: ImportColumns, errors: List[dict]
+) -> Set[int]:
+    """Validate and save a batch of rows.
+
+    Return IDs of products which prices of variants have changed.
+    """
+    rows = []
+    for number, data in batch:
+        row = clean_row(number, data, columns, errors)
+        if row:
+            rows.append(row)
+
+    skus = {row.sku for row in rows if row.sku}
+    variants = {
+        variant.sku: variant
+        for variant in ProductVariant.objects.filter(sku__in=skus).order_by("pk")
+    }
+    product_ids = {row.product_id for row in rows if row.product_id}
+    product_ids.update(variant.product_id for variant in variants.values())
+    products = Product.objects.in_bulk(product_ids)
+
+    valid_rows = []
+    for row in rows:
+        if resolve_row_instances(row, products, variants, errors):
+            valid_rows.append(row)
+
+    valid_rows = clean_rows_attributes(valid_rows, products, columns, errors)
+
+    with transaction.atomic():
+        update_products(valid_rows, products)
+        price_changed_product_ids = update_variants(valid_rows, variants)
+        update_stocks(valid_rows, variants)
+        update_products_attributes(valid_rows)
+        update_variants_attributes(valid_rows, variants)
+
+    return price_changed_product_ids
+
+
+def clean_row(
+    number: int, data: Dict[str, Any], columns: ImportColumns, errors: List[dict]
+) -> Optional[ImportRow]:
+    row = ImportRow(number=number)
+    row_errors = []
+
+    def clean(header, parser):
+        value = data.get(header)
+        if is_blank(value):
+            return None
+        try:
+            return parser(value)
+        except ValidationError as error:
+            row_errors.append(get_error(number, header, error.messages[0], error.code))
+            return None
+
+    row.product_id = clean(PRODUCT_ID_HEADER, parse_int)
+    sku = data.get(VARIANT_SKU_HEADER)
+    row.sku = None if is_blank(sku) else str(sku).strip()
+    if not row.product_id and not row.sku:
+        row_errors.append(
+            get_error(
+                number,
+                None,
+                "The product id or the variant sku is required.",
+                ImportErrorCode.REQUIRED.value,
+            )
+        )
+
+    for header, field_name in columns.product_fields.items():
+        value = clean(header, FIELD_PARSERS[field_name])
+        if value is not None:
+            row.product_values[field_name] = value
+    for header, field_name in columns.variant_fields.items():
+        value = clean(header, FIELD_PARSERS[field_name])
+        if value is not None:
+            row.variant_values[field_name] = value
+    for header, attribute_pk in columns.product_attributes.items():
+        value = clean(header, parse_list)
+        if value is not None:
+            row.product_attributes[attribute_pk] = value
+    for header, attribute_pk in columns.variant_attributes.items():
+        value = clean(header, parse_list)
+        if value is not None:
+            row.variant_attributes[attribute_pk] = value
+    for header, warehouse_pk in columns.warehouses.items():
+        value = clean(header, parse_quantity)
+        if value is not None:
+            row.stocks[warehouse_pk] = value
+
+    if not row.sku and (row.variant_values or row.variant_attributes or row.stocks):
+        row_errors.append(
+            get_error(
+                number,
+                VARIANT_SKU_HEADER,
+                "The variant sku is required to update variants.",
+                ImportErrorCode.REQUIRED.value,
+            )
+        )
+
+    errors.extend(row_errors)
+    return None if row_errors else row
+
+
+def resolve_row_instances(
+    row: ImportRow,
+    products: Dict[int, Product],
+    variants: Dict[str, ProductVariant],
+    errors: List[dict],
+) -> bool:
+    if row.sku:
+        variant = variants.get(row.sku)
+        if not variant:
+            errors.append(
+                get_error(
+                    row.number,
+                    VARIANT_SKU_HEADER,
+                    f"Variant with sku {row.sku} does not exist.",
+                    ImportErrorCode.NOT_FOUND.value,
+                )
+            )
+            return False
+        if row.product_id and row.product_id != variant.product_id:
+            errors.append(
+                get_error(
+                    row.number,
+                    PRODUCT_ID_HEADER,
+                    f"Variant with sku {row.sku} does not belong to the product.",
+                    ImportErrorCode.INVALID.value,
+                )
+            )
+            return False
+        row.product_id = variant.product_id
+    elif row.product_id not in products:
+        errors.append(
+            get_error(
+                row.number,
+                PRODUCT_ID_HEADER,
+                f"Product with id {row.product_id} does not exist.",
+                ImportErrorCode.NOT_FOUND.value,
+            )
+        )
+        return False
+    return True
+
+
+def clean_rows_attributes(
+    rows: List[ImportRow],
+    products: Dict[int, Product],
+    columns: ImportColumns,
+    errors: List[dict],
+) -> List[ImportRow]:
+    """Replace slugs of attribute values with assignments and values IDs.
+
+    Rows with values or attributes which can't be assigned to the product are
+    skipped.
+    """
+    if not columns.product_attributes and not columns.variant_attributes:
+        return rows
+
+    attribute_pks = set(columns.product_attributes.values()) | set(
+        columns.variant_attributes.values()
+    )
+    values = {
+        (attribute_pk, slug): pk
+        for pk, attribute_pk, slug in AttributeValue.objects.filter(
+            attribute_id__in=attribute_pks
+        ).values_list("pk", "attribute_id", "slug")
+    }
+    product_assignments = {
+        (product_type_id, attribute_pk): pk
+        for pk, product_type_id, attribute_pk in AttributeProduct.objects.filter(
+            attribute_id__in=columns.product_attributes.values()
+        ).values_list("pk", "product_type_id", "attribute_id")
+    }
+    variant_assignments = {
+        (product_type_id, attribute_pk): pk
+        for pk, product_type_id, attribute_pk in AttributeVariant.objects.filter(
+            attribute_id__in=columns.variant_attributes.values()
+        ).values_list("pk", "product_type_id", "attribute_id")
+    }
+    headers = {
+        attribute_pk: header
+        for header, attribute_pk in {
+            **columns.product_attributes,
+            **columns.variant_attributes,
+        }.items()
+    }
+
+    def clean_attributes(row, attributes, assignments, owner):
+        product_type_id = products[row.product_id].product_type_id
+        cleaned_attributes = {}
+        for attribute_pk, slugs in attributes.items():
+            header = headers[attribute_pk]
+            assignment_pk = assignments.get((product_type_id, attribute_pk))
+            if not assignment_pk:
+                errors.append(
+                    get_error(
+                        row.number,
+                        header,
+                        f"Attribute is not assigned to the {owner} type.",
+                        ImportErrorCode.INVALID.value,
+                    )
+                )
+                return None
+            value_pks = [values.get((attribute_pk, slug)) for slug in slugs]
+            if None in value_pks:
+                errors.append(
+                    get_error(
+                        row.number,
+                        header,
+                        "Attribute value does not exist.",
+                        ImportErrorCode.NOT_FOUND.value,
+                    )
+                )
+                return None
+            cleaned_attributes[assignment_pk] = value_pks
+        return cleaned_attributes
+
+    cleaned_rows = []
+    for row in rows:
+        product_attributes = clean_attributes(
+            row, row.product_attributes, product_assignments, "product"
+        )
+        variant_attributes = clean_attributes(
+            row, row.variant_attributes, variant_assignments, "variant"
+        )
+        if product_attributes is None or variant_attributes is None:
+            continue
+        row.product_attributes = product_attributes
+        row.variant_attributes = variant_attributes
+        cleaned_rows.append(row)
+    return cleaned_rows
+
+
+def update_products(rows: List[ImportRow], products: Dict[int, Product]):
+    products_to_update = {}
+    fields: Set[str] = set()
+    for row in rows:
+        if not row.product_values:
+            continue
+        product = products[row.product_id]
+        for field_name, value in row.product_values.items():
+            setattr(product, field_name, value)
+        fields.update(row.product_values)
+        products_to_update[product.pk] = product
+
+    if products_to_update:
+        updated_at = timezone.now()
+        for product in products_to_update.values():
+            product.updated_at = updated_at
+        Product.objects.bulk_update(
+            products_to_update.values(), sorted(fields) + ["updated_at"]
+        )
+
+
+def update_variants(
+    rows: List[ImportRow], variants: Dict[str, ProductVariant]
+) -> Set[int]:
+    variants_to_update = {}
+    price_changed_product_ids = set()
+    fields: Set[str] = set()
+    for row in rows:
+        if not row.variant_values:
+            continue
+        variant = variants[row.sku]
+        price = row.variant_values.get("price_amount")
+        if price is not None and price != variant.price_amount:
+            price_changed_product_ids.add(variant.product_id)
+        for field_name, value in row.variant_values.items():
+            setattr(variant, field_name, value)
+        fields.update(row.variant_values)
+        variants_to_update[variant.pk] = variant
+
+    if variants_to_update:
+        updated_at = timezone.now()
+        for variant in variants_to_update.values():
+            variant.updated_at = updated_at
+        ProductVariant.objects.bulk_update(
+            variants_to_update.values(), sorted(fields) + ["updated_at"]
+        )
+    return price_changed_product_ids
+
+
+def update_stocks(rows: List[ImportRow], variants: Dict[str, ProductVariant]):
+    quantities = {
+        (variants[row.sku].pk, warehouse_pk): quantity
+        for row in rows
+        for warehouse_pk, quantity in row.stocks.items()
+    }
+    if not quantities:
+        return
+
+    stocks = {
+        (stock.product_variant_id, stock.warehouse_id): stock
+        for stock in Stock.objects.select_for_update().filter(
+            product_variant_id__in={variant_pk for variant_pk, _ in quantities},
+            warehouse_id__in={warehouse_pk for _, warehouse_pk in quantities},
+        )
+    }
+    stocks_to_update = []
+    stocks_to_create = []
+    for (variant_pk, warehouse_pk), quantity in quantities.items():
+        stock = stocks.get((variant_pk, warehouse_pk))
+        if not stock:
+            stocks_to_create.append(
+                Stock(
+                    product_variant_id=variant_pk,
+                    warehouse_id=warehouse_pk,
+                    quantity=quantity,
+                )
+            )
+        elif stock.quantity != quantity:
+            stock.quantity = quantity
+            stocks_to_update.append(stock)
+
+    Stock.objects.bulk_update(stocks_to_update, ["quantity"])
+    Stock.objects.bulk_create(stocks_to_create)
+
+
+def update_products_attributes(rows: List[ImportRow]):
+    values = {
+        (row.product_id, assignment_pk): value_pks
+        for row in rows
+        for assignment_pk, value_pks in row.product_attributes.items()
+    }
+    assigned_attributes_pks = update_assigned_attributes(
+        AssignedProductAttribute, "product_id", values
+    )
+    update_products_attributes_sort_keys(
+        AssignedProductAttribute.objects.filter(pk__in=assigned_attributes_pks)
+    )
+
+
+def update_variants_attributes(
+    rows: List[ImportRow], variants: Dict[str, ProductVariant]
+):
+    values = {
+        (variants[row.sku].pk, assignment_pk): value_pks
+        for row in rows
+        for assignment_pk, value_pks in row.variant_attributes.items()
+    }
+    update_assigned_attributes(AssignedVariantAttribute, "variant_id", values)
+
+
+def update_assigned_attributes(
+    model, owner_field: str, values: Dict[Tuple[int, int], List[int]]
+) -> List[int]:
+    """Replace values of assigned attributes, missing assignments are created.
+
+    `values` maps pairs of the owner and the attribute assignment to the values.
+    Return pks of the updated assigned attributes.
+    """
+    if not values:
+        return []
+
+    owner_pks = {owner_pk for owner_pk, _ in values}
+    assignment_pks = {assignment_pk for _, assignment_pk in values}
+    assigned_attributes = {
+        (owner_pk, assignment_pk): pk
+        for pk, owner_pk, assignment_pk in model.objects.filter(
+            **{f"{owner_field}__in": owner_pks, "assignment_id__in": assignment_pks}
+        ).values_list("pk", owner_field, "assignment_id")
+    }
+    new_assigned_attributes = model.objects.bulk_create(
+        [
+            model(**{owner_field: owner_pk, "assignment_id": assignment_pk})
+            for owner_pk, assignment_pk in values
+            if (owner_pk, assignment_pk) not in assigned_attributes
+        ]
+    )
+    for assigned_attribute in new_assigned_attributes:
+        key = (
+            getattr(assigned_attribute, owner_field),
+            assigned_attribute.assignment_id,
+        )
+        assigned_attributes[key] = assigned_attribute.pk
+
+    through_model = model.values.through
+    through_field = model.values.field.m2m_field_name() + "_id"
+    through_model.objects.filter(
+        **{f"{through_field}__in": assigned_attributes.values()}
+    ).delete()
+
+    values_to_assign: Dict[int, List[int]] = defaultdict(list)
+    for key, value_pks in values.items():
+        values_to_assign[assigned_attributes[key]] = value_pks
+    through_model.objects.bulk_create(
+        [
+            through_model(**{through_field: pk, "attributevalue_id": value_pk})
+            for pk, value_pks in values_to_assign.items()
+            for value_pk in value_pks
+        ]
+    )
+    return list(values_to_assign)
+
+
+def is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def parse_int(value: Any) -> int:
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        number = None
+    if number is None or number != number.to_integral_value():
+        raise ValidationError(
+            "Enter a whole number.", code=ImportErrorCode.INVALID.value
+        )
+    return int(number)
+
+
+def parse_quantity(value: Any) -> int:
+    quantity = parse_int(value)
+    if quantity < 0:
+        raise ValidationError(
+            "Quantity can't be negative.", code=ImportErrorCode.INVALID.value
+        )
+    return quantity
+
+
+def parse_decimal(value: Any) -> Decimal:
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValidationError("Enter a number.", code=ImportErrorCode.INVALID.value)
+    if not amount.is_finite() or amount < 0:
+        raise ValidationError(
+            "Enter a positive number.", code=ImportErrorCode.INVALID.value
+        )
+    return amount
+
+
+def parse_price(value: Any) -> Decimal:
+    amount = parse_decimal(value)
+    # Price and cost price have the same precision, values not fitting it would
+    # fail the whole batch when saved
+    try:
+        ProductVariant._meta.get_field("price_amount").run_validators(amount)
+    except ValidationError as error:
+        raise ValidationError(error.messages[0], code=ImportErrorCode.INVALID.value)
+    return amount
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in ("true", "1", "yes"):
+        return True
+    if normalized in ("false", "0", "no"):
+        return False
+    raise ValidationError("Enter a boolean value.", code=ImportErrorCode.INVALID.value)
+
+
+def parse_name(value: Any) -> str:
+    name = str(value).strip()
+    if len(name) > Product._meta.get_field("name").max_length:
+        raise ValidationError("Name is too long.", code=ImportErrorCode.INVALID.value)
+    return name
+
+
+def parse_weight(value: Any) -> Weight:
+    """Parse weight in grams, the unit used in the product export."""
+    weight = str(value).strip()
+    if weight.endswith(" g"):
+        weight = weight[:-2]
+    return Weight(g=float(parse_decimal(weight)))
+
+
+def parse_list(value: Any) -> List[str]:
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+FIELD_PARSERS = {
+    "name": parse_name,
+    "is_published": parse_bool,
+    "visible_in_listings": parse_bool,
+    "charge_taxes": parse_bool,
+    "weight": parse_weight,
+    "price_amount": parse_price,
+    "cost_price_amount": parse_price,
+}
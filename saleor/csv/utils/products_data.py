@@ -1,6 +1,6 @@
 import os
 from collections import ChainMap, defaultdict
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from django.conf import settings
 from django.db.models import Case, CharField, Value as V, When
@@ -161,69 +161,88 @@ def get_warehouses_headers(export_info: Dict[str, list]) -> List[str]:
     return list(warehouses_headers)
 
 
-def get_products_data(
+def get_products_rows(
     queryset: "QuerySet",
     export_fields: Set[str],
+    headers: List[str],
     attribute_ids: Optional[List[int]],
     warehouse_ids: Optional[List[int]],
-) -> List[Dict[str, Union[str, bool]]]:
-    """Create data list of products and their variants with fields values.
+) -> Iterator[tuple]:
+    """Yield rows of products and their variants with values ordered as headers.
 
-    It return list with product and variant data which can be used as import to
-    csv writer and list of attribute and warehouse headers.
+    Only the columns required by the given headers are selected and relations
+    data is fetched only when relation fields, attributes or warehouses
+    are exported.
     """
-
-    products_with_variants_data = []
-
     product_fields = set(
         ProductExportFields.HEADERS_TO_FIELDS_MAPPING["fields"].values()
     )
-    product_export_fields = export_fields & product_fields
-    product_export_fields.add("variants__id")
-
-    products_data = (
-        queryset.annotate(
-            product_weight=Case(
-                When(weight__isnull=False, then=Concat("weight", V(" g"))),
-                default=V(""),
-                output_field=CharField(),
-            ),
-            variant_weight=Case(
-                When(
-                    variants__weight__isnull=False,
-                    then=Concat("variants__weight", V(" g")),
-                ),
-                default=V(""),
-                output_field=CharField(),
-            ),
+    selected_fields = [header for header in headers if header in product_fields]
+    relation_headers = [header for header in headers if header not in product_fields]
+
+    products_relations_data: Dict[int, Dict[str, str]] = {}
+    variants_relations_data: Dict[int, Dict[str, str]] = {}
+    if relation_headers:
+        products_relations_data = get_products_relations_data(
+            queryset, export_fields, attribute_ids
+        )
+        variants_relations_data = get_variants_relations_data(
+            queryset, export_fields, attribute_ids, warehouse_ids
         )
-        .order_by("pk", "variants__pk")
-        .values(*product_export_fields)
-        .distinct("pk", "variants__pk")
-    )
 
-    products_relations_data = get_products_relations_data(
-        queryset, export_fields, attribute_ids
-    )
+    # column index in the selected values or header of the relation data
+    columns = [
+        selected_fields.index(header) if header in product_fields else header
+        for header in headers
+    ]
 
-    variants_relations_data = get_variants_relations_data(
-        queryset, export_fields, attribute_ids, warehouse_ids
-    )
+    products_data = get_products_values_queryset(
+        queryset, set(selected_fields)
+    ).values_list("pk", "variants__id", *selected_fields)
 
-    for product_data in products_data:
-        pk = product_data["id"]
-        variant_pk = product_data.pop("variants__id")
+    for pk, variant_pk, *values in products_data.iterator():
+        if not relation_headers:
+            yield tuple(values)
+            continue
 
-        product_relations_data: Dict[str, str] = products_relations_data.get(pk, {})
-        variant_relations_data: Dict[str, str] = variants_relations_data.get(
-            variant_pk, {}
+        relations_data = {
+            **products_relations_data.get(pk, {}),
+            **variants_relations_data.get(variant_pk, {}),
+        }
+        yield tuple(
+            values[column]
+            if isinstance(column, int)
+            else relations_data.get(column, " ")
+            for column in columns
         )
 
-        data = {**product_data, **product_relations_data, **variant_relations_data}
 
-        products_with_variants_data.append(data)
+def get_products_values_queryset(queryset: "QuerySet", fields: Set[str]) -> "QuerySet":
+    """Return queryset with product variant rows ordered by product and variant.
 
-    return products_with_variants_data
+    Weights are formatted in the database only if they are exported.
+    """
+    annotations = {}
+    if "product_weight" in fields:
+        annotations["product_weight"] = Case(
+            When(weight__isnull=False, then=Concat("weight", V(" g"))),
+            default=V(""),
+            output_field=CharField(),
+        )
+    if "variant_weight" in fields:
+        annotations["variant_weight"] = Case(
+            When(
+                variants__weight__isnull=False,
+                then=Concat("variants__weight", V(" g")),
+            ),
+            default=V(""),
+            output_field=CharField(),
+        )
+    return (
+        queryset.annotate(**annotations)
+        .order_by("pk", "variants__pk")
+        .distinct("pk", "variants__pk")
+    )
 
 
 def get_products_relations_data(
@@ -1,26 +1,35 @@
 import csv
 import gzip
-from typing import Iterable
+import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.contrib.syndication.views import add_domain
 from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.utils.encoding import smart_text
 from django_countries.fields import Country
 
 from ..core.taxes import charge_taxes_on_shipping
-from ..discount import DiscountInfo
+from ..discount import DiscountInfo, DiscountInfoList
 from ..discount.utils import fetch_discounts
 from ..plugins.manager import get_plugins_manager
 from ..product.models import Attribute, AttributeValue, Category, ProductVariant
-from ..warehouse.availability import is_variant_in_stock
+from ..warehouse.availability import get_in_stock_variant_ids, is_variant_in_stock
+from .models import FeedItem
 
 CATEGORY_SEPARATOR = " > "
 
 FILE_PATH = "google-feed.csv.gz"
 
+# Number of variants rendered at once, each chunk is a separate gzip member
+CHUNK_SIZE = 2000
+
 ATTRIBUTES = [
     "id",
     "title",
@@ -53,6 +62,7 @@ def get_feed_items():
     items = items.prefetch_related(
         "images",
         "product__category",
+        "product__collections",
         "product__images",
         "product__product_type__product_attributes",
         "product__product_type__variant_attributes",
@@ -122,17 +132,26 @@ def item_tax(
     item: ProductVariant,
     discounts: Iterable[DiscountInfo],
     is_charge_taxes_on_shipping: bool,
+    tax_rates: Optional[Dict[int, Optional[int]]] = None,
 ):
     """Return item tax.
 
     For some countries you need to set tax info
     Read more:
     https://support.google.com/merchants/answer/6324454
+
+    Tax rates calculated for product types are stored in `tax_rates` if given.
     """
     country = Country(settings.DEFAULT_COUNTRY)
-    tax_rate = get_plugins_manager().get_tax_rate_percentage_value(
-        item.product.product_type, country
-    )
+    product_type = item.product.product_type
+    if tax_rates is not None and product_type.pk in tax_rates:
+        tax_rate = tax_rates[product_type.pk]
+    else:
+        tax_rate = get_plugins_manager().get_tax_rate_percentage_value(
+            product_type, country
+        )
+        if tax_rates is not None:
+            tax_rates[product_type.pk] = tax_rate
     if tax_rate:
         tax_ship = "yes" if is_charge_taxes_on_shipping else "no"
         return "%s::%s:%s" % (country.code, tax_rate, tax_ship)
@@ -151,8 +170,14 @@ def item_image_link(item: ProductVariant, current_site):
     return None
 
 
-def item_availability(item: ProductVariant):
-    if is_variant_in_stock(item, settings.DEFAULT_COUNTRY):
+def item_availability(
+    item: ProductVariant, in_stock_variant_ids: Optional[Set[int]] = None
+):
+    if in_stock_variant_ids is not None:
+        in_stock = item.pk in in_stock_variant_ids
+    else:
+        in_stock = is_variant_in_stock(item, settings.DEFAULT_COUNTRY)
+    if in_stock:
         return "in stock"
     return "out of stock"
 
@@ -176,6 +201,21 @@ def item_google_product_category(item: ProductVariant, category_paths):
     return category_path
 
 
+def get_category_paths() -> Dict[int, str]:
+    """Return paths of all categories as used by `item_google_product_category`."""
+    category_paths: Dict[int, str] = {}
+    categories = Category.objects.order_by("tree_id", "lft").values_list(
+        "pk", "parent_id", "name"
+    )
+    # Tree ordering guarantees that parents are listed before their children
+    for pk, parent_id, name in categories:
+        if parent_id is None:
+            category_paths[pk] = name
+        else:
+            category_paths[pk] = category_paths[parent_id] + CATEGORY_SEPARATOR + name
+    return category_paths
+
+
 def item_price(item: ProductVariant):
     price = item.get_price(discounts=None)
     return "%s %s" % (price.amount, price.currency)
@@ -195,6 +235,8 @@ def item_attributes(
     attributes_dict,
     attribute_values_dict,
     is_charge_taxes_on_shipping: bool,
+    in_stock_variant_ids: Optional[Set[int]] = None,
+    tax_rates: Optional[Dict[int, Optional[int]]] = None,
 ):
     product_data = {
         "id": item_id(item),
@@ -203,7 +245,7 @@ def item_attributes(
         "condition": item_condition(item),
         "mpn": item_mpn(item),
         "item_group_id": item_group_id(item),
-        "availability": item_availability(item),
+        "availability": item_availability(item, in_stock_variant_ids),
         "google_product_category": item_google_product_category(item, category_paths),
     }
 
@@ -217,7 +259,7 @@ def item_attributes(
     if sale_price != price:
         product_data["sale_price"] = sale_price
 
-    tax = item_tax(item, discounts, is_charge_taxes_on_shipping)
+    tax = item_tax(item, discounts, is_charge_taxes_on_shipping, tax_rates)
     if tax:
         product_data["tax"] = tax
 
@@ -228,39 +270,240 @@ def item_attributes(
     return product_data
 
 
-def write_feed(file_obj):
-    """Write feed contents info provided file object."""
-    is_charge_taxes_on_shipping = charge_taxes_on_shipping()
+@dataclass
+class FeedContext:
+    """Data shared by all items of the feed."""
+
+    categories: Iterable[Category]
+    category_paths: Dict[int, str]
+    current_site: Site
+    discounts: List[DiscountInfo]
+    attributes_dict: Dict[str, int]
+    attribute_values_dict: Dict[str, str]
+    is_charge_taxes_on_shipping: bool
+    tax_rates: Dict[int, Optional[int]]
+
+
+def get_feed_context() -> FeedContext:
+    return FeedContext(
+        categories=Category.objects.all(),
+        category_paths=get_category_paths(),
+        current_site=Site.objects.get_current(),
+        discounts=fetch_discounts(timezone.now()),
+        attributes_dict={a.slug: a.pk for a in Attribute.objects.all()},
+        attribute_values_dict={
+            smart_text(a.pk): smart_text(a) for a in AttributeValue.objects.all()
+        },
+        is_charge_taxes_on_shipping=charge_taxes_on_shipping(),
+        tax_rates={},
+    )
+
+
+def get_feed_chunks(chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+    """Yield ranges of feed items' pks, each of them holding up to `chunk_size` items.
+
+    Only pks are fetched from the database, in batches of `chunk_size`.
+    """
+    first_pk = last_pk = None
+    count = 0
+    pks = ProductVariant.objects.order_by("pk").values_list("pk", flat=True)
+    for pk in pks.iterator(chunk_size=chunk_size):
+        if first_pk is None:
+            first_pk = pk
+        last_pk = pk
+        count += 1
+        if count == chunk_size:
+            yield first_pk, last_pk
+            first_pk = None
+            count = 0
+    if first_pk is not None:
+        yield first_pk, last_pk  # type: ignore
+
+
+def write_feed_header(file_obj):
     writer = csv.DictWriter(file_obj, ATTRIBUTES, dialect=csv.excel_tab)
     writer.writeheader()
-    categories = Category.objects.all()
-    discounts = fetch_discounts(timezone.now())
-    attributes_dict = {a.slug: a.pk for a in Attribute.objects.all()}
-    attribute_values_dict = {
-        smart_text(a.pk): smart_text(a) for a in AttributeValue.objects.all()
-    }
-    category_paths = {}
-    current_site = Site.objects.get_current()
-    for item in get_feed_items():
+
+
+def get_feed_rows(
+    items: Iterable[ProductVariant], context: FeedContext
+) -> Iterator[Tuple[ProductVariant, str, bool]]:
+    """Yield given items with their feed rows and stock availability.
+
+    Stock availability of all the items is fetched at once.
+    """
+    items = list(items)
+    in_stock_variant_ids = get_in_stock_variant_ids(items, settings.DEFAULT_COUNTRY)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, ATTRIBUTES, dialect=csv.excel_tab)
+    for item in items:
         item_data = item_attributes(
             item,
-            categories,
-            category_paths,
-            current_site,
-            discounts,
-            attributes_dict,
-            attribute_values_dict,
-            is_charge_taxes_on_shipping,
+            context.categories,
+            context.category_paths,
+            context.current_site,
+            context.discounts,
+            context.attributes_dict,
+            context.attribute_values_dict,
+            context.is_charge_taxes_on_shipping,
+            in_stock_variant_ids=in_stock_variant_ids,
+            tax_rates=context.tax_rates,
         )
         writer.writerow(item_data)
+        yield item, buffer.getvalue(), item.pk in in_stock_variant_ids
+        buffer.seek(0)
+        buffer.truncate()
+
 
+def write_feed_items(file_obj, items: Iterable[ProductVariant], context: FeedContext):
+    """Write feed rows of given items into provided file object."""
+    for _item, row, _in_stock in get_feed_rows(items, context):
+        file_obj.write(row)
 
-def update_feed(file_path=FILE_PATH):
+
+def write_feed(file_obj, chunk_size: int = CHUNK_SIZE):
+    """Write feed contents info provided file object."""
+    context = get_feed_context()
+    write_feed_header(file_obj)
+    for first_pk, last_pk in get_feed_chunks(chunk_size):
+        items = get_feed_items().filter(pk__gte=first_pk, pk__lte=last_pk)
+        write_feed_items(file_obj, items.order_by("pk"), context)
+
+
+def render_feed_chunk(pk_range: Tuple[int, int], context: FeedContext) -> bytes:
+    """Return gzip compressed feed rows of items from given range of pks."""
+    first_pk, last_pk = pk_range
+    items = get_feed_items().filter(pk__gte=first_pk, pk__lte=last_pk)
+    buffer = io.StringIO()
+    write_feed_items(buffer, items.order_by("pk"), context)
+    return gzip.compress(buffer.getvalue().encode("utf-8"))
+
+
+_worker_context: Optional[FeedContext] = None
+
+
+def _init_feed_worker():
+    global _worker_context
+    _worker_context = get_feed_context()
+
+
+def _render_feed_chunk_in_worker(pk_range: Tuple[int, int]) -> bytes:
+    return render_feed_chunk(pk_range, _worker_context)  # type: ignore
+
+
+def render_feed_chunks(workers: int = 1, chunk_size: int = CHUNK_SIZE):
+    """Yield gzip compressed feed rows, chunk by chunk, in the order of items' pks.
+
+    With more than one worker, chunks are rendered in a pool of processes.
+    """
+    if workers <= 1:
+        context = get_feed_context()
+        for pk_range in get_feed_chunks(chunk_size):
+            yield render_feed_chunk(pk_range, context)
+        return
+
+    chunks = list(get_feed_chunks(chunk_size))
+    # Forked workers can not share database connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_feed_worker
+    ) as executor:
+        yield from executor.map(_render_feed_chunk_in_worker, chunks)
+
+
+def get_stale_feed_item_ids(discounts_key: str, chunk_size: int = CHUNK_SIZE):
+    """Return pks of variants with missing or outdated stored feed rows.
+
+    A row is outdated when its variant or product was updated after the row was
+    rendered, or when stock availability of the variant or active discounts
+    changed since then.
+    """
+    stale_ids = set(
+        ProductVariant.objects.filter(
+            Q(feed_item__isnull=True)
+            | Q(feed_item__rendered_at__lt=F("updated_at"))
+            | Q(feed_item__rendered_at__lt=F("product__updated_at"))
+            | ~Q(feed_item__discounts_key=discounts_key)
+        ).values_list("pk", flat=True)
+    )
+    for first_pk, last_pk in get_feed_chunks(chunk_size):
+        variants = ProductVariant.objects.filter(
+            pk__gte=first_pk, pk__lte=last_pk
+        ).only("pk", "track_inventory")
+        in_stock_ids = get_in_stock_variant_ids(variants, settings.DEFAULT_COUNTRY)
+        feed_items = FeedItem.objects.filter(
+            variant_id__gte=first_pk, variant_id__lte=last_pk
+        ).values_list("variant_id", "in_stock")
+        for variant_id, in_stock in feed_items:
+            if in_stock != (variant_id in in_stock_ids):
+                stale_ids.add(variant_id)
+    return stale_ids
+
+
+def refresh_feed_items(chunk_size: int = CHUNK_SIZE) -> int:
+    """Render and store feed rows of variants whose rows are missing or outdated.
+
+    Return the number of rendered rows.
+    """
+    rendered_at = timezone.now()
+    context = get_feed_context()
+    discounts_key = DiscountInfoList(context.discounts).cache_key
+    stale_ids = sorted(get_stale_feed_item_ids(discounts_key, chunk_size))
+    for start in range(0, len(stale_ids), chunk_size):
+        end = start + chunk_size
+        pks = stale_ids[start:end]
+        items = get_feed_items().filter(pk__in=pks).order_by("pk")
+        feed_items = [
+            FeedItem(
+                variant=item,
+                row=row,
+                in_stock=in_stock,
+                discounts_key=discounts_key,
+                rendered_at=rendered_at,
+            )
+            for item, row, in_stock in get_feed_rows(items, context)
+        ]
+        with transaction.atomic():
+            FeedItem.objects.filter(variant_id__in=pks).delete()
+            FeedItem.objects.bulk_create(feed_items)
+    return len(stale_ids)
+
+
+def get_stored_feed_chunks(chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield gzip compressed stored feed rows, chunk by chunk, ordered by pk."""
+    rows = FeedItem.objects.order_by("variant_id").values_list("row", flat=True)
+    chunk: List[str] = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield gzip.compress("".join(chunk).encode("utf-8"))
+            chunk = []
+    if chunk:
+        yield gzip.compress("".join(chunk).encode("utf-8"))
+
+
+def update_feed(
+    file_path=FILE_PATH,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    incremental: bool = False,
+):
     """Save updated feed into path provided as argument.
 
-    Default path is defined in module as FILE_PATH.
+    Default path is defined in module as FILE_PATH. The file is a concatenation
+    of gzip members, one for the header and one for every chunk of items.
+
+    In the incremental mode only rows of changed variants are rendered and stored,
+    and the feed is assembled from all the stored rows.
     """
+    if incremental:
+        refresh_feed_items(chunk_size)
+        chunks = get_stored_feed_chunks(chunk_size)
+    else:
+        chunks = render_feed_chunks(workers, chunk_size)
+    header = io.StringIO()
+    write_feed_header(header)
     with default_storage.open(file_path, "wb") as output_file:
-        output = gzip.open(output_file, "wt")
-        write_feed(output)
-        output.close()
+        output_file.write(gzip.compress(header.getvalue().encode("utf-8")))
+        for chunk in chunks:
+            output_file.write(chunk)
@@ -1,10 +1,33 @@
 from django.core.management import BaseCommand
 
-from ...google_merchant import update_feed
+from ...google_merchant import CHUNK_SIZE, update_feed
 
 
 class Command(BaseCommand):
     help = "Update Google merchant feed"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes rendering the feed.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Number of product variants rendered at once by a process.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Render only rows of changed product variants.",
+        )
+
     def handle(self, *args, **options):
-        update_feed()
+        update_feed(
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            incremental=options["incremental"],
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2020-08-24 08:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("product", "0132_productvariant_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedItem",
+            fields=[
+                (
+                    "variant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="feed_item",
+                        serialize=False,
+                        to="product.productvariant",
+                    ),
+                ),
+                ("row", models.TextField()),
+                ("in_stock", models.BooleanField()),
+                ("discounts_key", models.CharField(max_length=64)),
+                ("rendered_at", models.DateTimeField()),
+            ],
+            options={"ordering": ("variant",)},
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+from ..product.models import ProductVariant
+
+
+class FeedItem(models.Model):
+    """Rendered row of a product variant in the Google Merchant feed."""
+
+    variant = models.OneToOneField(
+        ProductVariant,
+        primary_key=True,
+        related_name="feed_item",
+        on_delete=models.CASCADE,
+    )
+    row = models.TextField()
+    in_stock = models.BooleanField()
+    discounts_key = models.CharField(max_length=64)
+    rendered_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("variant",)
@@ -0,0 +1,67 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ....product.models import Category, Product, ProductVariant
+from ....warehouse.models import Stock
+from ...google_merchant import write_feed
+
+CATEGORIES_COUNT = 10
+PRODUCTS_COUNT = 300
+CHUNK_SIZE = 100
+
+
+def _generate_catalog(product_type, warehouse):
+    parent = Category.objects.create(name="Parent", slug="parent")
+    categories = [
+        Category.objects.create(
+            name=f"Category {i}", slug=f"category-{i}", parent=parent
+        )
+        for i in range(CATEGORIES_COUNT)
+    ]
+    products = Product.objects.bulk_create(
+        [
+            Product(
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                product_type=product_type,
+                category=categories[i % CATEGORIES_COUNT],
+            )
+            for i in range(PRODUCTS_COUNT)
+        ]
+    )
+    variants = ProductVariant.objects.bulk_create(
+        [
+            ProductVariant(product=product, sku=str(i), price_amount=Decimal(10))
+            for i, product in enumerate(products)
+        ]
+    )
+    Stock.objects.bulk_create(
+        [
+            Stock(product_variant=variant, warehouse=warehouse, quantity=i % 2)
+            for i, variant in enumerate(variants)
+        ]
+    )
+
+
+def _write_feed(chunk_size):
+    buffer = StringIO()
+    with CaptureQueriesContext(connection) as queries:
+        write_feed(buffer, chunk_size=chunk_size)
+    return buffer.getvalue(), len(queries)
+
+
+def test_write_feed_queries_per_chunk(product_type, warehouse, site_settings):
+    _generate_catalog(product_type, warehouse)
+
+    feed, queries_count = _write_feed(CHUNK_SIZE)
+    smaller_chunks_feed, smaller_chunks_queries_count = _write_feed(CHUNK_SIZE // 2)
+
+    assert smaller_chunks_feed == feed
+    assert feed.count("in stock") == PRODUCTS_COUNT // 2
+    # Queries depend on the number of chunks, not on the number of variants
+    chunks_count = PRODUCTS_COUNT // CHUNK_SIZE
+    assert (smaller_chunks_queries_count - queries_count) % chunks_count == 0
+    assert queries_count < PRODUCTS_COUNT // 5
@@ -1,4 +1,5 @@
 import csv
+import gzip
 from io import StringIO
 from unittest.mock import Mock
 
@@ -6,15 +7,21 @@ from django.utils.encoding import smart_text
 from django_prices_vatlayer.models import VAT
 
 from ...core.taxes import charge_taxes_on_shipping
+from ...discount.models import Sale
 from ...product.models import AttributeValue, Category
 from ..google_merchant import (
+    get_category_paths,
+    get_feed_chunks,
     get_feed_items,
     item_attributes,
     item_availability,
     item_google_product_category,
     item_tax,
+    refresh_feed_items,
+    update_feed,
     write_feed,
 )
+from ..models import FeedItem
 
 
 def test_saleor_feed_items(product, discount_info, site_settings):
@@ -93,3 +100,107 @@ def test_write_feed(product, monkeypatch):
     ]
     for field in google_required_fields:
         assert field in header
+
+
+def test_category_paths(categories_tree):
+    child = categories_tree.children.first()
+
+    category_paths = get_category_paths()
+
+    assert category_paths[categories_tree.pk] == categories_tree.name
+    assert category_paths[child.pk] == item_google_product_category(
+        Mock(product=Mock(category=child)), {}
+    )
+
+
+def test_feed_chunks(product_list):
+    variant_pks = sorted(
+        variant.pk for product in product_list for variant in product.variants.all()
+    )
+
+    chunks = list(get_feed_chunks(chunk_size=2))
+
+    assert chunks[0] == (variant_pks[0], variant_pks[1])
+    assert chunks[-1][1] == variant_pks[-1]
+    assert len(chunks) == (len(variant_pks) + 1) // 2
+
+
+def test_write_feed_in_chunks(product_list, site_settings):
+    buffer = StringIO()
+    write_feed(buffer)
+    chunked_buffer = StringIO()
+    write_feed(chunked_buffer, chunk_size=1)
+
+    assert chunked_buffer.getvalue() == buffer.getvalue()
+
+
+def test_update_feed(product_list, site_settings, settings, tmpdir):
+    settings.MEDIA_ROOT = str(tmpdir)
+    buffer = StringIO()
+    write_feed(buffer)
+
+    update_feed(file_path="feed.csv.gz", chunk_size=2)
+
+    with gzip.open(tmpdir.join("feed.csv.gz"), "rt", newline="") as feed:
+        assert feed.read() == buffer.getvalue()
+
+
+def test_refresh_feed_items(product_list, site_settings):
+    variants_count = len(product_list)
+
+    assert refresh_feed_items() == variants_count
+    assert FeedItem.objects.count() == variants_count
+    assert refresh_feed_items() == 0
+
+
+def test_refresh_feed_items_changed_variant(product_list, site_settings):
+    refresh_feed_items()
+    variant = product_list[0].variants.get()
+    variant.price_amount = 100
+    variant.save()
+
+    assert refresh_feed_items() == 1
+    assert "100.000 USD" in FeedItem.objects.get(variant=variant).row
+
+
+def test_refresh_feed_items_changed_product(product_list, site_settings):
+    refresh_feed_items()
+    product = product_list[0]
+    product.name = "New name"
+    product.save()
+
+    assert refresh_feed_items() == 1
+
+
+def test_refresh_feed_items_changed_stock(product_list, site_settings):
+    refresh_feed_items()
+    variant = product_list[0].variants.get()
+    assert FeedItem.objects.get(variant=variant).in_stock
+    variant.stocks.update(quantity=0)
+
+    assert refresh_feed_items() == 1
+    assert not FeedItem.objects.get(variant=variant).in_stock
+
+
+def test_refresh_feed_items_changed_discounts(product_list, site_settings):
+    refresh_feed_items()
+    sale = Sale.objects.create(name="Sale", value=5)
+    sale.products.add(product_list[0])
+
+    assert refresh_feed_items() == len(product_list)
+
+
+def test_update_feed_incremental(product_list, site_settings, settings, tmpdir):
+    settings.MEDIA_ROOT = str(tmpdir)
+    update_feed(file_path="feed.csv.gz")
+    refresh_feed_items()
+    variant = product_list[0].variants.get()
+    variant.price_amount = 100
+    variant.save()
+
+    update_feed(file_path="feed.csv.gz", chunk_size=2)
+    update_feed(file_path="incremental.csv.gz", chunk_size=2, incremental=True)
+
+    with gzip.open(tmpdir.join("feed.csv.gz"), "rt", newline="") as feed:
+        with gzip.open(tmpdir.join("incremental.csv.gz"), "rt", newline="") as new:
+            assert new.read() == feed.read()
@@ -1,7 +1,10 @@
+import hashlib
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, List, Set, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Union
 
 from django.conf import settings
+from django.utils.functional import cached_property
 
 if TYPE_CHECKING:
     # flake8: noqa
@@ -36,3 +39,59 @@ class DiscountInfo:
     product_ids: Union[List[int], Set[int]]
     category_ids: Union[List[int], Set[int]]
     collection_ids: Union[List[int], Set[int]]
+
+
+class DiscountsIndex:
+    """Map products, categories and collections to discounts applying to them."""
+
+    def __init__(self, discounts: Iterable[DiscountInfo]):
+        self.by_product: Dict[int, List[int]] = defaultdict(list)
+        self.by_category: Dict[int, List[int]] = defaultdict(list)
+        self.by_collection: Dict[int, List[int]] = defaultdict(list)
+        self.discounts = list(discounts)
+        for position, discount in enumerate(self.discounts):
+            for product_id in discount.product_ids:
+                self.by_product[product_id].append(position)
+            for category_id in discount.category_ids:
+                self.by_category[category_id].append(position)
+            for collection_id in discount.collection_ids:
+                self.by_collection[collection_id].append(position)
+
+    def get_discounts(
+        self,
+        product_id: int,
+        category_id: Optional[int],
+        collection_ids: Iterable[int],
+    ) -> List[DiscountInfo]:
+        """Return discounts that may apply to a product, in their original order."""
+        positions = set(self.by_product.get(product_id, ()))
+        positions.update(self.by_category.get(category_id, ()))  # type: ignore
+        for collection_id in collection_ids:
+            positions.update(self.by_collection.get(collection_id, ()))
+        return [self.discounts[position] for position in sorted(positions)]
+
+
+class DiscountInfoList(list):
+    """List of discounts indexed by the catalogue objects they apply to.
+
+    The list must not be modified once the index is used.
+    """
+
+    @cached_property
+    def discounts_index(self) -> DiscountsIndex:
+        return DiscountsIndex(self)
+
+    @cached_property
+    def cache_key(self) -> str:
+        """Return a key that changes whenever any of the discounts changes."""
+        key = hashlib.sha256()
+        for discount in self:
+            sale = discount.sale
+            key.update(repr((sale.pk, sale.type, str(sale.value))).encode())
+            for ids in (
+                discount.product_ids,
+                discount.category_ids,
+                discount.collection_ids,
+            ):
+                key.update(repr(sorted(ids)).encode())
+        return key.hexdigest()
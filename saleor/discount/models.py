@@ -4,12 +4,15 @@ from functools import partial
 from django.conf import settings
 from django.db import models
 from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django_countries.fields import CountryField
 from django_prices.models import MoneyField
 from django_prices.templatetags.prices import amount
 from prices import Money, fixed_discount, percentage_discount
 
+from ..core.cache import invalidate_now_and_on_commit
 from ..core.permissions import DiscountPermissions
 from ..core.utils.translations import TranslationProxy
 from . import DiscountValueType, VoucherType
@@ -180,6 +183,19 @@ class SaleQueryset(models.QuerySet):
             date = timezone.now()
         return self.filter(end_date__lt=date, start_date__lt=date)
 
+    def started_or_ended(self, since, until):
+        """Return sales which became active or inactive between the given dates.
+
+        Sales are active from their start date to their end date, inclusive.
+        Without `since` all sales which started or ended until `until` are returned.
+        """
+        if since is None:
+            return self.filter(Q(start_date__lte=until) | Q(end_date__lt=until))
+        return self.filter(
+            Q(start_date__gt=since, start_date__lte=until)
+            | Q(end_date__gte=since, end_date__lt=until)
+        )
+
 
 class VoucherTranslation(models.Model):
     language_code = models.CharField(max_length=10)
@@ -253,3 +269,15 @@ class SaleTranslation(models.Model):
     class Meta:
         ordering = ("language_code", "name", "pk")
         unique_together = (("language_code", "sale"),)
+
+
+@receiver([post_save, post_delete], sender=Sale)
+@receiver(m2m_changed, sender=Sale.products.through)
+@receiver(m2m_changed, sender=Sale.categories.through)
+@receiver(m2m_changed, sender=Sale.collections.through)
+# Sales apply to subcategories of their categories too
+@receiver([post_save, post_delete], sender="product.Category")
+def handle_sale_change(**_kwargs):
+    from .utils import invalidate_discounts
+
+    invalidate_now_and_on_commit(invalidate_discounts)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from prices import Money
+
+from ....product.models import Collection, Product
+from ... import DiscountInfo, DiscountInfoList, DiscountValueType
+from ...models import Sale
+from ...utils import (
+    calculate_discounted_price,
+    get_product_discount_on_sale,
+    get_product_discounts,
+)
+
+PRODUCTS_COUNT = 1000
+SALES_COUNT = 50
+CATEGORIES_COUNT = 100
+COLLECTIONS_COUNT = 20
+
+
+def _get_discounts():
+    discounts = []
+    for i in range(SALES_COUNT):
+        sale = Sale(
+            pk=i + 1,
+            name=f"Sale {i}",
+            type=DiscountValueType.PERCENTAGE,
+            value=Decimal(i % 30 + 1),
+        )
+        discounts.append(
+            DiscountInfo(
+                sale=sale,
+                product_ids={(i * 37 + j) % PRODUCTS_COUNT + 1 for j in range(20)},
+                category_ids={(i * 7 + j) % CATEGORIES_COUNT + 1 for j in range(2)},
+                collection_ids={i % COLLECTIONS_COUNT + 1},
+            )
+        )
+    return discounts
+
+
+def _get_products():
+    return [
+        (
+            Product(pk=i + 1, category_id=i % CATEGORIES_COUNT + 1),
+            [Collection(pk=(i * 3) % (COLLECTIONS_COUNT * 5) + 1)],
+        )
+        for i in range(PRODUCTS_COUNT)
+    ]
+
+
+def _price_products(products, discounts):
+    """Return prices of the products and the number of discounts evaluated."""
+    with patch(
+        "saleor.discount.utils.get_product_discount_on_sale",
+        wraps=get_product_discount_on_sale,
+    ) as mocked_get_discount:
+        prices = [
+            calculate_discounted_price(
+                product=product,
+                price=Money(100, "USD"),
+                collections=collections,
+                discounts=discounts,
+            )
+            for product, collections in products
+        ]
+    return prices, mocked_get_discount.call_count
+
+
+def test_calculate_discounted_price_with_indexed_discounts():
+    products = _get_products()
+    discounts = _get_discounts()
+    indexed_discounts = DiscountInfoList(discounts)
+    applicable_discounts_count = sum(
+        len(
+            list(
+                get_product_discounts(
+                    product=product, collections=collections, discounts=discounts
+                )
+            )
+        )
+        for product, collections in products
+    )
+
+    prices, scanned_count = _price_products(products, discounts)
+    indexed_prices, indexed_count = _price_products(products, indexed_discounts)
+
+    assert indexed_prices == prices
+    assert prices != [Money(100, "USD")] * PRODUCTS_COUNT
+    # Every sale is evaluated for every product without the index and only the
+    # sales applying to the product with it
+    assert scanned_count == PRODUCTS_COUNT * SALES_COUNT
+    assert indexed_count == applicable_discounts_count
@@ -7,12 +7,13 @@ from prices import Money
 
 from ...checkout.utils import get_voucher_discount_for_checkout
 from ...product.models import Product, ProductVariant
-from .. import DiscountInfo, DiscountValueType, VoucherType
+from .. import DiscountInfo, DiscountInfoList, DiscountValueType, VoucherType
 from ..models import NotApplicable, Sale, Voucher, VoucherCustomer
 from ..templatetags.voucher import discount_as_negative
 from ..utils import (
     add_voucher_usage_by_customer,
     decrease_voucher_usage,
+    fetch_discounts,
     get_product_discount_on_sale,
     increase_voucher_usage,
     remove_voucher_usage_by_customer,
@@ -330,6 +331,50 @@ def test_sale_active(current_date, start_date, end_date, is_active):
     assert is_active == sale_is_active
 
 
+@pytest.mark.parametrize(
+    "start_date, end_date, is_returned",
+    (
+        # Started after the previous check
+        (date_time_now + timedelta(hours=1), None, True),
+        # Started at the time of the check
+        (date_time_now + timedelta(hours=2), None, True),
+        # Started at the time of the previous check
+        (date_time_now, None, False),
+        # Ended before the check
+        (date_time_now - timedelta(days=1), date_time_now + timedelta(hours=1), True),
+        # Ended at the time of the previous check
+        (date_time_now - timedelta(days=1), date_time_now, True),
+        # Ended at the time of the check
+        (date_time_now - timedelta(days=1), date_time_now + timedelta(hours=2), False),
+        # Active during the whole period
+        (date_time_now - timedelta(days=1), date_time_now + timedelta(days=1), False),
+        # Ended before the previous check
+        (date_time_now - timedelta(days=2), date_time_now - timedelta(days=1), False),
+    ),
+)
+def test_sale_started_or_ended(start_date, end_date, is_returned):
+    Sale.objects.create(
+        type=DiscountValueType.FIXED, value=5, start_date=start_date, end_date=end_date
+    )
+    sales = Sale.objects.started_or_ended(
+        since=date_time_now, until=date_time_now + timedelta(hours=2)
+    )
+    assert sales.exists() == is_returned
+
+
+def test_sale_started_or_ended_without_since():
+    Sale.objects.create(
+        type=DiscountValueType.FIXED, value=5, start_date=date_time_now,
+    )
+    Sale.objects.create(
+        type=DiscountValueType.FIXED,
+        value=5,
+        start_date=date_time_now + timedelta(days=1),
+    )
+    sales = Sale.objects.started_or_ended(since=None, until=date_time_now)
+    assert sales.count() == 1
+
+
 def test_discount_as_negative():
     discount = Money(10, "USD")
     result = discount_as_negative(discount)
@@ -346,3 +391,106 @@ def test_discount_as_negative_for_html():
     discount = Money(10, "USD")
     result = discount_as_negative(discount, True)
     assert result == '-<span class="currency">$</span>10.00'
+
+
+def test_fetch_discounts_is_cached(sale, product, django_assert_num_queries):
+    now = timezone.now()
+    discounts = fetch_discounts(now)
+
+    with django_assert_num_queries(0):
+        cached_discounts = fetch_discounts(now + timedelta(minutes=1))
+
+    assert [discount.sale for discount in cached_discounts] == [sale]
+    assert cached_discounts == discounts
+    assert isinstance(cached_discounts, DiscountInfoList)
+    assert "discounts_index" in vars(cached_discounts)
+    assert cached_discounts[0].product_ids == {product.pk}
+
+
+def test_fetch_discounts_without_shared_cache(sale, local_memory_cache):
+    now = timezone.now()
+    fetch_discounts(now)
+
+    # Update does not send signals, like a change made by other process
+    Sale.objects.filter(pk=sale.pk).update(value=10)
+
+    assert fetch_discounts(now)[0].sale.value == 10
+
+
+def test_fetch_discounts_invalidated_on_sale_change(sale):
+    now = timezone.now()
+    fetch_discounts(now)
+
+    sale.value = 10
+    sale.save()
+
+    assert fetch_discounts(now)[0].sale.value == 10
+
+
+def test_fetch_discounts_invalidated_on_sale_catalogue_change(sale, product):
+    now = timezone.now()
+    fetch_discounts(now)
+
+    sale.products.remove(product)
+
+    assert fetch_discounts(now)[0].product_ids == set()
+
+
+def test_fetch_discounts_invalidated_on_sale_delete(sale):
+    now = timezone.now()
+    fetch_discounts(now)
+
+    sale.delete()
+
+    assert fetch_discounts(now) == []
+
+
+def test_fetch_discounts_expires_when_sale_ends(sale):
+    now = timezone.now()
+    sale.end_date = now + timedelta(hours=1)
+    sale.save()
+
+    assert len(fetch_discounts(now)) == 1
+    assert fetch_discounts(sale.end_date) != []
+    assert fetch_discounts(now + timedelta(hours=2)) == []
+
+
+def test_fetch_discounts_expires_when_sale_starts(db):
+    now = timezone.now()
+    sale = Sale.objects.create(
+        name="Upcoming sale", value=5, start_date=now + timedelta(hours=1)
+    )
+
+    assert fetch_discounts(now) == []
+    assert fetch_discounts(now + timedelta(hours=2))[0].sale == sale
+
+
+def test_discounts_index_returns_discounts_applying_to_product(
+    product, category, collection
+):
+    product_discount = DiscountInfo(
+        sale=Sale(name="Product sale"),
+        product_ids={product.pk},
+        category_ids=set(),
+        collection_ids=set(),
+    )
+    catalogue_discount = DiscountInfo(
+        sale=Sale(name="Catalogue sale"),
+        product_ids={product.pk},
+        category_ids={category.pk},
+        collection_ids={collection.pk},
+    )
+    other_discount = DiscountInfo(
+        sale=Sale(name="Other sale"),
+        product_ids={product.pk + 1},
+        category_ids={category.pk + 1},
+        collection_ids={collection.pk + 1},
+    )
+    discounts = DiscountInfoList([catalogue_discount, other_discount, product_discount])
+
+    assert discounts.discounts_index.get_discounts(
+        product.pk, category.pk, {collection.pk}
+    ) == [catalogue_discount, product_discount]
+    assert discounts.discounts_index.get_discounts(
+        product.pk + 2, None, {collection.pk}
+    ) == [catalogue_discount]
@@ -1,14 +1,17 @@
 import datetime
 from collections import defaultdict
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
 
-from django.db.models import F
+from django.core.cache import cache
+from django.db.models import F, Max, Min, Q
 from django.utils import timezone
 from prices import Money
 
 from ..checkout import calculations
+from ..core.cache import bump_cache_version, get_cache_version, is_cache_shared
 from ..core.taxes import zero_money
-from . import DiscountInfo
+from . import DiscountInfo, DiscountInfoList
 from .models import NotApplicable, Sale, VoucherCustomer
 
 if TYPE_CHECKING:
@@ -70,9 +73,22 @@ def get_product_discounts(
 ) -> Money:
     """Return discount values for all discounts applicable to a product."""
     product_collections = set(pc.id for pc in collections)
+    yield from get_product_discounts_by_collection_ids(
+        product=product, collection_ids=product_collections, discounts=discounts
+    )
+
+
+def get_product_discounts_by_collection_ids(
+    *, product: "Product", collection_ids: Set[int], discounts: Iterable[DiscountInfo]
+) -> Money:
+    """Return discount values for a product belonging to the given collections."""
+    if isinstance(discounts, DiscountInfoList):
+        discounts = discounts.discounts_index.get_discounts(
+            product.id, product.category_id, collection_ids
+        )
     for discount in discounts or []:
         try:
-            yield get_product_discount_on_sale(product, product_collections, discount)
+            yield get_product_discount_on_sale(product, collection_ids, discount)
         except NotApplicable:
             pass
 
@@ -200,14 +216,45 @@ def _fetch_products(sale_pks: Iterable[str]) -> Dict[int, Set[int]]:
     return product_map
 
 
-def fetch_discounts(date: datetime.date) -> List[DiscountInfo]:
+DISCOUNTS_VERSION_CACHE_KEY = "discounts_version"
+DISCOUNTS_CACHE_KEY = "discounts:{}"
+DISCOUNTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass
+class DiscountsSnapshot:
+    """Discounts active during a period in which no sale starts or ends."""
+
+    discounts: List[DiscountInfo]
+    last_start: Optional[datetime.datetime]
+    last_end: Optional[datetime.datetime]
+    next_start: Optional[datetime.datetime]
+    next_end: Optional[datetime.datetime]
+
+    def is_valid_at(self, date: datetime.datetime) -> bool:
+        # Sales are active from their start date to their end date, inclusive
+        return (
+            (self.last_start is None or date >= self.last_start)
+            and (self.last_end is None or date > self.last_end)
+            and (self.next_start is None or date < self.next_start)
+            and (self.next_end is None or date <= self.next_end)
+        )
+
+
+def _fetch_discounts_snapshot(date: datetime.datetime) -> DiscountsSnapshot:
+    bounds = Sale.objects.aggregate(
+        last_start=Max("start_date", filter=Q(start_date__lte=date)),
+        last_end=Max("end_date", filter=Q(end_date__lt=date)),
+        next_start=Min("start_date", filter=Q(start_date__gt=date)),
+        next_end=Min("end_date", filter=Q(end_date__gte=date)),
+    )
     sales = list(Sale.objects.active(date))
     pks = {s.pk for s in sales}
     collections = _fetch_collections(pks)
     products = _fetch_products(pks)
     categories = _fetch_categories(pks)
 
-    return [
+    discounts = DiscountInfoList(
         DiscountInfo(
             sale=sale,
             category_ids=categories[sale.pk],
@@ -215,7 +262,38 @@ def fetch_discounts(date: datetime.date) -> List[DiscountInfo]:
             product_ids=products[sale.pk],
         )
         for sale in sales
-    ]
+    )
+    # Build the index and key before the snapshot is cached, so they are shared
+    discounts.discounts_index
+    discounts.cache_key
+    return DiscountsSnapshot(discounts=discounts, **bounds)
+
+
+def fetch_discounts(date: datetime.datetime) -> List[DiscountInfo]:
+    """Return discounts active at the given date.
+
+    The result is shared between requests through the cache until a sale
+    starts or ends, or until `invalidate_discounts` is called. Without a cache
+    shared by all processes discounts are fetched on every call.
+    """
+    if not is_cache_shared():
+        return _fetch_discounts_snapshot(date).discounts
+
+    cache_key = DISCOUNTS_CACHE_KEY.format(
+        get_cache_version(DISCOUNTS_VERSION_CACHE_KEY)
+    )
+    snapshot = cache.get(cache_key)
+    if snapshot is not None and snapshot.is_valid_at(date):
+        return snapshot.discounts
+
+    snapshot = _fetch_discounts_snapshot(date)
+    cache.set(cache_key, snapshot, timeout=DISCOUNTS_CACHE_TIMEOUT)
+    return snapshot.discounts
+
+
+def invalidate_discounts():
+    """Make every worker fetch discounts from the database again."""
+    bump_cache_version(DISCOUNTS_VERSION_CACHE_KEY)
 
 
 def fetch_active_discounts() -> List[DiscountInfo]:
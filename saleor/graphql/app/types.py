@@ -9,7 +9,8 @@ from ..core.types.common import Job
 from ..meta.deprecated.resolvers import resolve_meta, resolve_private_meta
 from ..meta.types import ObjectWithMetadata
 from ..utils import format_permissions_for_display
-from ..webhook.types import Webhook
+from ..webhook.resolvers import resolve_webhook_delivery_stats
+from ..webhook.types import Webhook, WebhookDeliveryStats
 from .enums import AppTypeEnum
 from .resolvers import resolve_access_token
 
@@ -65,6 +66,11 @@ class App(CountableDjangoObjectType):
     webhooks = graphene.List(
         Webhook, description="List of webhooks assigned to this app."
     )
+    webhook_delivery_stats = graphene.Field(
+        WebhookDeliveryStats,
+        description="Statistics of the recent deliveries of the app's webhooks.",
+        required=True,
+    )
 
     about_app = graphene.String(description="Description of this app.")
 
@@ -127,6 +133,10 @@ class App(CountableDjangoObjectType):
     def resolve_webhooks(root: models.App, _info):
         return root.webhooks.all()
 
+    @staticmethod
+    def resolve_webhook_delivery_stats(root: models.App, _info):
+        return resolve_webhook_delivery_stats(root.webhooks.all())
+
     @staticmethod
     def resolve_access_token(root: models.App, info):
         return resolve_access_token(info, root)
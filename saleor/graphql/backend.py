@@ -0,0 +1,171 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from graphql import GraphQLCoreBackend, GraphQLDocument
+from graphql.backend import core
+from graphql.execution import ExecutionResult
+from graphql.language.base import parse
+from graphql.type.schema import GraphQLSchema
+from graphql.validation import validate
+
+PERSISTED_QUERY_CACHE_KEY = "graphql_persisted_query:{}"
+PERSISTED_QUERY_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+class PersistedQueryNotFound(Exception):
+    def __init__(self, msg=None):
+        # Apollo clients look for this exact message to resend the full query
+        if msg is None:
+            msg = "PersistedQueryNotFound"
+        super().__init__(msg)
+
+
+class DocumentCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    max_size: int
+    current_size: int
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def execute_validated(schema, document_ast, *args, **kwargs):
+    # Documents are validated once, when they are put into the cache
+    kwargs["validate"] = False
+    return core.execute_and_validate(schema, document_ast, *args, **kwargs)
+
+
+def return_validation_errors(errors, *_args, **_kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+class InvalidGraphQLDocument(GraphQLDocument):
+    """Document which failed validation, executing it returns the errors."""
+
+    def __init__(self, schema, document_string, document_ast, errors):
+        super().__init__(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(return_validation_errors, errors),
+        )
+
+
+class CachedGraphQLBackend(GraphQLCoreBackend):
+    """Keep parsed and validated documents in a process-wide LRU cache.
+
+    Documents are keyed by the SHA-256 hash of the query string, the same hash
+    Apollo clients send in `extensions.persistedQuery`, so persisted queries
+    resolve straight to a cached document.
+    """
+
+    def __init__(self, max_size: int, executor=None):
+        super().__init__(executor=executor)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._documents: "OrderedDict[str, GraphQLDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def document_from_string(self, schema: GraphQLSchema, document_string):
+        if not isinstance(document_string, str):
+            return super().document_from_string(schema, document_string)
+
+        query_hash = get_query_hash(document_string)
+        document = self._get_document(schema, query_hash)
+        if document is None:
+            document = self._build_document(schema, document_string, query_hash)
+        return document
+
+    def document_from_hash(
+        self, schema: GraphQLSchema, query_hash: str
+    ) -> Optional[GraphQLDocument]:
+        """Return a document for a persisted query or None if it is unknown."""
+        document = self._get_document(schema, query_hash)
+        if document is not None:
+            return document
+        query = cache.get(PERSISTED_QUERY_CACHE_KEY.format(query_hash))
+        if query is None:
+            return None
+        return self._build_document(schema, query, query_hash)
+
+    @staticmethod
+    def persist_query(query_hash: str, query: str):
+        cache.set(
+            PERSISTED_QUERY_CACHE_KEY.format(query_hash),
+            query,
+            timeout=PERSISTED_QUERY_CACHE_TIMEOUT,
+        )
+
+    def cache_info(self) -> DocumentCacheInfo:
+        with self._lock:
+            return DocumentCacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                max_size=self.max_size,
+                current_size=len(self._documents),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _get_document(
+        self, schema: GraphQLSchema, query_hash: str
+    ) -> Optional[GraphQLDocument]:
+        with self._lock:
+            document = self._documents.get(query_hash)
+            if document is None or document.schema is not schema:
+                return None
+            self._documents.move_to_end(query_hash)
+            self.hits += 1
+            return document
+
+    def _build_document(
+        self, schema: GraphQLSchema, document_string: str, query_hash: str
+    ) -> GraphQLDocument:
+        document_ast = parse(document_string)
+        try:
+            validation_errors = validate(schema, document_ast)
+        except Exception as e:
+            # Custom scalars may raise while parsing literal arguments
+            validation_errors = [e]
+        if validation_errors:
+            # Invalid documents are not cached, so they cannot evict valid ones
+            with self._lock:
+                self.misses += 1
+            return InvalidGraphQLDocument(
+                schema, document_string, document_ast, validation_errors
+            )
+
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(
+                execute_validated, schema, document_ast, **self.execute_params
+            ),
+        )
+        with self._lock:
+            self.misses += 1
+            if self.max_size > 0:
+                self._documents[query_hash] = document
+                self._documents.move_to_end(query_hash)
+                while len(self._documents) > self.max_size:
+                    self._documents.popitem(last=False)
+        return document
+
+
+default_backend = SimpleLazyObject(
+    lambda: CachedGraphQLBackend(max_size=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+)
@@ -3,6 +3,7 @@ from graphene import Node
 
 from .....checkout import calculations
 from .....checkout.models import Checkout
+from .....plugins.manager import PluginsManager
 from ....tests.utils import get_graphql_content
 
 FRAGMENT_PRICE = """
@@ -520,3 +521,39 @@ def test_complete_checkout(api_client, checkout_with_charged_payment, count_quer
 
     response = get_graphql_content(api_client.post_graphql(query, variables))
     assert not response["data"]["checkoutComplete"]["errors"]
+
+
+@pytest.mark.django_db
+def test_complete_checkout_calculates_prices_once(
+    api_client, checkout_with_charged_payment, mocker
+):
+    query = """
+        mutation completeCheckout($checkoutId: ID!) {
+          checkoutComplete(checkoutId: $checkoutId) {
+            errors {
+              field
+              message
+            }
+          }
+        }
+    """
+    checkout = checkout_with_charged_payment
+    lines_count = checkout.lines.count()
+    hooks = {
+        hook: mocker.spy(PluginsManager, hook)
+        for hook in [
+            "calculate_checkout_line_total",
+            "calculate_checkout_subtotal",
+            "calculate_checkout_shipping",
+            "calculate_checkout_total",
+        ]
+    }
+    variables = {"checkoutId": Node.to_global_id("Checkout", checkout.pk)}
+
+    response = get_graphql_content(api_client.post_graphql(query, variables))
+
+    assert not response["data"]["checkoutComplete"]["errors"]
+    assert hooks["calculate_checkout_line_total"].call_count == lines_count
+    assert hooks["calculate_checkout_subtotal"].call_count == 1
+    assert hooks["calculate_checkout_shipping"].call_count == 1
+    assert hooks["calculate_checkout_total"].call_count == 1
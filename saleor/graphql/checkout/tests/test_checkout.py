@@ -25,7 +25,9 @@ from ....payment.interface import GatewayResponse
 from ....plugins.manager import PluginsManager
 from ....plugins.tests.sample_plugins import ActiveDummyPaymentGateway
 from ....product.models import ProductVariant
+from ....tests.utils import flush_post_commit_hooks
 from ....warehouse.models import Stock
+from ....webhook.event_types import WebhookEventType
 from ...tests.utils import assert_no_permission, get_graphql_content
 from ..mutations import (
     clean_shipping_method,
@@ -110,12 +112,21 @@ MUTATION_CHECKOUT_CREATE = """
 """
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
 def test_checkout_create_triggers_webhooks(
-    mocked_webhook_trigger, user_api_client, stock, graphql_address_data, settings
+    mocked_webhook_trigger,
+    user_api_client,
+    stock,
+    graphql_address_data,
+    settings,
+    app,
+    permission_manage_checkouts,
 ):
     """Create checkout object using GraphQL API."""
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
+    app.permissions.add(permission_manage_checkouts)
+    webhook = app.webhooks.create(target_url="http://www.example.com/")
+    webhook.events.create(event_type=WebhookEventType.CHECKOUT_CREATED)
     variant = stock.product_variant
     variant_id = graphene.Node.to_global_id("ProductVariant", variant.id)
     test_email = "test@example.com"
@@ -130,6 +141,7 @@ def test_checkout_create_triggers_webhooks(
     assert not Checkout.objects.exists()
     response = user_api_client.post_graphql(MUTATION_CHECKOUT_CREATE, variables)
     get_graphql_content(response)
+    flush_post_commit_hooks()
 
     assert mocked_webhook_trigger.called
 
@@ -162,18 +162,13 @@ def _get_edges_for_connection(edge_type, qs, args, sorting_fields):
     if not first and not last:
         return [], {}
 
-    if last:
-        start_slice, end_slice = 1, None
-    else:
-        start_slice, end_slice = 0, requested_count
-
-    matching_records = list(qs)
+    # For `last` the queryset is already sorted in reverse, so both directions
+    # read a single record more than requested to tell if there are more pages
+    matching_records = list(qs[: requested_count + 1])
+    page_info = _get_page_info(matching_records, cursor, first, last)
+    matching_records = matching_records[:requested_count]
     if last:
         matching_records = list(reversed(matching_records))
-        if len(matching_records) <= requested_count:
-            start_slice = 0
-    page_info = _get_page_info(matching_records, cursor, first, last)
-    matching_records = matching_records[start_slice:end_slice]
 
     edges = [
         edge_type(
@@ -201,12 +196,9 @@ def connection_from_queryset_slice(
     args = args or {}
     before = args.get("before")
     after = args.get("after")
-    first = args.get("first")
     last = args.get("last")
     _validate_connection_args(args)
 
-    requested_count = first or last
-    end_margin = requested_count + 1 if requested_count else None
     cursor = after or before
     cursor = from_global_cursor(cursor) if cursor else None
 
@@ -219,13 +211,20 @@ def connection_from_queryset_slice(
         _prepare_filter(cursor, sorting_fields, sorting_direction) if cursor else Q()
     )
     qs = qs.filter(filter_kwargs)
-    qs = qs[:end_margin]
     edges, page_info = _get_edges_for_connection(edge_type, qs, args, sorting_fields)
 
-    return connection_type(
+    connection = connection_type(
         edges=edges,
         page_info=pageinfo_type(**page_info),
     )
+    if (
+        not cursor
+        and page_info
+        and not (page_info["has_next_page"] or page_info["has_previous_page"])
+    ):
+        # The page holds all matching records, so they don't have to be counted
+        connection.total_count = len(edges)
+    return connection
 
 
 class NonNullConnection(Connection):
@@ -268,6 +267,8 @@ class CountableConnection(NonNullConnection):
 
     @staticmethod
     def resolve_total_count(root, *_args, **_kwargs):
+        if getattr(root, "total_count", None) is not None:
+            return root.total_count
         if isinstance(root.iterable, list):
             return len(root.iterable)
         return root.iterable.count()
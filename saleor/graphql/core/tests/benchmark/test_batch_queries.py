@@ -0,0 +1,125 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from ....tests.utils import get_graphql_content
+from ....views import GraphQLView
+
+BARRIER_TIMEOUT = 5
+
+HOMEPAGE_BATCH = [
+    {"query": "query Shop { shop { name description } }"},
+    {
+        "query": """
+            query Categories {
+              categories(level: 0, first: 4) {
+                edges { node { id name } }
+              }
+            }
+        """
+    },
+    {
+        "query": """
+            query FeaturedProducts {
+              shop {
+                homepageCollection {
+                  products(first: 20) {
+                    edges { node { id name } }
+                  }
+                }
+              }
+            }
+        """
+    },
+    {
+        "query": """
+            query Collections {
+              collections(first: 4) {
+                edges { node { id name } }
+              }
+            }
+        """
+    },
+    {
+        "query": """
+            query Menus {
+              menus(first: 2) {
+                edges { node { id name } }
+              }
+            }
+        """
+    },
+]
+
+TOKEN_CREATE_MUTATION = {
+    "query": """
+        mutation TokenCreate {
+          tokenCreate(email: "customer@example.com", password: "password") {
+            errors { field message }
+          }
+        }
+    """
+}
+
+
+@pytest.fixture
+def homepage_collection(site_settings, collection, product_list_published):
+    collection.products.set(product_list_published)
+    site_settings.homepage_collection = collection
+    site_settings.save(update_fields=["homepage_collection"])
+    return collection
+
+
+def _post_batch_recording_operations(api_client, batch):
+    """Post the batch and return its content and starts and ends of operations.
+
+    Queries wait for each other on a barrier, so they only succeed when all
+    queries between mutations are executed at the same time.
+    """
+    execute_graphql_request = GraphQLView.execute_graphql_request
+    barrier = threading.Barrier(len(HOMEPAGE_BATCH))
+    events = []
+
+    def recording_execute_graphql_request(self, request, data):
+        query = data["query"]
+        events.append(("start", query))
+        if query != TOKEN_CREATE_MUTATION["query"] and not barrier.broken:
+            barrier.wait(timeout=BARRIER_TIMEOUT)
+        try:
+            return execute_graphql_request(self, request, data)
+        finally:
+            events.append(("end", query))
+
+    with patch.object(
+        GraphQLView, "execute_graphql_request", recording_execute_graphql_request
+    ):
+        content = get_graphql_content(api_client.post(batch))
+    return content, events
+
+
+@pytest.mark.django_db(transaction=True)
+def test_homepage_batch_with_mutation(
+    api_client, homepage_collection, categories_tree, settings
+):
+    batch = HOMEPAGE_BATCH + [TOKEN_CREATE_MUTATION] + HOMEPAGE_BATCH
+    settings.GRAPHQL_BATCH_WORKERS = 0
+    sequential_content = get_graphql_content(api_client.post(batch))
+
+    settings.GRAPHQL_BATCH_WORKERS = len(HOMEPAGE_BATCH)
+    concurrent_content, events = _post_batch_recording_operations(api_client, batch)
+
+    # Results are returned in the order of the batch
+    assert concurrent_content == sequential_content
+    # The mutation starts once all queries preceding it have ended and the
+    # queries following it start once it has ended
+    mutation_query = TOKEN_CREATE_MUTATION["query"]
+    mutation_start = events.index(("start", mutation_query))
+    mutation_end = mutation_start + 1
+    assert events[mutation_end] == ("end", mutation_query)
+    after_mutation = mutation_end + 1
+    homepage_queries = sorted(entry["query"] for entry in HOMEPAGE_BATCH)
+    for group_events in [events[:mutation_start], events[after_mutation:]]:
+        started = [query for event, query in group_events if event == "start"]
+        ended = [query for event, query in group_events if event == "end"]
+        assert sorted(started) == sorted(ended) == homepage_queries
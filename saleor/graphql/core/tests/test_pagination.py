@@ -2,6 +2,8 @@ import math
 
 import graphene
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from ....tests.models import Book
 from ..connection import CountableDjangoObjectType
@@ -218,3 +220,68 @@ def test_pagination_backward_last_page_info(books):
     page_info = content["books"]["pageInfo"]
     assert page_info["hasNextPage"]
     assert page_info["hasPreviousPage"] is False
+
+
+QUERY_PAGINATION_WITH_TOTAL_COUNT = """
+    query BooksPaginationTest($first: Int, $last: Int, $after: String){
+        books(first: $first, last: $last, after: $after) {
+            totalCount
+            edges {
+                node {
+                    name
+                }
+            }
+        }
+    }
+"""
+
+
+@pytest.mark.parametrize("page_size", [1, 5])
+def test_pagination_backward_reads_only_requested_records(page_size, books):
+    variables = {"last": page_size}
+    with CaptureQueriesContext(connection) as queries:
+        result = schema.execute(QUERY_PAGINATION_TEST, variables=variables)
+
+    assert not result.errors
+    names = [edge["node"]["name"] for edge in result.data["books"]["edges"]]
+    assert names == [book.name for book in books[-page_size:]]
+    assert len(queries) == 1
+    sql = queries[0]["sql"]
+    assert "DESC" in sql
+    assert f"LIMIT {page_size + 1}" in sql
+
+
+def test_pagination_without_total_count_does_not_count(books):
+    variables = {"first": 5}
+    with CaptureQueriesContext(connection) as queries:
+        result = schema.execute(QUERY_PAGINATION_TEST, variables=variables)
+
+    assert not result.errors
+    assert not any("COUNT(" in query["sql"] for query in queries)
+
+
+@pytest.mark.parametrize("variables", [{"first": 30}, {"last": 24}])
+def test_pagination_total_count_from_complete_page(variables, books):
+    with CaptureQueriesContext(connection) as queries:
+        result = schema.execute(QUERY_PAGINATION_WITH_TOTAL_COUNT, variables=variables)
+
+    assert not result.errors
+    assert result.data["books"]["totalCount"] == len(books)
+    assert len(result.data["books"]["edges"]) == len(books)
+    assert len(queries) == 1
+
+
+def test_pagination_total_count_from_incomplete_page(books):
+    variables = {"first": 5}
+    result = schema.execute(QUERY_PAGINATION_WITH_TOTAL_COUNT, variables=variables)
+    assert not result.errors
+    end_cursor = schema.execute(QUERY_PAGINATION_TEST, variables=variables).data[
+        "books"
+    ]["pageInfo"]["endCursor"]
+
+    variables = {"first": 30, "after": end_cursor}
+    next_result = schema.execute(QUERY_PAGINATION_WITH_TOTAL_COUNT, variables=variables)
+
+    assert not next_result.errors
+    assert result.data["books"]["totalCount"] == len(books)
+    assert next_result.data["books"]["totalCount"] == len(books)
@@ -1,10 +1,13 @@
+import hashlib
 from unittest import mock
 
 import graphene
 import pytest
+from django.core.cache import cache
 from django.test import override_settings
 
 from ....demo.views import EXAMPLE_QUERY
+from ...backend import PERSISTED_QUERY_CACHE_KEY, default_backend
 from ...product.types import Product
 from ...tests.fixtures import (
     ACCESS_CONTROL_ALLOW_CREDENTIALS,
@@ -289,3 +292,143 @@ def test_example_query(api_client, product):
     response = api_client.post_graphql(EXAMPLE_QUERY)
     content = get_graphql_content(response)
     assert content["data"]["products"]["edges"][0]["node"]["name"] == product.name
+
+
+PERSISTED_QUERY = "{ shop { name } }"
+
+
+def test_persisted_query_not_found(api_client):
+    query_hash = hashlib.sha256(b"{ shop { description } }").hexdigest()
+    data = {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}}
+    response = api_client.post(data)
+    assert response.status_code == 400
+    content = get_graphql_content_from_response(response)
+    assert content["errors"][0]["message"] == "PersistedQueryNotFound"
+
+
+def test_persisted_query_registered_and_executed_by_hash(api_client, site_settings):
+    query_hash = hashlib.sha256(PERSISTED_QUERY.encode("utf-8")).hexdigest()
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+    response = api_client.post({"query": PERSISTED_QUERY, "extensions": extensions})
+    content = get_graphql_content(response)
+    assert content["data"]["shop"]["name"] == site_settings.site.name
+
+    default_backend.clear()
+    response = api_client.post({"extensions": extensions})
+    content = get_graphql_content(response)
+    assert content["data"]["shop"]["name"] == site_settings.site.name
+
+
+def test_persisted_query_invalid_query_not_persisted(api_client):
+    query = "{ shop { invalid } }"
+    query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+    response = api_client.post({"query": query, "extensions": extensions})
+    assert response.status_code == 400
+
+    response = api_client.post({"extensions": extensions})
+    assert response.status_code == 400
+    content = get_graphql_content_from_response(response)
+    assert content["errors"][0]["message"] == "PersistedQueryNotFound"
+
+
+def test_persisted_query_exceeding_max_length_not_persisted(
+    api_client, site_settings, settings
+):
+    settings.GRAPHQL_PERSISTED_QUERY_MAX_LENGTH = len(PERSISTED_QUERY) - 1
+    query_hash = hashlib.sha256(PERSISTED_QUERY.encode("utf-8")).hexdigest()
+    cache.delete(PERSISTED_QUERY_CACHE_KEY.format(query_hash))
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+    response = api_client.post({"query": PERSISTED_QUERY, "extensions": extensions})
+    content = get_graphql_content(response)
+    assert content["data"]["shop"]["name"] == site_settings.site.name
+
+    default_backend.clear()
+    response = api_client.post({"extensions": extensions})
+    assert response.status_code == 400
+    content = get_graphql_content_from_response(response)
+    assert content["errors"][0]["message"] == "PersistedQueryNotFound"
+
+
+@mock.patch("saleor.graphql.views.opentracing.global_tracer")
+def test_document_cache_info_set_as_span_tags(mocked_global_tracer, api_client):
+    span = mocked_global_tracer().start_active_span().__enter__().span
+    default_backend.clear()
+
+    api_client.post_graphql(PERSISTED_QUERY)
+    api_client.post_graphql(PERSISTED_QUERY)
+
+    span.set_tag.assert_any_call("graphql.document_cache.hits", 1)
+    span.set_tag.assert_any_call("graphql.document_cache.misses", 1)
+    span.set_tag.assert_any_call("graphql.document_cache.size", 1)
+
+
+def test_persisted_query_hash_mismatch(api_client):
+    query_hash = hashlib.sha256(b"{ shop { description } }").hexdigest()
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+    response = api_client.post({"query": PERSISTED_QUERY, "extensions": extensions})
+    assert response.status_code == 400
+    content = get_graphql_content_from_response(response)
+    assert (
+        content["errors"][0]["message"] == "Provided sha256Hash does not match query."
+    )
+
+
+def test_batch_exceeding_max_batch_size(api_client, settings):
+    settings.GRAPHQL_MAX_BATCH_SIZE = 1
+    data = [{"query": "{ shop { name } }"}, {"query": "{ shop { name } }"}]
+    response = api_client.post(data)
+    assert response.status_code == 400
+    content = get_graphql_content_from_response(response)
+    assert content["errors"][0]["message"] == (
+        "Batch contains 2 operations, the maximum allowed is 1."
+    )
+
+
+QUERY_CATEGORY_NAME = """
+    query GetCategory($id: ID!) {
+        category(id: $id) {
+            name
+        }
+    }
+"""
+
+MUTATION_CATEGORY_UPDATE = """
+    mutation UpdateCategory($id: ID!, $name: String!) {
+        categoryUpdate(id: $id, input: {name: $name}) {
+            category {
+                name
+            }
+        }
+    }
+"""
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_queries_concurrently_keeps_mutation_order(
+    staff_api_client, category, permission_manage_products, settings
+):
+    settings.GRAPHQL_BATCH_WORKERS = 2
+    staff_api_client.user.user_permissions.add(permission_manage_products)
+    category_id = graphene.Node.to_global_id("Category", category.pk)
+    old_name = category.name
+    new_name = "New category name"
+    data = [
+        {"query": QUERY_CATEGORY_NAME, "variables": {"id": category_id}},
+        {"query": QUERY_CATEGORY_NAME, "variables": {"id": category_id}},
+        {
+            "query": MUTATION_CATEGORY_UPDATE,
+            "variables": {"id": category_id, "name": new_name},
+        },
+        {"query": QUERY_CATEGORY_NAME, "variables": {"id": category_id}},
+    ]
+
+    response = staff_api_client.post(data)
+
+    content = get_graphql_content(response)
+    assert [entry["data"] for entry in content] == [
+        {"category": {"name": old_name}},
+        {"category": {"name": old_name}},
+        {"categoryUpdate": {"category": {"name": new_name}}},
+        {"category": {"name": new_name}},
+    ]
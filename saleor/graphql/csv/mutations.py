@@ -4,18 +4,19 @@ import graphene
 from django.core.exceptions import ValidationError
 
 from ...core.permissions import ProductPermissions
-from ...csv import models as csv_models
+from ...csv import FileTypes, models as csv_models
 from ...csv.events import export_started_event
-from ...csv.tasks import export_products_task
-from ..core.enums import ExportErrorCode
+from ...csv.tasks import export_products_task, import_products_task
+from ..core.enums import ExportErrorCode, ImportErrorCode
 from ..core.mutations import BaseMutation
-from ..core.types.common import ExportError
+from ..core.types import Upload
+from ..core.types.common import ExportError, ImportFileError
 from ..product.filters import ProductFilterInput
 from ..product.types import Attribute, Product
 from ..utils import resolve_global_ids_to_primary_keys
 from ..warehouse.types import Warehouse
 from .enums import ExportScope, FileTypeEnum, ProductFieldEnum
-from .types import ExportFile
+from .types import ExportFile, ImportFile
 
 
 class ExportInfoInput(graphene.InputObjectType):
@@ -145,3 +146,65 @@ class ExportProducts(BaseMutation):
             )
             export_info["warehouses"] = warehouse_pks
         return export_info
+
+
+class ImportProducts(BaseMutation):
+    import_file = graphene.Field(
+        ImportFile,
+        description=(
+            "The newly created import file job which is responsible for import data."
+        ),
+    )
+
+    class Arguments:
+        file = Upload(
+            required=True,
+            description=(
+                "CSV or XLSX file with the layout of the product export. "
+                "CSV files use the semicolon as the delimiter."
+            ),
+        )
+
+    class Meta:
+        description = (
+            "Update products, variants, stocks and attributes from csv or xlsx file. "
+            "This mutation must be sent as a `multipart` request."
+        )
+        permissions = (ProductPermissions.MANAGE_PRODUCTS,)
+        error_type_class = ImportFileError
+        error_type_field = "import_errors"
+
+    @classmethod
+    def perform_mutation(cls, root, info, **data):
+        file = info.context.FILES.get(data["file"])
+        cls.validate_file(file)
+
+        app = info.context.app
+        kwargs = {"app": app} if app else {"user": info.context.user}
+
+        import_file = csv_models.ImportFile.objects.create(content_file=file, **kwargs)
+        import_products_task.delay(import_file.pk)
+
+        import_file.refresh_from_db()
+        return cls(import_file=import_file)
+
+    @staticmethod
+    def validate_file(file):
+        if not file:
+            raise ValidationError(
+                {
+                    "file": ValidationError(
+                        "File is required.", code=ImportErrorCode.REQUIRED.value
+                    )
+                }
+            )
+        extensions = tuple(f".{file_type}" for file_type, _ in FileTypes.CHOICES)
+        if not file.name.lower().endswith(extensions):
+            raise ValidationError(
+                {
+                    "file": ValidationError(
+                        "Only csv and xlsx files can be imported.",
+                        code=ImportErrorCode.INVALID.value,
+                    )
+                }
+            )
@@ -5,9 +5,9 @@ from ...csv import models
 from ..core.fields import FilterInputConnectionField
 from ..decorators import permission_required
 from .filters import ExportFileFilterInput
-from .mutations import ExportProducts
+from .mutations import ExportProducts, ImportProducts
 from .sorters import ExportFileSortingInput
-from .types import ExportFile
+from .types import ExportFile, ImportFile
 
 
 class CsvQueries(graphene.ObjectType):
@@ -18,6 +18,13 @@ class CsvQueries(graphene.ObjectType):
         ),
         description="Look up a export file by ID.",
     )
+    import_file = graphene.Field(
+        ImportFile,
+        id=graphene.Argument(
+            graphene.ID, description="ID of the import file job.", required=True
+        ),
+        description="Look up an import file by ID.",
+    )
     export_files = FilterInputConnectionField(
         ExportFile,
         filter=ExportFileFilterInput(description="Filtering options for export files."),
@@ -29,6 +36,10 @@ class CsvQueries(graphene.ObjectType):
     def resolve_export_file(self, info, id):
         return graphene.Node.get_node_from_global_id(info, id, ExportFile)
 
+    @permission_required(ProductPermissions.MANAGE_PRODUCTS)
+    def resolve_import_file(self, info, id):
+        return graphene.Node.get_node_from_global_id(info, id, ImportFile)
+
     @permission_required(ProductPermissions.MANAGE_PRODUCTS)
     def resolve_export_files(self, info, query=None, sort_by=None, **kwargs):
         return models.ExportFile.objects.all()
@@ -36,3 +47,4 @@ class CsvQueries(graphene.ObjectType):
 
 class CsvMutations(graphene.ObjectType):
     export_products = ExportProducts.Field()
+    import_products = ImportProducts.Field()
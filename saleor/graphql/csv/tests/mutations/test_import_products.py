@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from .....csv.models import ImportFile
+from ....core.enums import ImportErrorCode
+from ....tests.utils import (
+    assert_no_permission,
+    get_graphql_content,
+    get_multipart_request_body,
+)
+
+IMPORT_PRODUCTS_MUTATION = """
+    mutation ImportProducts($file: Upload!){
+        importProducts(file: $file){
+            importFile {
+                id
+                status
+                progress
+                user {
+                    email
+                }
+            }
+            importErrors {
+                field
+                code
+                message
+            }
+        }
+    }
+"""
+
+
+def get_import_body(file_name, content=b"variant sku;variant price\r\n123;10\r\n"):
+    file = SimpleUploadedFile(file_name, content)
+    variables = {"file": file_name}
+    return get_multipart_request_body(
+        IMPORT_PRODUCTS_MUTATION, variables, file, file_name
+    )
+
+
+@patch("saleor.graphql.csv.mutations.import_products_task.delay")
+def test_import_products_mutation(
+    import_products_task_mock, staff_api_client, permission_manage_products, media_root,
+):
+    # given
+    body = get_import_body("products.csv")
+
+    # when
+    response = staff_api_client.post_multipart(
+        body, permissions=[permission_manage_products]
+    )
+
+    # then
+    content = get_graphql_content(response)
+    data = content["data"]["importProducts"]
+    import_file = ImportFile.objects.get()
+
+    assert not data["importErrors"]
+    assert data["importFile"]["id"]
+    assert data["importFile"]["user"]["email"] == staff_api_client.user.email
+    assert import_file.content_file.name.startswith("import_files/products")
+    import_products_task_mock.assert_called_once_with(import_file.pk)
+
+
+@patch("saleor.graphql.csv.mutations.import_products_task.delay")
+def test_import_products_mutation_invalid_file_extension(
+    import_products_task_mock, staff_api_client, permission_manage_products, media_root,
+):
+    # given
+    body = get_import_body("products.txt")
+
+    # when
+    response = staff_api_client.post_multipart(
+        body, permissions=[permission_manage_products]
+    )
+
+    # then
+    content = get_graphql_content(response)
+    errors = content["data"]["importProducts"]["importErrors"]
+
+    assert len(errors) == 1
+    assert errors[0]["field"] == "file"
+    assert errors[0]["code"] == ImportErrorCode.INVALID.name
+    assert not ImportFile.objects.exists()
+    import_products_task_mock.assert_not_called()
+
+
+@patch("saleor.graphql.csv.mutations.import_products_task.delay")
+def test_import_products_mutation_no_permission(
+    import_products_task_mock, staff_api_client, media_root
+):
+    # given
+    body = get_import_body("products.csv")
+
+    # when
+    response = staff_api_client.post_multipart(body)
+
+    # then
+    assert_no_permission(response)
+    import_products_task_mock.assert_not_called()
@@ -12,6 +12,7 @@ EXPORT_FILE_QUERY = """
             createdAt
             updatedAt
             url
+            progress
             user{
                 email
             }
@@ -42,6 +43,9 @@ def test_query_export_file(
     user_export_event,
 ):
     # given
+    user_export_file.total_shards = 4
+    user_export_file.processed_shards = 1
+    user_export_file.save(update_fields=["total_shards", "processed_shards"])
     query = EXPORT_FILE_QUERY
     variables = {"id": graphene.Node.to_global_id("ExportFile", user_export_file.pk)}
 
@@ -61,6 +65,7 @@ def test_query_export_file(
     assert data["updatedAt"]
     assert data["app"] is None
     assert not data["url"]
+    assert data["progress"] == 0.25
     assert data["user"]["email"] == staff_api_client.user.email
     assert len(data["events"]) == 1
     event = data["events"][0]
@@ -0,0 +1,76 @@
+import graphene
+
+from .....core import JobStatus
+from .....csv.error_codes import ImportErrorCode
+from .....csv.models import ImportFile
+from ....tests.utils import assert_no_permission, get_graphql_content
+
+IMPORT_FILE_QUERY = """
+    query($id: ID!){
+        importFile(id: $id){
+            id
+            status
+            progress
+            user{
+                email
+            }
+            errors{
+                row
+                field
+                message
+                code
+            }
+        }
+    }
+"""
+
+
+def test_query_import_file(staff_api_client, permission_manage_products):
+    # given
+    import_file = ImportFile.objects.create(
+        user=staff_api_client.user,
+        total_rows=4,
+        processed_rows=2,
+        errors=[
+            {
+                "row": 2,
+                "field": "variant sku",
+                "message": "Variant does not exist.",
+                "code": ImportErrorCode.NOT_FOUND.value,
+            }
+        ],
+    )
+    variables = {"id": graphene.Node.to_global_id("ImportFile", import_file.pk)}
+
+    # when
+    response = staff_api_client.post_graphql(
+        IMPORT_FILE_QUERY, variables=variables, permissions=[permission_manage_products]
+    )
+
+    # then
+    content = get_graphql_content(response)
+    data = content["data"]["importFile"]
+
+    assert data["status"] == JobStatus.PENDING.upper()
+    assert data["progress"] == 0.5
+    assert data["user"]["email"] == staff_api_client.user.email
+    assert data["errors"] == [
+        {
+            "row": 2,
+            "field": "variant sku",
+            "message": "Variant does not exist.",
+            "code": ImportErrorCode.NOT_FOUND.name,
+        }
+    ]
+
+
+def test_query_import_file_no_permission(staff_api_client):
+    # given
+    import_file = ImportFile.objects.create(user=staff_api_client.user)
+    variables = {"id": graphene.Node.to_global_id("ImportFile", import_file.pk)}
+
+    # when
+    response = staff_api_client.post_graphql(IMPORT_FILE_QUERY, variables=variables)
+
+    # then
+    assert_no_permission(response)
@@ -7,6 +7,7 @@ from ..account.types import User
 from ..account.utils import requestor_has_access
 from ..app.types import App
 from ..core.connection import CountableDjangoObjectType
+from ..core.enums import ImportErrorCode
 from ..core.types.common import Job
 from ..utils import get_user_or_app_from_context
 from .enums import ExportEventEnum
@@ -52,6 +53,10 @@ class ExportEvent(CountableDjangoObjectType):
 
 class ExportFile(CountableDjangoObjectType):
     url = graphene.String(description="The URL of field to download.")
+    progress = graphene.Float(
+        description="Fraction of the export that is already processed, from 0 to 1.",
+        required=True,
+    )
     events = graphene.List(
         graphene.NonNull(ExportEvent),
         description="List of events associated with the export.",
@@ -70,6 +75,10 @@ class ExportFile(CountableDjangoObjectType):
             return None
         return info.context.build_absolute_uri(content_file.url)
 
+    @staticmethod
+    def resolve_progress(root: models.ExportFile, _info):
+        return root.progress
+
     @staticmethod
     def resolve_user(root: models.ExportFile, info):
         requestor = get_user_or_app_from_context(info.context)
@@ -87,3 +96,60 @@ class ExportFile(CountableDjangoObjectType):
     @staticmethod
     def resolve_events(root: models.ExportFile, _info):
         return root.events.all().order_by("pk")
+
+
+class ImportFileRowError(graphene.ObjectType):
+    row = graphene.Int(
+        description="Number of the file row which caused the error.", required=True
+    )
+    field = graphene.String(description="Column which caused the error.")
+    message = graphene.String(description="The error message.", required=True)
+    code = ImportErrorCode(description="The error code.", required=True)
+
+    class Meta:
+        description = "Represents an error in a row of an imported file."
+
+
+class ImportFile(CountableDjangoObjectType):
+    url = graphene.String(description="The URL of the imported file.")
+    progress = graphene.Float(
+        description="Fraction of the import that is already processed, from 0 to 1.",
+        required=True,
+    )
+    errors = graphene.List(
+        graphene.NonNull(ImportFileRowError),
+        description="Errors of rows which were not imported.",
+        required=True,
+    )
+
+    class Meta:
+        description = "Represents a job data of imported file."
+        interfaces = [graphene.relay.Node, Job]
+        model = models.ImportFile
+        only_fields = ["id", "user", "app", "url"]
+
+    @staticmethod
+    def resolve_url(root: models.ImportFile, info):
+        return info.context.build_absolute_uri(root.content_file.url)
+
+    @staticmethod
+    def resolve_progress(root: models.ImportFile, _info):
+        return root.progress
+
+    @staticmethod
+    def resolve_errors(root: models.ImportFile, _info):
+        return root.errors
+
+    @staticmethod
+    def resolve_user(root: models.ImportFile, info):
+        requestor = get_user_or_app_from_context(info.context)
+        if requestor_has_access(requestor, root.user, AccountPermissions.MANAGE_STAFF):
+            return root.user
+        raise PermissionDenied()
+
+    @staticmethod
+    def resolve_app(root: models.ImportFile, info):
+        requestor = get_user_or_app_from_context(info.context)
+        if requestor_has_access(requestor, root.user, AccountPermissions.MANAGE_STAFF):
+            return root.app
+        raise PermissionDenied()
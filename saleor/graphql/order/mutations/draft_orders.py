@@ -18,7 +18,7 @@ from ....order.utils import (
     recalculate_order,
     update_order_prices,
 )
-from ....warehouse.management import allocate_stock
+from ....warehouse.management import allocate_stocks
 from ...account.i18n import I18nMixin
 from ...account.types import AddressInput
 from ...core.mutations import BaseMutation, ModelDeleteMutation, ModelMutation
@@ -286,19 +286,18 @@ class DraftOrderComplete(BaseMutation):
 
         order.save()
 
-        for line in order:
-            if line.variant.track_inventory:
-                try:
-                    allocate_stock(line, country, line.quantity)
-                except InsufficientStock as exc:
-                    raise ValidationError(
-                        {
-                            "lines": ValidationError(
-                                f"Insufficient product stock: {exc.item}",
-                                code=OrderErrorCode.INSUFFICIENT_STOCK,
-                            )
-                        }
+        lines_to_allocate = [line for line in order if line.variant.track_inventory]
+        try:
+            allocate_stocks(lines_to_allocate, country)
+        except InsufficientStock as exc:
+            raise ValidationError(
+                {
+                    "lines": ValidationError(
+                        f"Insufficient product stock: {exc.item}",
+                        code=OrderErrorCode.INSUFFICIENT_STOCK,
                     )
+                }
+            )
         order_created(order, user=info.context.user, from_draft=True)
 
         return DraftOrderComplete(order=order)
@@ -11,6 +11,7 @@ from .products import (
     CollectionsByProductIdLoader,
     ImagesByProductIdLoader,
     ImagesByProductVariantIdLoader,
+    ProductAvailabilityByCacheKeyLoader,
     ProductByIdLoader,
     ProductImageByIdLoader,
     ProductTypeByIdLoader,
@@ -25,6 +26,7 @@ __all__ = [
     "CollectionsByProductIdLoader",
     "ImagesByProductIdLoader",
     "ProductAttributesByProductTypeIdLoader",
+    "ProductAvailabilityByCacheKeyLoader",
     "ProductByIdLoader",
     "ProductTypeByIdLoader",
     "ProductVariantByIdLoader",
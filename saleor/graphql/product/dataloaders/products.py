@@ -10,6 +10,7 @@ from ....product.models import (
     ProductVariant,
     VariantImage,
 )
+from ....product.utils.availability import get_cached_product_availabilities
 from ...core.dataloaders import DataLoader
 from ...utils import get_user_or_app_from_context
 
@@ -138,3 +139,10 @@ class CollectionsByProductIdLoader(DataLoader):
             .load_many(set(cid for pid, cid in product_collection_pairs))
             .then(map_collections)
         )
+
+
+class ProductAvailabilityByCacheKeyLoader(DataLoader):
+    context_key = "product_availability_by_cache_key"
+
+    def batch_load(self, keys):
+        return get_cached_product_availabilities(keys, self.context.plugins)
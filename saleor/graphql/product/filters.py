@@ -115,9 +115,7 @@ def filter_products_by_stock_availability(qs, stock_availability):
     total_stock = (
         Stock.objects.select_related("product_variant")
         .values("product_variant__product_id")
-        .annotate(
-            total_quantity_allocated=Coalesce(Sum("allocations__quantity_allocated"), 0)
-        )
+        .annotate(total_quantity_allocated=Coalesce(Sum("quantity_allocated"), 0))
         .annotate(total_quantity=Coalesce(Sum("quantity"), 0))
         .annotate(total_available=F("total_quantity") - F("total_quantity_allocated"))
         .filter(total_available__lte=0)
@@ -9,6 +9,7 @@ from django.utils.text import slugify
 from ....core.permissions import ProductPermissions, ProductTypePermissions
 from ....product import AttributeInputType, models
 from ....product.error_codes import ProductErrorCode
+from ....product.utils.attributes import update_products_attributes_sort_keys
 from ...core.mutations import BaseMutation, ModelDeleteMutation, ModelMutation
 from ...core.types.common import ProductError
 from ...core.utils import (
@@ -805,5 +806,10 @@ class AttributeReorderValues(BaseMutation):
 
         with transaction.atomic():
             perform_reordering(values_m2m, operations)
+            update_products_attributes_sort_keys(
+                models.AssignedProductAttribute.objects.filter(
+                    assignment__attribute=attribute
+                )
+            )
         attribute.refresh_from_db(fields=["values"])
         return AttributeReorderValues(attribute=attribute)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from graphene import Node
 
 from ....tests.utils import get_graphql_content
@@ -215,3 +217,41 @@ def test_retrive_products_with_product_types_and_attributes(
     """
     variables = {}
     get_graphql_content(api_client.post_graphql(query, variables))
+
+
+PRODUCTS_AVAILABILITY_QUERY = """
+    query($first: Int) {
+      products(first: $first) {
+        edges {
+          node {
+            id
+            isAvailable
+          }
+        }
+      }
+    }
+"""
+
+
+@pytest.mark.django_db
+@pytest.mark.count_queries(autouse=False)
+def test_retrieve_products_availability(product_list, api_client, count_queries):
+    variables = {"first": 10}
+    get_graphql_content(api_client.post_graphql(PRODUCTS_AVAILABILITY_QUERY, variables))
+
+
+@pytest.mark.django_db
+def test_retrieve_products_availability_queries_do_not_depend_on_page_size(
+    product_list, api_client
+):
+    queries_count = []
+    for page_size in [1, len(product_list)]:
+        variables = {"first": page_size}
+        with CaptureQueriesContext(connection) as queries:
+            content = get_graphql_content(
+                api_client.post_graphql(PRODUCTS_AVAILABILITY_QUERY, variables)
+            )
+        assert len(content["data"]["products"]["edges"]) == page_size
+        queries_count.append(len(queries))
+
+    assert queries_count[0] == queries_count[1]
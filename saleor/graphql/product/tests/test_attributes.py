@@ -2971,3 +2971,39 @@ def test_search_attributes_choice(
     values = attributes["data"]["attributes"]["edges"][0]["node"]["choices"]["edges"]
     assert len(values) == 1
     assert values[0]["node"]["slug"] == filter_value
+
+
+def test_sort_values_within_attribute_updates_products_sort_keys(
+    staff_api_client,
+    product,
+    color_attribute,
+    permission_manage_product_types_and_attributes,
+):
+    # given
+    red, blue = color_attribute.values.all()
+    assigned_attribute = associate_attribute_values_to_instance(
+        product, color_attribute, red, blue
+    )
+    variables = {
+        "attributeId": graphene.Node.to_global_id("Attribute", color_attribute.id),
+        "moves": [
+            {
+                "id": graphene.Node.to_global_id("AttributeValue", blue.pk),
+                "sortOrder": -1,
+            }
+        ],
+    }
+
+    # when
+    content = get_graphql_content(
+        staff_api_client.post_graphql(
+            ATTRIBUTE_VALUES_RESORT_QUERY,
+            variables,
+            permissions=[permission_manage_product_types_and_attributes],
+        )
+    )
+
+    # then
+    assert not content["data"]["attributeReorderValues"]["errors"]
+    assigned_attribute.refresh_from_db()
+    assert assigned_attribute.values_sort_key == "Blue,Red"
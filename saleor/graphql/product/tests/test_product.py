@@ -899,6 +899,8 @@ def test_products_query_with_filter_stock_availability(
     Allocation.objects.create(
         order_line=order_line, stock=stock, quantity_allocated=stock.quantity
     )
+    stock.quantity_allocated = stock.quantity
+    stock.save(update_fields=["quantity_allocated"])
     variables = {"filter": {"stockAvailability": "OUT_OF_STOCK"}}
     staff_api_client.user.user_permissions.add(permission_manage_products)
     response = staff_api_client.post_graphql(query_products_with_filter, variables)
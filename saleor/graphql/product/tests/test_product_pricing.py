@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from ....discount.models import Sale
+from ....plugins.manager import invalidate_plugins_managers
+from ....product.utils.availability import get_product_availability
+from ....tests.utils import flush_post_commit_hooks
+from ...tests.utils import get_graphql_content
+
+QUERY_GET_PRODUCT_PRICING = """
+query {
+  products(first: 10) {
+    edges {
+      node {
+        pricing {
+          onSale
+          priceRange {
+            start {
+              net {
+                amount
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _get_pricing(api_client):
+    response = api_client.post_graphql(QUERY_GET_PRODUCT_PRICING)
+    content = get_graphql_content(response)
+    return content["data"]["products"]["edges"][0]["node"]["pricing"]
+
+
+@patch(
+    "saleor.graphql.product.types.products.get_product_availability",
+    wraps=get_product_availability,
+)
+def test_product_pricing_is_cached(mocked_get_availability, api_client, product):
+    flush_post_commit_hooks()
+    pricing = _get_pricing(api_client)
+    assert mocked_get_availability.call_count == 1
+
+    cached_pricing = _get_pricing(api_client)
+
+    assert cached_pricing == pricing
+    assert mocked_get_availability.call_count == 1
+
+
+@patch(
+    "saleor.graphql.product.types.products.get_product_availability",
+    wraps=get_product_availability,
+)
+def test_product_pricing_is_not_cached_without_shared_cache(
+    mocked_get_availability, api_client, product, local_memory_cache
+):
+    pricing = _get_pricing(api_client)
+
+    assert _get_pricing(api_client) == pricing
+    assert mocked_get_availability.call_count == 2
+
+
+def test_product_pricing_cache_invalidated_on_variant_price_change(api_client, product):
+    variant = product.variants.get()
+    _get_pricing(api_client)
+
+    variant.price_amount += 5
+    variant.save(update_fields=["price_amount"])
+
+    pricing = _get_pricing(api_client)
+    assert pricing["priceRange"]["start"]["net"]["amount"] == variant.price_amount
+
+
+def test_product_pricing_cache_invalidated_on_sale_change(api_client, product):
+    assert not _get_pricing(api_client)["onSale"]
+
+    sale = Sale.objects.create(name="Sale", value=1)
+    sale.products.add(product)
+
+    assert _get_pricing(api_client)["onSale"]
+
+
+@patch(
+    "saleor.graphql.product.types.products.get_product_availability",
+    wraps=get_product_availability,
+)
+def test_product_pricing_cache_invalidated_on_plugins_change(
+    mocked_get_availability, api_client, product
+):
+    flush_post_commit_hooks()
+    _get_pricing(api_client)
+
+    invalidate_plugins_managers()
+    _get_pricing(api_client)
+
+    assert mocked_get_availability.call_count == 2
@@ -16,15 +16,13 @@ from ....product.templatetags.product_images import (
 )
 from ....product.utils import calculate_revenue_for_variant
 from ....product.utils.availability import (
+    cache_product_availability,
     get_product_availability,
+    get_product_availability_cache_key,
     get_variant_availability,
 )
 from ....product.utils.costs import get_margin_for_variant, get_product_costs_data
-from ....warehouse.availability import (
-    get_available_quantity,
-    get_quantity_allocated,
-    is_product_in_stock,
-)
+from ....warehouse.availability import get_available_quantity, get_quantity_allocated
 from ...account.enums import CountryCodeEnum
 from ...core.connection import CountableDjangoObjectType
 from ...core.enums import ReportingPeriod, TaxRateType
@@ -45,6 +43,7 @@ from ...utils import get_database_id, get_user_or_app_from_context
 from ...utils.filters import reporting_period_to_date
 from ...warehouse.dataloaders import (
     AvailableQuantityByProductVariantIdAndCountryCodeLoader,
+    StockAvailabilityByProductIdAndCountryCodeLoader,
 )
 from ...warehouse.types import Stock
 from ..dataloaders import (
@@ -53,6 +52,7 @@ from ..dataloaders import (
     ImagesByProductIdLoader,
     ImagesByProductVariantIdLoader,
     ProductAttributesByProductTypeIdLoader,
+    ProductAvailabilityByCacheKeyLoader,
     ProductByIdLoader,
     ProductTypeByIdLoader,
     ProductVariantByIdLoader,
@@ -571,16 +571,34 @@ class Product(CountableDjangoObjectType):
         def calculate_pricing_info(discounts):
             def calculate_pricing_with_variants(variants):
                 def calculate_pricing_with_collections(collections):
-                    availability = get_product_availability(
+                    def calculate_pricing_with_cache(cached_availability):
+                        cache_key, availability = cached_availability
+                        if availability is None:
+                            availability = get_product_availability(
+                                product=root,
+                                variants=variants,
+                                collections=collections,
+                                discounts=discounts,
+                                country=context.country,
+                                local_currency=context.currency,
+                                plugins=context.plugins,
+                            )
+                            cache_product_availability(cache_key, availability)
+                        return ProductPricingInfo(**asdict(availability))
+
+                    availability_key = get_product_availability_cache_key(
                         product=root,
                         variants=variants,
                         collections=collections,
                         discounts=discounts,
                         country=context.country,
                         local_currency=context.currency,
-                        plugins=context.plugins,
                     )
-                    return ProductPricingInfo(**asdict(availability))
+                    return (
+                        ProductAvailabilityByCacheKeyLoader(context)
+                        .load(availability_key)
+                        .then(calculate_pricing_with_cache)
+                    )
 
                 return collections.then(calculate_pricing_with_collections)
 
@@ -595,8 +613,11 @@ class Product(CountableDjangoObjectType):
     @staticmethod
     def resolve_is_available(root: models.Product, info):
         country = info.context.country
-        in_stock = is_product_in_stock(root, country)
-        return root.is_visible and in_stock
+        return (
+            StockAvailabilityByProductIdAndCountryCodeLoader(info.context)
+            .load((root.id, country))
+            .then(lambda availability: root.is_visible and availability.in_stock)
+        )
 
     @staticmethod
     def resolve_attributes(root: models.Product, info):
@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+from graphql.error import GraphQLSyntaxError
+
+from ..api import schema
+from ..backend import (
+    PERSISTED_QUERY_CACHE_KEY,
+    CachedGraphQLBackend,
+    InvalidGraphQLDocument,
+    get_query_hash,
+)
+
+QUERY = "{ shop { name } }"
+
+
+def test_document_cache_hit_and_miss():
+    backend = CachedGraphQLBackend(max_size=10)
+
+    document = backend.document_from_string(schema, QUERY)
+    cached_document = backend.document_from_string(schema, QUERY)
+
+    assert cached_document is document
+    info = backend.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.current_size == 1
+
+
+def test_document_cache_evicts_least_recently_used():
+    backend = CachedGraphQLBackend(max_size=2)
+    first_query = "{ shop { name } }"
+    second_query = "{ shop { description } }"
+    third_query = "{ shop { domain { host } } }"
+
+    backend.document_from_string(schema, first_query)
+    backend.document_from_string(schema, second_query)
+    backend.document_from_string(schema, first_query)
+    backend.document_from_string(schema, third_query)
+
+    assert backend.cache_info().current_size == 2
+    assert backend.document_from_hash(schema, get_query_hash(first_query))
+    assert backend.document_from_hash(schema, get_query_hash(second_query)) is None
+
+
+def test_document_cache_skips_invalid_documents():
+    backend = CachedGraphQLBackend(max_size=10)
+
+    document = backend.document_from_string(schema, "{ shop { invalid } }")
+
+    assert isinstance(document, InvalidGraphQLDocument)
+    result = document.execute()
+    assert result.invalid
+    assert result.errors
+    assert backend.cache_info().current_size == 0
+
+
+def test_document_cache_syntax_error():
+    backend = CachedGraphQLBackend(max_size=10)
+
+    with pytest.raises(GraphQLSyntaxError):
+        backend.document_from_string(schema, "{ }")
+
+
+def test_document_from_hash_uses_persisted_query():
+    backend = CachedGraphQLBackend(max_size=10)
+    query_hash = get_query_hash(QUERY)
+    cache.delete(PERSISTED_QUERY_CACHE_KEY.format(query_hash))
+    assert backend.document_from_hash(schema, query_hash) is None
+
+    backend.persist_query(query_hash, QUERY)
+
+    document = backend.document_from_hash(schema, query_hash)
+    assert document.document_string == QUERY
@@ -1,13 +1,16 @@
+import copy
 import fnmatch
 import json
 import logging
+import threading
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import opentracing
 import opentracing.tags
 from django.conf import settings
-from django.db import connection
+from django.db import connection, connections
 from django.db.backends.postgresql.base import DatabaseWrapper
 from django.http import HttpRequest, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import render
@@ -16,17 +19,25 @@ from django.utils.functional import SimpleLazyObject
 from django.views.generic import View
 from graphene_django.settings import graphene_settings
 from graphene_django.views import instantiate_middleware
-from graphql import GraphQLDocument, get_default_backend
+from graphql import GraphQLDocument
 from graphql.error import (
     GraphQLError,
     GraphQLSyntaxError,
     format_error as format_graphql_error,
 )
 from graphql.execution import ExecutionResult
+from graphql.utils.get_operation_ast import get_operation_ast
 from jwt.exceptions import PyJWTError
 
 from ..core.exceptions import PermissionDenied, ReadOnlyException
 from ..core.utils import is_valid_ipv4, is_valid_ipv6
+from .backend import (
+    CachedGraphQLBackend,
+    InvalidGraphQLDocument,
+    PersistedQueryNotFound,
+    default_backend,
+    get_query_hash,
+)
 
 API_PATH = SimpleLazyObject(lambda: reverse("api"))
 
@@ -45,6 +56,21 @@ def tracing_wrapper(execute, sql, params, many, context):
         return execute(sql, params, many, context)
 
 
+_batch_executors: Dict[int, ThreadPoolExecutor] = {}
+_batch_executors_lock = threading.Lock()
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used to execute batched queries."""
+    max_workers = settings.GRAPHQL_BATCH_WORKERS
+    with _batch_executors_lock:
+        if max_workers not in _batch_executors:
+            _batch_executors[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="graphql-batch"
+            )
+        return _batch_executors[max_workers]
+
+
 class GraphQLView(View):
     # This class is our implementation of `graphene_django.views.GraphQLView`,
     # which was extended to support the following features:
@@ -60,7 +86,13 @@ class GraphQLView(View):
     middleware = None
     root_value = None
 
-    HANDLED_EXCEPTIONS = (GraphQLError, PyJWTError, ReadOnlyException, PermissionDenied)
+    HANDLED_EXCEPTIONS = (
+        GraphQLError,
+        PyJWTError,
+        ReadOnlyException,
+        PermissionDenied,
+        PersistedQueryNotFound,
+    )
 
     def __init__(
         self, schema=None, executor=None, middleware=None, root_value=None, backend=None
@@ -69,7 +101,7 @@ class GraphQLView(View):
         if schema is None:
             schema = graphene_settings.SCHEMA
         if backend is None:
-            backend = get_default_backend()
+            backend = default_backend
         if middleware is None:
             middleware = graphene_settings.MIDDLEWARE
         self.schema = self.schema or schema
@@ -119,7 +151,19 @@ class GraphQLView(View):
             )
 
         if isinstance(data, list):
-            responses = [self.get_response(request, entry) for entry in data]
+            if len(data) > settings.GRAPHQL_MAX_BATCH_SIZE:
+                message = (
+                    f"Batch contains {len(data)} operations, the maximum allowed "
+                    f"is {settings.GRAPHQL_MAX_BATCH_SIZE}."
+                )
+                return JsonResponse(
+                    data={"errors": [self.format_error(GraphQLError(message))]},
+                    status=400,
+                )
+            if settings.GRAPHQL_BATCH_WORKERS > 0:
+                responses = self.get_batch_responses_concurrently(request, data)
+            else:
+                responses = [self.get_response(request, entry) for entry in data]
             result: Union[list, Optional[dict]] = [
                 response for response, code in responses
             ]
@@ -160,6 +204,58 @@ class GraphQLView(View):
 
             return response
 
+    def get_batch_responses_concurrently(
+        self, request: HttpRequest, data: List[dict]
+    ) -> List[Tuple[Optional[Dict[str, List[Any]]], int]]:
+        """Execute queries from a batch concurrently, keeping mutations in order.
+
+        Mutations act as barriers: a mutation starts only after every previous
+        entry has finished and entries following it start after it is done.
+        Queries between mutations are executed on the batch thread pool.
+        """
+        executor = get_batch_executor()
+        parent_span = opentracing.global_tracer().active_span
+        responses: List[Tuple[Optional[Dict[str, List[Any]]], int]] = []
+        pending: List[Future] = []
+        for entry in data:
+            if self.is_mutation(request, entry):
+                responses.extend(future.result() for future in pending)
+                pending = []
+                responses.append(self.get_response(request, entry))
+            else:
+                pending.append(
+                    executor.submit(
+                        self.get_response_in_thread, request, entry, parent_span
+                    )
+                )
+        responses.extend(future.result() for future in pending)
+        return responses
+
+    def get_response_in_thread(
+        self, request: HttpRequest, data: dict, parent_span=None
+    ) -> Tuple[Optional[Dict[str, List[Any]]], int]:
+        # Every entry gets its own context, so dataloaders are not shared
+        # between threads, and its own database connection.
+        context = copy.copy(request)
+        context.dataloaders = {}  # type: ignore
+        try:
+            with opentracing.global_tracer().start_active_span(
+                "graphql_batch_entry", child_of=parent_span
+            ):
+                return self.get_response(context, data)
+        finally:
+            connections.close_all()
+
+    def is_mutation(self, request: HttpRequest, data: dict) -> bool:
+        if not isinstance(data, dict):
+            return False
+        query, _variables, operation_name = self.get_graphql_params(request, data)
+        document, _error = self.parse_query(query, self.get_persisted_query_hash(data))
+        if document is None:
+            return False
+        operation = get_operation_ast(document.document_ast, operation_name)
+        return operation is not None and operation.operation == "mutation"
+
     def get_response(
         self, request: HttpRequest, data: dict
     ) -> Tuple[Optional[Dict[str, List[Any]]], int]:
@@ -185,14 +281,20 @@ class GraphQLView(View):
         return self.root_value
 
     def parse_query(
-        self, query: str
+        self, query: str, query_hash: Optional[str] = None
     ) -> Tuple[Optional[GraphQLDocument], Optional[ExecutionResult]]:
         """Attempt to parse a query (mandatory) to a gql document object.
 
         If no query was given or query is not a string, it returns an error.
         If the query is invalid, it returns an error as well.
         Otherwise, it returns the parsed gql document.
+
+        When `query_hash` of a persisted query is given, the query string may be
+        omitted and the document is looked up by the hash instead.
         """
+        if query_hash is not None:
+            return self.parse_persisted_query(query, query_hash)
+
         if not query or not isinstance(query, str):
             return (
                 None,
@@ -204,22 +306,66 @@ class GraphQLView(View):
         # Attempt to parse the query, if it fails, return the error
         try:
             return (
-                self.backend.document_from_string(  # type: ignore
-                    self.schema, query
-                ),
+                self.backend.document_from_string(self.schema, query),  # type: ignore
                 None,
             )
         except (ValueError, GraphQLSyntaxError) as e:
             return None, ExecutionResult(errors=[e], invalid=True)
 
+    def parse_persisted_query(
+        self, query: Optional[str], query_hash: str
+    ) -> Tuple[Optional[GraphQLDocument], Optional[ExecutionResult]]:
+        if not isinstance(self.backend, CachedGraphQLBackend):
+            return (
+                None,
+                ExecutionResult(
+                    errors=[ValueError("Persisted queries are not supported.")],
+                    invalid=True,
+                ),
+            )
+
+        if not query:
+            document = self.backend.document_from_hash(self.schema, query_hash)
+            if document is None:
+                return (
+                    None,
+                    ExecutionResult(errors=[PersistedQueryNotFound()], invalid=True),
+                )
+            return document, None
+
+        if not isinstance(query, str) or get_query_hash(query) != query_hash:
+            return (
+                None,
+                ExecutionResult(
+                    errors=[ValueError("Provided sha256Hash does not match query.")],
+                    invalid=True,
+                ),
+            )
+
+        document, error = self.parse_query(query)
+        if (
+            document is not None
+            and not isinstance(document, InvalidGraphQLDocument)
+            and len(query) <= settings.GRAPHQL_PERSISTED_QUERY_MAX_LENGTH
+        ):
+            self.backend.persist_query(query_hash, query)
+        return document, error
+
     def execute_graphql_request(self, request: HttpRequest, data: dict):
         with opentracing.global_tracer().start_active_span("graphql_query") as scope:
             span = scope.span
             span.set_tag(opentracing.tags.COMPONENT, "GraphQL")
 
             query, variables, operation_name = self.get_graphql_params(request, data)
-
-            document, error = self.parse_query(query)
+            query_hash = self.get_persisted_query_hash(data)
+
+            document, error = self.parse_query(query, query_hash)
+            if isinstance(self.backend, CachedGraphQLBackend):
+                # Counters of this process, used to tune GRAPHQL_DOCUMENT_CACHE_SIZE
+                cache_info = self.backend.cache_info()
+                span.set_tag("graphql.document_cache.hits", cache_info.hits)
+                span.set_tag("graphql.document_cache.misses", cache_info.misses)
+                span.set_tag("graphql.document_cache.size", cache_info.current_size)
             if error:
                 return error
 
@@ -281,6 +427,22 @@ class GraphQLView(View):
             variables = operations.get("variables")
         return query, variables, operation_name
 
+    @staticmethod
+    def get_persisted_query_hash(data: dict) -> Optional[str]:
+        extensions = data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                return None
+        if not isinstance(extensions, dict):
+            return None
+        persisted_query = extensions.get("persistedQuery")
+        if not isinstance(persisted_query, dict):
+            return None
+        query_hash = persisted_query.get("sha256Hash")
+        return str(query_hash) if query_hash else None
+
     @classmethod
     def format_error(cls, error):
         if isinstance(error, GraphQLError):
@@ -3,11 +3,16 @@ from typing import DefaultDict, Iterable, List, Optional, Tuple
 
 from django.conf import settings
 
+from ...warehouse.availability import (
+    ProductStockAvailability,
+    get_products_stock_availability,
+)
 from ...warehouse.models import Stock
 from ..core.dataloaders import DataLoader
 
 CountryCode = Optional[str]
 VariantIdAndCountryCode = Tuple[int, CountryCode]
+ProductIdAndCountryCode = Tuple[int, CountryCode]
 
 
 class AvailableQuantityByProductVariantIdAndCountryCodeLoader(
@@ -78,3 +83,26 @@ class AvailableQuantityByProductVariantIdAndCountryCodeLoader(
             )
             for variant_id in variant_ids
         ]
+
+
+class StockAvailabilityByProductIdAndCountryCodeLoader(
+    DataLoader[ProductIdAndCountryCode, ProductStockAvailability]
+):
+    """Checks if products are in stock based on product ID and country code."""
+
+    context_key = "stock_availability_by_product_and_country"
+
+    def batch_load(self, keys):
+        products_by_country: DefaultDict[CountryCode, List[int]] = defaultdict(list)
+        for product_id, country_code in keys:
+            products_by_country[country_code].append(product_id)
+
+        availability_by_product_and_country = {}
+        for country_code, product_ids in products_by_country.items():
+            availability = get_products_stock_availability(product_ids, country_code)
+            for product_id, product_availability in availability.items():
+                availability_by_product_and_country[
+                    (product_id, country_code)
+                ] = product_availability
+
+        return [availability_by_product_and_country[key] for key in keys]
@@ -1,5 +1,6 @@
 import graphene
 
+from ...webhook import WebhookDeliveryStatus
 from ...webhook.event_types import WebhookEventType
 from ..core.utils import str_to_enum
 
@@ -15,3 +16,7 @@ WebhookSampleEventTypeEnum = graphene.Enum(
         if e_type[0] != WebhookEventType.ANY
     ],
 )
+WebhookDeliveryStatusEnum = graphene.Enum(
+    "WebhookDeliveryStatusEnum",
+    [(str_to_enum(status[0]), status[0]) for status in WebhookDeliveryStatus.CHOICES],
+)
@@ -1,10 +1,13 @@
 import graphene
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from ...core.permissions import AppPermission
+from ...plugins.webhook.tasks import replay_dead_letters
 from ...webhook import models
 from ...webhook.error_codes import WebhookErrorCode
-from ..core.mutations import ModelDeleteMutation, ModelMutation
+from ...webhook.utils import invalidate_webhooks
+from ..core.mutations import BaseBulkMutation, ModelDeleteMutation, ModelMutation
 from ..core.types.common import WebhookError
 from .enums import WebhookEventTypeEnum
 
@@ -34,6 +37,17 @@ class WebhookCreateInput(graphene.InputObjectType):
         description="The secret key used to create a hash signature with each payload.",
         required=False,
     )
+    batch_size = graphene.Int(
+        description=(
+            "Maximum number of events delivered together as a JSON array. Events "
+            "are delivered one by one when not set."
+        ),
+        required=False,
+    )
+    batch_window = graphene.Int(
+        description="Number of seconds events are buffered for before delivery.",
+        required=False,
+    )
 
 
 class WebhookCreate(ModelMutation):
@@ -98,6 +112,8 @@ class WebhookCreate(ModelMutation):
                 for event in events
             ]
         )
+        # Events created in bulk do not send signals
+        invalidate_webhooks()
 
 
 class WebhookUpdateInput(graphene.InputObjectType):
@@ -127,6 +143,17 @@ class WebhookUpdateInput(graphene.InputObjectType):
     secret_key = graphene.String(
         description="Use to create a hash signature with each payload.", required=False
     )
+    batch_size = graphene.Int(
+        description=(
+            "Maximum number of events delivered together as a JSON array. Events "
+            "are delivered one by one when not set."
+        ),
+        required=False,
+    )
+    batch_window = graphene.Int(
+        description="Number of seconds events are buffered for before delivery.",
+        required=False,
+    )
 
 
 class WebhookUpdate(ModelMutation):
@@ -151,6 +178,8 @@ class WebhookUpdate(ModelMutation):
         app = cleaned_input.get("app", service_account)
         if app:
             cleaned_input["app"] = app
+        if cleaned_input.get("is_active") and not instance.is_active:
+            cleaned_input["activated_at"] = timezone.now()
         return cleaned_input
 
     @classmethod
@@ -165,6 +194,7 @@ class WebhookUpdate(ModelMutation):
                     for event in events
                 ]
             )
+            invalidate_webhooks()
 
 
 class WebhookDelete(ModelDeleteMutation):
@@ -205,3 +235,26 @@ class WebhookDelete(ModelDeleteMutation):
                 )
 
         return super().perform_mutation(_root, info, **data)
+
+
+class WebhookDeadLettersReplay(BaseBulkMutation):
+    class Arguments:
+        ids = graphene.List(
+            graphene.ID,
+            required=True,
+            description="List of IDs of the dead letters to send again.",
+        )
+
+    class Meta:
+        description = (
+            "Sends payloads of undelivered events again, to the current targets of "
+            "their webhooks."
+        )
+        model = models.WebhookDeadLetter
+        permissions = (AppPermission.MANAGE_APPS,)
+        error_type_class = WebhookError
+        error_type_field = "webhook_errors"
+
+    @classmethod
+    def bulk_action(cls, queryset):
+        replay_dead_letters(queryset)
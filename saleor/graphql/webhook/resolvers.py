@@ -1,8 +1,9 @@
 import graphene
+from django.db.models import Avg, Count, Q
 
 from ...core.exceptions import PermissionDenied
 from ...core.permissions import AppPermission
-from ...webhook import models, payloads
+from ...webhook import WebhookDeliveryStatus, models, payloads
 from ...webhook.event_types import WebhookEventType
 from .types import Webhook, WebhookEvent
 
@@ -46,3 +47,36 @@ def resolve_sample_payload(info, event_name):
         if info.context.user.has_perm(required_permission):
             return payloads.generate_sample_payload(event_name)
     raise PermissionDenied()
+
+
+def resolve_dead_letter_payload(info, dead_letter):
+    app = info.context.app
+    # Payloads of batches hold events of all their comma-separated event types
+    for event_name in dead_letter.event_type.split(","):
+        required_permission = WebhookEventType.PERMISSIONS.get(event_name)
+        if not required_permission:
+            raise PermissionDenied()
+        if app and app.has_perm(required_permission):
+            continue
+        if not info.context.user.has_perm(required_permission):
+            raise PermissionDenied()
+    return dead_letter.data
+
+
+def resolve_webhook_delivery_stats(webhooks):
+    stats = models.WebhookDeliveryAttempt.objects.filter(
+        webhook__in=webhooks
+    ).aggregate(
+        attempts_count=Count("id"),
+        failed_attempts_count=Count(
+            "id", filter=Q(status=WebhookDeliveryStatus.FAILED)
+        ),
+        average_duration=Avg("duration"),
+    )
+    stats["dead_letters_count"] = models.WebhookDeadLetter.objects.filter(
+        webhook__in=webhooks
+    ).count()
+    stats["buffered_events_count"] = models.BufferedWebhookEvent.objects.filter(
+        webhook__in=webhooks
+    ).count()
+    return stats
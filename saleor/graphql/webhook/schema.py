@@ -5,7 +5,12 @@ from ..core.fields import FilterInputConnectionField
 from ..decorators import permission_required
 from .enums import WebhookSampleEventTypeEnum
 from .filters import WebhookFilterInput
-from .mutations import WebhookCreate, WebhookDelete, WebhookUpdate
+from .mutations import (
+    WebhookCreate,
+    WebhookDeadLettersReplay,
+    WebhookDelete,
+    WebhookUpdate,
+)
 from .resolvers import (
     resolve_sample_payload,
     resolve_webhook,
@@ -73,3 +78,4 @@ class WebhookMutations(graphene.ObjectType):
     webhook_create = WebhookCreate.Field()
     webhook_delete = WebhookDelete.Field()
     webhook_update = WebhookUpdate.Field()
+    webhook_dead_letters_replay = WebhookDeadLettersReplay.Field()
@@ -2,10 +2,13 @@ from unittest.mock import patch
 
 import graphene
 import pytest
+from django.utils import timezone
+from freezegun import freeze_time
 
 from ....app.models import App
+from ....webhook import WebhookDeliveryStatus
 from ....webhook.event_types import WebhookEventType
-from ....webhook.models import Webhook
+from ....webhook.models import Webhook, WebhookDeadLetter
 from ...tests.utils import assert_no_permission, get_graphql_content
 from ..enums import WebhookEventTypeEnum, WebhookSampleEventTypeEnum
 
@@ -284,6 +287,107 @@ def test_webhook_update_by_staff(
     assert events[0].event_type == WebhookEventTypeEnum.CUSTOMER_CREATED.value
 
 
+@freeze_time("2020-03-18 12:00:00")
+def test_webhook_update_activation_sets_activated_at(
+    staff_api_client, webhook, permission_manage_apps
+):
+    # given
+    webhook.is_active = False
+    webhook.save(update_fields=["is_active"])
+    webhook_id = graphene.Node.to_global_id("Webhook", webhook.pk)
+    variables = {
+        "id": webhook_id,
+        "events": [WebhookEventTypeEnum.ORDER_CREATED.name],
+        "is_active": True,
+    }
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(WEBHOOK_UPDATE, variables=variables)
+
+    # then
+    get_graphql_content(response)
+    webhook.refresh_from_db()
+    assert webhook.is_active is True
+    assert webhook.activated_at == timezone.now()
+
+
+def test_webhook_update_keeps_activated_at_of_active_webhook(
+    staff_api_client, webhook, permission_manage_apps
+):
+    # given
+    webhook_id = graphene.Node.to_global_id("Webhook", webhook.pk)
+    variables = {
+        "id": webhook_id,
+        "events": [WebhookEventTypeEnum.ORDER_CREATED.name],
+        "is_active": True,
+    }
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(WEBHOOK_UPDATE, variables=variables)
+
+    # then
+    get_graphql_content(response)
+    webhook.refresh_from_db()
+    assert webhook.activated_at is None
+
+
+WEBHOOK_UPDATE_BATCHING = """
+    mutation webhookUpdate($id: ID!, $batchSize: Int, $batchWindow: Int){
+      webhookUpdate(id: $id, input:{batchSize: $batchSize, batchWindow: $batchWindow}){
+        webhookErrors{
+          field
+          code
+        }
+        webhook{
+          batchSize
+          batchWindow
+        }
+      }
+    }
+"""
+
+
+def test_webhook_update_batching_by_staff(
+    staff_api_client, webhook, permission_manage_apps
+):
+    # given
+    webhook_id = graphene.Node.to_global_id("Webhook", webhook.pk)
+    variables = {"id": webhook_id, "batchSize": 50, "batchWindow": 30}
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(WEBHOOK_UPDATE_BATCHING, variables)
+
+    # then
+    content = get_graphql_content(response)
+    data = content["data"]["webhookUpdate"]
+    assert data["webhook"] == {"batchSize": 50, "batchWindow": 30}
+    webhook.refresh_from_db()
+    assert webhook.batch_size == 50
+    assert webhook.batch_window == 30
+
+
+def test_webhook_update_invalid_batch_size(
+    staff_api_client, webhook, permission_manage_apps
+):
+    # given
+    webhook_id = graphene.Node.to_global_id("Webhook", webhook.pk)
+    variables = {"id": webhook_id, "batchSize": 0}
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(WEBHOOK_UPDATE_BATCHING, variables)
+
+    # then
+    content = get_graphql_content(response)
+    errors = content["data"]["webhookUpdate"]["webhookErrors"]
+    assert errors == [{"field": "batchSize", "code": "INVALID"}]
+    webhook.refresh_from_db()
+    assert webhook.batch_size is None
+
+
 def test_webhook_update_by_staff_without_permission(staff_api_client, app, webhook):
     query = WEBHOOK_UPDATE
     webhook_id = graphene.Node.to_global_id("Webhook", webhook.pk)
@@ -640,3 +744,275 @@ def test_sample_payload_query_by_staff(
     else:
         get_graphql_content(response)
         mock_generate_sample_payload.assert_called_with(event_type.value)
+
+
+QUERY_WEBHOOK_DELIVERIES = """
+    query webhook($id: ID!){
+      webhook(id: $id){
+        deliveryAttempts(first: 10){
+          edges{
+            node{
+              eventType
+              status
+              attempt
+              responseStatusCode
+              error
+            }
+          }
+        }
+        deadLetters(first: 10){
+          edges{
+            node{
+              eventType
+              payload
+              batchSize
+              error
+            }
+          }
+        }
+        deliveryStats{
+          attemptsCount
+          failedAttemptsCount
+          averageDuration
+          deadLettersCount
+          bufferedEventsCount
+        }
+      }
+    }
+"""
+
+
+def test_query_webhook_deliveries(
+    staff_api_client, webhook, permission_manage_apps, permission_manage_orders
+):
+    # given
+    webhook.delivery_attempts.create(
+        event_type="order_created",
+        status=WebhookDeliveryStatus.FAILED,
+        attempt=1,
+        duration=0.3,
+        response_status_code=500,
+        error="500 Server Error",
+    )
+    webhook.delivery_attempts.create(
+        event_type="order_created",
+        status=WebhookDeliveryStatus.SUCCESS,
+        attempt=2,
+        duration=0.1,
+        response_status_code=200,
+    )
+    webhook.dead_letters.create(
+        event_type="order_updated", data="[]", error="Connection refused."
+    )
+    variables = {"id": graphene.Node.to_global_id("Webhook", webhook.pk)}
+    staff_api_client.user.user_permissions.add(
+        permission_manage_apps, permission_manage_orders
+    )
+
+    # when
+    response = staff_api_client.post_graphql(
+        QUERY_WEBHOOK_DELIVERIES, variables=variables
+    )
+
+    # then
+    content = get_graphql_content(response)
+    data = content["data"]["webhook"]
+    attempts = [edge["node"] for edge in data["deliveryAttempts"]["edges"]]
+    assert [(a["attempt"], a["status"]) for a in attempts] == [
+        (2, "SUCCESS"),
+        (1, "FAILED"),
+    ]
+    assert attempts[1]["responseStatusCode"] == 500
+    assert attempts[1]["error"] == "500 Server Error"
+    assert data["deadLetters"]["edges"] == [
+        {
+            "node": {
+                "eventType": "order_updated",
+                "payload": "[]",
+                "batchSize": None,
+                "error": "Connection refused.",
+            }
+        }
+    ]
+    assert data["deliveryStats"] == {
+        "attemptsCount": 2,
+        "failedAttemptsCount": 1,
+        "averageDuration": pytest.approx(0.2),
+        "deadLettersCount": 1,
+        "bufferedEventsCount": 0,
+    }
+
+
+QUERY_WEBHOOK_DEAD_LETTER_PAYLOADS = """
+    query webhook($id: ID!){
+      webhook(id: $id){
+        deadLetters(first: 10){
+          edges{
+            node{
+              eventType
+              payload
+            }
+          }
+        }
+      }
+    }
+"""
+
+
+def test_query_webhook_dead_letter_payload_without_event_permission(
+    staff_api_client, webhook, permission_manage_apps, permission_manage_orders
+):
+    # given
+    webhook.dead_letters.create(event_type="order_created", data="[]")
+    webhook.dead_letters.create(event_type="customer_created", data="[]")
+    webhook.dead_letters.create(
+        event_type="order_created,customer_created", data="[]", batch_size=2
+    )
+    variables = {"id": graphene.Node.to_global_id("Webhook", webhook.pk)}
+    staff_api_client.user.user_permissions.add(
+        permission_manage_apps, permission_manage_orders
+    )
+
+    # when
+    response = staff_api_client.post_graphql(
+        QUERY_WEBHOOK_DEAD_LETTER_PAYLOADS, variables=variables
+    )
+
+    # then
+    assert_no_permission(response)
+    content = get_graphql_content(response, ignore_errors=True)
+    dead_letters = [
+        edge["node"] for edge in content["data"]["webhook"]["deadLetters"]["edges"]
+    ]
+    assert dead_letters == [
+        {"eventType": "order_created", "payload": "[]"},
+        {"eventType": "customer_created", "payload": None},
+        {"eventType": "order_created,customer_created", "payload": None},
+    ]
+
+
+def test_query_webhook_dead_letter_payload_by_app(
+    app_api_client, webhook, permission_manage_users
+):
+    # given
+    webhook.app.permissions.add(permission_manage_users)
+    webhook.dead_letters.create(event_type="customer_created", data="[]")
+    variables = {"id": graphene.Node.to_global_id("Webhook", webhook.pk)}
+
+    # when
+    response = app_api_client.post_graphql(
+        QUERY_WEBHOOK_DEAD_LETTER_PAYLOADS, variables=variables
+    )
+
+    # then
+    content = get_graphql_content(response)
+    dead_letters = content["data"]["webhook"]["deadLetters"]["edges"]
+    assert dead_letters == [
+        {"node": {"eventType": "customer_created", "payload": "[]"}}
+    ]
+
+
+QUERY_APP_WEBHOOK_DELIVERY_STATS = """
+    query app($id: ID!){
+      app(id: $id){
+        webhookDeliveryStats{
+          attemptsCount
+          failedAttemptsCount
+          deadLettersCount
+        }
+      }
+    }
+"""
+
+
+def test_query_app_webhook_delivery_stats(
+    staff_api_client, app, webhook, permission_manage_apps
+):
+    # given
+    second_webhook = Webhook.objects.create(
+        app=app, target_url="http://www.example.com/second"
+    )
+    for hook in [webhook, second_webhook]:
+        hook.delivery_attempts.create(
+            event_type="order_created",
+            status=WebhookDeliveryStatus.FAILED,
+            attempt=1,
+            duration=0.1,
+        )
+    second_webhook.dead_letters.create(event_type="order_created", data="[]")
+    variables = {"id": graphene.Node.to_global_id("App", app.pk)}
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(
+        QUERY_APP_WEBHOOK_DELIVERY_STATS, variables=variables
+    )
+
+    # then
+    content = get_graphql_content(response)
+    assert content["data"]["app"]["webhookDeliveryStats"] == {
+        "attemptsCount": 2,
+        "failedAttemptsCount": 2,
+        "deadLettersCount": 1,
+    }
+
+
+WEBHOOK_DEAD_LETTERS_REPLAY = """
+    mutation webhookDeadLettersReplay($ids: [ID]!){
+      webhookDeadLettersReplay(ids: $ids){
+        count
+        webhookErrors{
+          field
+          code
+        }
+      }
+    }
+"""
+
+
+@patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+def test_webhook_dead_letters_replay(
+    mocked_send_webhook_request, staff_api_client, webhook, permission_manage_apps
+):
+    # given
+    dead_letter = webhook.dead_letters.create(event_type="order_created", data="[]")
+    variables = {
+        "ids": [graphene.Node.to_global_id("WebhookDeadLetter", dead_letter.pk)]
+    }
+    staff_api_client.user.user_permissions.add(permission_manage_apps)
+
+    # when
+    response = staff_api_client.post_graphql(
+        WEBHOOK_DEAD_LETTERS_REPLAY, variables=variables
+    )
+
+    # then
+    content = get_graphql_content(response)
+    data = content["data"]["webhookDeadLettersReplay"]
+    assert data["count"] == 1
+    assert not data["webhookErrors"]
+    assert not WebhookDeadLetter.objects.exists()
+    mocked_send_webhook_request.assert_called_once_with(
+        webhook.pk, webhook.target_url, webhook.secret_key, "order_created", "[]"
+    )
+
+
+@patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+def test_webhook_dead_letters_replay_without_permission(
+    mocked_send_webhook_request, staff_api_client, webhook
+):
+    # given
+    dead_letter = webhook.dead_letters.create(event_type="order_created", data="[]")
+    variables = {
+        "ids": [graphene.Node.to_global_id("WebhookDeadLetter", dead_letter.pk)]
+    }
+
+    # when
+    response = staff_api_client.post_graphql(
+        WEBHOOK_DEAD_LETTERS_REPLAY, variables=variables
+    )
+
+    # then
+    assert_no_permission(response)
+    assert WebhookDeadLetter.objects.exists()
+    mocked_send_webhook_request.assert_not_called()
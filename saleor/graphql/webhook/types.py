@@ -4,7 +4,8 @@ from ...webhook import models
 from ...webhook.event_types import WebhookEventType
 from ..account.deprecated.types import ServiceAccount
 from ..core.connection import CountableDjangoObjectType
-from .enums import WebhookEventTypeEnum
+from ..core.fields import PrefetchingConnectionField
+from .enums import WebhookDeliveryStatusEnum, WebhookEventTypeEnum
 
 
 class WebhookEvent(CountableDjangoObjectType):
@@ -23,6 +24,73 @@ class WebhookEvent(CountableDjangoObjectType):
         return WebhookEventType.DISPLAY_LABELS.get(root.event_type) or root.event_type
 
 
+class WebhookDeliveryAttempt(CountableDjangoObjectType):
+    status = WebhookDeliveryStatusEnum(
+        description="Status of the delivery attempt.", required=True
+    )
+    attempt = graphene.Int(
+        description="Number of the attempt of delivering the event, starting from 1.",
+        required=True,
+    )
+    duration = graphene.Float(
+        description="Time of the delivery in seconds.", required=True
+    )
+    response_status_code = graphene.Int(
+        description="HTTP status code of the response of the webhook target."
+    )
+
+    class Meta:
+        description = "Attempt of delivering an event to a webhook."
+        model = models.WebhookDeliveryAttempt
+        interfaces = [graphene.relay.Node]
+        only_fields = ["created_at", "event_type", "error"]
+
+
+class WebhookDeadLetter(CountableDjangoObjectType):
+    payload = graphene.String(
+        description=(
+            "Payload of the event. Requires the permission of each of its event types."
+        )
+    )
+    batch_size = graphene.Int(
+        description="Number of events of the payload, if it is a batch of events."
+    )
+
+    class Meta:
+        description = "Event which could not be delivered to a webhook."
+        model = models.WebhookDeadLetter
+        interfaces = [graphene.relay.Node]
+        only_fields = ["created_at", "event_type", "error"]
+
+    @staticmethod
+    def resolve_payload(root: models.WebhookDeadLetter, info, **_kwargs):
+        from .resolvers import resolve_dead_letter_payload
+
+        return resolve_dead_letter_payload(info, root)
+
+
+class WebhookDeliveryStats(graphene.ObjectType):
+    attempts_count = graphene.Int(
+        description="Number of the recent delivery attempts.", required=True
+    )
+    failed_attempts_count = graphene.Int(
+        description="Number of the recent failed delivery attempts.", required=True
+    )
+    average_duration = graphene.Float(
+        description="Average time of the recent delivery attempts in seconds."
+    )
+    dead_letters_count = graphene.Int(
+        description="Number of events which could not be delivered.", required=True
+    )
+    buffered_events_count = graphene.Int(
+        description="Number of events waiting to be delivered in a batch.",
+        required=True,
+    )
+
+    class Meta:
+        description = "Statistics of deliveries of webhooks."
+
+
 class Webhook(CountableDjangoObjectType):
     name = graphene.String(required=True)
     events = graphene.List(
@@ -38,6 +106,28 @@ class Webhook(CountableDjangoObjectType):
         ),
     )
     app = graphene.Field("saleor.graphql.app.types.App", required=True)
+    delivery_attempts = PrefetchingConnectionField(
+        WebhookDeliveryAttempt,
+        description="Recent delivery attempts, starting from the latest one.",
+    )
+    dead_letters = PrefetchingConnectionField(
+        WebhookDeadLetter, description="Events which could not be delivered."
+    )
+    delivery_stats = graphene.Field(
+        WebhookDeliveryStats,
+        description="Statistics of the recent deliveries.",
+        required=True,
+    )
+    batch_size = graphene.Int(
+        description=(
+            "Maximum number of events delivered together as a JSON array. Events "
+            "are delivered one by one when not set."
+        )
+    )
+    batch_window = graphene.Int(
+        description="Number of seconds events are buffered for before delivery.",
+        required=True,
+    )
 
     class Meta:
         description = "Webhook."
@@ -48,6 +138,8 @@ class Webhook(CountableDjangoObjectType):
             "is_active",
             "secret_key",
             "name",
+            "batch_size",
+            "batch_window",
         ]
 
     @staticmethod
@@ -57,3 +149,17 @@ class Webhook(CountableDjangoObjectType):
     @staticmethod
     def resolve_events(root: models.Webhook, *_args, **_kwargs):
         return root.events.all()
+
+    @staticmethod
+    def resolve_delivery_attempts(root: models.Webhook, *_args, **_kwargs):
+        return root.delivery_attempts.all()
+
+    @staticmethod
+    def resolve_dead_letters(root: models.Webhook, *_args, **_kwargs):
+        return root.dead_letters.all()
+
+    @staticmethod
+    def resolve_delivery_stats(root: models.Webhook, *_args, **_kwargs):
+        from .resolvers import resolve_webhook_delivery_stats
+
+        return resolve_webhook_delivery_stats(models.Webhook.objects.filter(pk=root.pk))
@@ -3,6 +3,7 @@ from unittest.mock import patch
 import pytest
 
 from ...core.exceptions import InsufficientStock
+from ...warehouse.management import deallocate_stock_for_order
 from ...warehouse.models import Allocation, Stock
 from ..actions import create_fulfillments
 from ..models import FulfillmentLine, OrderStatus
@@ -241,6 +242,7 @@ def test_create_fulfillments_without_allocations(
 ):
     order = order_with_lines
     order_line1, order_line2 = order.lines.all()
+    deallocate_stock_for_order(order)
     Allocation.objects.filter(order_line__order=order).delete()
     fulfillment_lines_for_warehouses = {
         str(warehouse.pk): [
@@ -1,5 +1,7 @@
+import inspect
+import threading
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import opentracing
 from django.conf import settings
@@ -10,15 +12,16 @@ from django_countries.fields import Country
 from prices import Money, MoneyRange, TaxedMoney, TaxedMoneyRange
 
 from ..checkout import base_calculations
+from ..core.cache import bump_cache_version, get_cache_version, is_cache_shared
 from ..core.payments import PaymentInterface
 from ..core.prices import quantize_price
 from ..core.taxes import TaxType, zero_taxed_money
 from ..discount import DiscountInfo
+from .base_plugin import BasePlugin
 from .models import PluginConfiguration
 
 if TYPE_CHECKING:
     # flake8: noqa
-    from .base_plugin import BasePlugin
     from ..checkout.models import Checkout, CheckoutLine
     from ..product.models import Product, ProductType
     from ..account.models import Address, User
@@ -34,6 +37,15 @@ if TYPE_CHECKING:
     )
 
 
+# Methods a plugin can override to hook into the manager, mapped to their
+# default implementations
+PLUGIN_HOOKS = {
+    name: value
+    for name, value in vars(BasePlugin).items()
+    if inspect.isfunction(value) and not name.startswith("_")
+}
+
+
 class PluginsManager(PaymentInterface):
     """Base manager for handling plugins logic."""
 
@@ -52,16 +64,30 @@ class PluginsManager(PaymentInterface):
                 plugin_config = PluginClass.DEFAULT_CONFIGURATION
                 active = PluginClass.get_default_active()
             self.plugins.append(PluginClass(configuration=plugin_config, active=active))
+        self.hooks = self._get_plugins_per_hook()
+
+    def _get_plugins_per_hook(self) -> Dict[str, List["BasePlugin"]]:
+        """Map each hook to the active plugins that override it, in order."""
+        hooks: Dict[str, List["BasePlugin"]] = {}
+        for plugin in self.get_active_plugins():
+            plugin_class = type(plugin)
+            for hook, default_implementation in PLUGIN_HOOKS.items():
+                if getattr(plugin_class, hook) is not default_implementation:
+                    hooks.setdefault(hook, []).append(plugin)
+        return hooks
 
     def __run_method_on_plugins(
         self, method_name: str, default_value: Any, *args, **kwargs
     ):
         """Try to run a method with the given name on each declared plugin."""
+        plugins = self.hooks.get(method_name)
+        if not plugins:
+            return default_value
         with opentracing.global_tracer().start_active_span(
             f"ExtensionsManager.{method_name}"
         ):
             value = default_value
-            for plugin in self.plugins:
+            for plugin in plugins:
                 value = self.__run_method_on_single_plugin(
                     plugin, method_name, value, *args, **kwargs
                 )
@@ -103,11 +129,24 @@ class PluginsManager(PaymentInterface):
         checkout: "Checkout",
         lines: Iterable["CheckoutLine"],
         discounts: Iterable[DiscountInfo],
+        *,
+        subtotal: Optional[TaxedMoney] = None,
+        shipping_price: Optional[TaxedMoney] = None,
     ) -> TaxedMoney:
+        """Calculate checkout total.
 
+        Already calculated `subtotal` and `shipping_price` can be passed to not
+        calculate them again.
+        """
+        if subtotal is None:
+            subtotal = self.calculate_checkout_subtotal(checkout, lines, discounts)
+        if shipping_price is None:
+            shipping_price = self.calculate_checkout_shipping(
+                checkout, lines, discounts
+            )
         default_value = base_calculations.base_checkout_total(
-            subtotal=self.calculate_checkout_subtotal(checkout, lines, discounts),
-            shipping_price=self.calculate_checkout_shipping(checkout, lines, discounts),
+            subtotal=subtotal,
+            shipping_price=shipping_price,
             discount=checkout.discount,
             currency=checkout.currency,
         )
@@ -123,10 +162,18 @@ class PluginsManager(PaymentInterface):
         checkout: "Checkout",
         lines: Iterable["CheckoutLine"],
         discounts: Iterable[DiscountInfo],
+        *,
+        line_totals: Optional[List[TaxedMoney]] = None,
     ) -> TaxedMoney:
-        line_totals = [
-            self.calculate_checkout_line_total(line, discounts) for line in lines
-        ]
+        """Calculate checkout subtotal.
+
+        Already calculated totals of all `lines` can be passed as `line_totals`
+        to not calculate them again.
+        """
+        if line_totals is None:
+            line_totals = [
+                self.calculate_checkout_line_total(line, discounts) for line in lines
+            ]
         default_value = base_calculations.base_checkout_subtotal(
             line_totals, checkout.currency
         )
@@ -514,7 +561,11 @@ class PluginsManager(PaymentInterface):
 
     def fetch_taxes_data(self) -> bool:
         default_value = False
-        return self.__run_method_on_plugins("fetch_taxes_data", default_value)
+        fetched = self.__run_method_on_plugins("fetch_taxes_data", default_value)
+        if fetched:
+            # Plugins may keep fetched tax rates in memory
+            invalidate_plugins_managers()
+        return fetched
 
     def webhook(self, request: WSGIRequest, plugin_id: str) -> HttpResponse:
         split_path = request.path.split(plugin_id, maxsplit=1)
@@ -531,12 +582,47 @@ class PluginsManager(PaymentInterface):
         )
 
 
+PLUGINS_CONFIGURATION_VERSION_CACHE_KEY = "plugins_configuration_version"
+
+_managers: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, PluginsManager]] = {}
+_managers_lock = threading.Lock()
+
+
+def invalidate_plugins_managers():
+    """Make every worker rebuild its plugins managers on the next use."""
+    bump_cache_version(PLUGINS_CONFIGURATION_VERSION_CACHE_KEY)
+
+
+def clear_plugins_managers():
+    """Drop the plugins managers cached in this process."""
+    with _managers_lock:
+        _managers.clear()
+
+
 def get_plugins_manager(
     manager_path: str = None, plugins: List[str] = None
 ) -> PluginsManager:
+    """Return a plugins manager shared by the whole process.
+
+    Managers are rebuilt when the plugins configuration version stored in the
+    cache changes, which happens whenever a `PluginConfiguration` is saved or
+    deleted in any worker. Without a cache shared by all processes a new
+    manager is returned on every call.
+    """
     if not manager_path:
         manager_path = settings.PLUGINS_MANAGER
     if plugins is None:
         plugins = settings.PLUGINS
-    manager = import_string(manager_path)
-    return manager(plugins)
+    if not is_cache_shared():
+        return import_string(manager_path)(plugins)
+    key = (manager_path, tuple(plugins))
+    version = get_cache_version(PLUGINS_CONFIGURATION_VERSION_CACHE_KEY)
+    with _managers_lock:
+        cached = _managers.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    manager = import_string(manager_path)(plugins)
+    with _managers_lock:
+        _managers[key] = (version, manager)
+    return manager
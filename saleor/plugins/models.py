@@ -1,6 +1,10 @@
 from django.db import models
 from django.db.models import JSONField  # type: ignore
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django_prices_vatlayer.models import VAT, RateTypes
 
+from ..core.cache import invalidate_now_and_on_commit
 from ..core.permissions import PluginsPermissions
 from ..core.utils.json_serializer import CustomJsonEncoder
 
@@ -19,3 +23,13 @@ class PluginConfiguration(models.Model):
 
     def __str__(self):
         return f"Configuration of {self.name}, active: {self.active}"
+
+
+@receiver([post_save, post_delete], sender=PluginConfiguration)
+# Plugins keep tax rates they fetched, so they are rebuilt when rates change
+@receiver([post_save, post_delete], sender=VAT)
+@receiver([post_save, post_delete], sender=RateTypes)
+def handle_plugin_configuration_change(**_kwargs):
+    from .manager import invalidate_plugins_managers
+
+    invalidate_now_and_on_commit(invalidate_plugins_managers)
@@ -0,0 +1,58 @@
+from unittest.mock import Mock
+
+import pytest
+
+from ...manager import PluginsManager
+from ...models import PluginConfiguration
+from ...vatlayer.plugin import VatlayerPlugin
+
+PLUGINS = [
+    "saleor.plugins.avatax.plugin.AvataxPlugin",
+    "saleor.plugins.vatlayer.plugin.VatlayerPlugin",
+    "saleor.plugins.webhook.plugin.WebhookPlugin",
+    "saleor.payment.gateways.dummy.plugin.DummyGatewayPlugin",
+]
+
+CHECKOUT_HOOKS = [
+    "calculate_checkout_line_total",
+    "calculate_checkout_subtotal",
+    "calculate_checkout_shipping",
+    "calculate_checkout_total",
+]
+
+
+@pytest.mark.django_db
+def test_checkout_hooks_dispatched_only_to_active_implementing_plugins(
+    checkout_with_item, discount_info
+):
+    # given
+    PluginConfiguration.objects.create(
+        identifier=VatlayerPlugin.PLUGIN_ID,
+        name=VatlayerPlugin.PLUGIN_NAME,
+        active=True,
+    )
+    manager = PluginsManager(plugins=PLUGINS)
+    spies = {}
+    for plugin in manager.plugins:
+        for hook in CHECKOUT_HOOKS:
+            spy = Mock(wraps=getattr(plugin, hook))
+            setattr(plugin, hook, spy)
+            spies[plugin.PLUGIN_ID, hook] = spy
+    lines = list(checkout_with_item)
+    discounts = [discount_info]
+
+    # when
+    manager.calculate_checkout_line_total(lines[0], discounts)
+    manager.calculate_checkout_subtotal(checkout_with_item, lines, discounts)
+    manager.calculate_checkout_shipping(checkout_with_item, lines, discounts)
+    manager.calculate_checkout_total(checkout_with_item, lines, discounts)
+
+    # then
+    # Avatax implements all the hooks, but it is not active, and Vatlayer does
+    # not implement the subtotal hook
+    called_hooks = {key for key, spy in spies.items() if spy.called}
+    assert called_hooks == {
+        (VatlayerPlugin.PLUGIN_ID, "calculate_checkout_line_total"),
+        (VatlayerPlugin.PLUGIN_ID, "calculate_checkout_shipping"),
+        (VatlayerPlugin.PLUGIN_ID, "calculate_checkout_total"),
+    }
@@ -3,10 +3,19 @@ from django_prices_vatlayer.models import VAT
 from django_prices_vatlayer.utils import get_tax_for_rate
 
 from ..base_plugin import ConfigurationTypeField
+from ..manager import clear_plugins_managers
 from ..models import PluginConfiguration
 from .sample_plugins import PluginInactive, PluginSample
 
 
+@pytest.fixture(autouse=True)
+def clear_cached_plugins_managers():
+    # Database changes are rolled back between tests without sending signals
+    clear_plugins_managers()
+    yield
+    clear_plugins_managers()
+
+
 @pytest.fixture
 def plugin_configuration(db):
     configuration, _ = PluginConfiguration.objects.get_or_create(
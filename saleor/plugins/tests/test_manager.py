@@ -1,14 +1,21 @@
 import json
 from decimal import Decimal
+from unittest import mock
 
 import pytest
+from django.core.cache import cache
 from django.http import HttpResponseNotFound, JsonResponse
 from django_countries.fields import Country
+from django_prices_vatlayer.models import VAT, RateTypes
 from prices import Money, TaxedMoney
 
 from ...core.taxes import TaxType
 from ...payment.interface import PaymentGateway
-from ..manager import PluginsManager, get_plugins_manager
+from ..manager import (
+    PLUGINS_CONFIGURATION_VERSION_CACHE_KEY,
+    PluginsManager,
+    get_plugins_manager,
+)
 from ..models import PluginConfiguration
 from ..tests.sample_plugins import (
     ActiveDummyPaymentGateway,
@@ -27,6 +34,67 @@ def test_get_plugins_manager():
     assert len(manager.plugins) == 1
 
 
+def test_get_plugins_manager_reuses_manager(db, django_assert_num_queries):
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = get_plugins_manager(plugins=plugins)
+
+    with django_assert_num_queries(0):
+        assert get_plugins_manager(plugins=plugins) is manager
+    assert get_plugins_manager(plugins=[]) is not manager
+
+
+def test_get_plugins_manager_reloads_changed_configuration(plugin_configuration):
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = get_plugins_manager(plugins=plugins)
+    assert manager.get_plugin(PluginSample.PLUGIN_ID).active
+
+    plugin_configuration.active = False
+    plugin_configuration.save()
+
+    new_manager = get_plugins_manager(plugins=plugins)
+    assert new_manager is not manager
+    assert not new_manager.get_plugin(PluginSample.PLUGIN_ID).active
+
+
+def test_get_plugins_manager_reloads_after_deleting_configuration(
+    plugin_configuration,
+):
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = get_plugins_manager(plugins=plugins)
+
+    plugin_configuration.delete()
+
+    assert get_plugins_manager(plugins=plugins) is not manager
+
+
+def test_get_plugins_manager_reloads_after_tax_rates_change(db):
+    plugins = ["saleor.plugins.vatlayer.plugin.VatlayerPlugin"]
+    manager = get_plugins_manager(plugins=plugins)
+
+    VAT.objects.create(country_code="DE", data={"standard_rate": 19})
+    new_manager = get_plugins_manager(plugins=plugins)
+    assert new_manager is not manager
+
+    RateTypes.objects.create(types=["books"])
+    assert get_plugins_manager(plugins=plugins) is not new_manager
+
+
+def test_get_plugins_manager_without_shared_cache(db, local_memory_cache):
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = get_plugins_manager(plugins=plugins)
+
+    assert get_plugins_manager(plugins=plugins) is not manager
+
+
+def test_get_plugins_manager_reloads_on_version_change_from_other_worker():
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = get_plugins_manager(plugins=plugins)
+
+    cache.set(PLUGINS_CONFIGURATION_VERSION_CACHE_KEY, "changed-elsewhere")
+
+    assert get_plugins_manager(plugins=plugins) is not manager
+
+
 @pytest.mark.parametrize(
     "plugins, total_amount",
     [(["saleor.plugins.tests.sample_plugins.PluginSample"], "1.0"), ([], "15.0")],
@@ -384,3 +452,33 @@ def test_manager_inncorrect_plugin(rf):
     response = manager.webhook(request, "incorrect.plugin.id")
     assert isinstance(response, HttpResponseNotFound)
     assert response.status_code == 404
+
+
+def test_manager_hooks_contain_only_active_plugins_overriding_hook():
+    plugins = [
+        "saleor.plugins.tests.sample_plugins.PluginSample",
+        "saleor.plugins.tests.sample_plugins.PluginInactive",
+        "saleor.plugins.tests.sample_plugins.ActivePaymentGateway",
+    ]
+    manager = PluginsManager(plugins=plugins)
+    sample_plugin = manager.get_plugin(PluginSample.PLUGIN_ID)
+
+    assert manager.hooks["calculate_checkout_total"] == [sample_plugin]
+    assert "change_user_address" not in manager.hooks
+    assert all(
+        plugin.PLUGIN_ID != PluginInactive.PLUGIN_ID
+        for plugins in manager.hooks.values()
+        for plugin in plugins
+    )
+
+
+@mock.patch("saleor.plugins.manager.opentracing")
+def test_manager_skips_hook_without_plugins(mocked_opentracing):
+    plugins = ["saleor.plugins.tests.sample_plugins.PluginSample"]
+    manager = PluginsManager(plugins=plugins)
+    address = mock.Mock()
+
+    result = manager.change_user_address(address, None, None)
+
+    assert result is address
+    mocked_opentracing.global_tracer.assert_not_called()
@@ -0,0 +1,102 @@
+import os
+import threading
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Tuple
+from urllib.parse import urlparse
+
+import boto3
+import requests
+from botocore.config import Config
+from django.conf import settings
+from google.cloud import pubsub_v1
+from requests.adapters import HTTPAdapter
+
+# Sessions and clients are reused by all deliveries of a worker process, so that
+# connections to the webhook targets are kept alive between the events
+_lock = threading.RLock()
+_pid = None
+_http_sessions: "OrderedDict[Tuple[str, str], requests.Session]" = OrderedDict()
+_sqs_clients: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+_pubsub_clients: "OrderedDict[Tuple, pubsub_v1.PublisherClient]" = OrderedDict()
+
+
+def _check_process():
+    # Connections inherited from the parent process must not be shared with it
+    global _pid
+    pid = os.getpid()
+    if _pid != pid:
+        _http_sessions.clear()
+        _sqs_clients.clear()
+        _pubsub_clients.clear()
+        _pid = pid
+
+
+def _get_or_create(clients, key, create):
+    with _lock:
+        _check_process()
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+            return client
+        client = create()
+        clients[key] = client
+        while len(clients) > settings.WEBHOOK_MAX_POOLS:
+            # Other threads may still send requests through the evicted client,
+            # it is closed by the garbage collector once they are done with it
+            clients.popitem(last=False)
+        return client
+
+
+def _create_http_session():
+    session = requests.Session()
+    # Cookies set by one webhook target must not be sent with other deliveries
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=settings.WEBHOOK_POOL_MAXSIZE
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session(target_url: str) -> requests.Session:
+    """Return the session keeping connections to the host of the URL alive."""
+    parts = urlparse(target_url)
+    key = (parts.scheme.lower(), parts.netloc.lower())
+    return _get_or_create(_http_sessions, key, _create_http_session)
+
+
+def get_sqs_client(region: str, access_key_id: str, secret_access_key: str):
+    """Return the SQS client of the region and credentials."""
+
+    def create():
+        return boto3.client(
+            "sqs",
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(
+                connect_timeout=settings.WEBHOOK_TIMEOUT,
+                read_timeout=settings.WEBHOOK_TIMEOUT,
+                max_pool_connections=settings.WEBHOOK_POOL_MAXSIZE,
+            ),
+        )
+
+    key = (region, access_key_id, secret_access_key)
+    return _get_or_create(_sqs_clients, key, create)
+
+
+def get_pubsub_client() -> pubsub_v1.PublisherClient:
+    """Return the Google Cloud Pub/Sub publisher of the process."""
+    return _get_or_create(_pubsub_clients, (), pubsub_v1.PublisherClient)
+
+
+def clear_clients():
+    """Close and forget all sessions and clients of the process."""
+    with _lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+        _sqs_clients.clear()
+        _pubsub_clients.clear()
@@ -1,16 +1,10 @@
 from typing import TYPE_CHECKING, Any, Optional
 
 from ...webhook.event_types import WebhookEventType
-from ...webhook.payloads import (
-    generate_checkout_payload,
-    generate_customer_payload,
-    generate_fulfillment_payload,
-    generate_invoice_payload,
-    generate_order_payload,
-    generate_product_payload,
-)
+from ...webhook.payloads import generate_invoice_payload
+from ...webhook.utils import get_webhooks_for_event
 from ..base_plugin import BasePlugin
-from .tasks import trigger_webhooks_for_event
+from .tasks import schedule_webhooks, trigger_webhooks_for_event
 
 if TYPE_CHECKING:
     from ...order.models import Fulfillment, Order
@@ -32,20 +26,17 @@ class WebhookPlugin(BasePlugin):
     def order_created(self, order: "Order", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        order_data = generate_order_payload(order)
-        trigger_webhooks_for_event.delay(WebhookEventType.ORDER_CREATED, order_data)
+        schedule_webhooks(WebhookEventType.ORDER_CREATED, order)
 
     def order_fully_paid(self, order: "Order", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        order_data = generate_order_payload(order)
-        trigger_webhooks_for_event.delay(WebhookEventType.ORDER_FULLY_PAID, order_data)
+        schedule_webhooks(WebhookEventType.ORDER_FULLY_PAID, order)
 
     def order_updated(self, order: "Order", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        order_data = generate_order_payload(order)
-        trigger_webhooks_for_event.delay(WebhookEventType.ORDER_UPDATED, order_data)
+        schedule_webhooks(WebhookEventType.ORDER_UPDATED, order)
 
     def invoice_request(
         self,
@@ -56,62 +47,51 @@ class WebhookPlugin(BasePlugin):
     ) -> Any:
         if not self.active:
             return previous_value
-        invoice_data = generate_invoice_payload(invoice)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.INVOICE_REQUESTED, invoice_data
-        )
+        schedule_webhooks(WebhookEventType.INVOICE_REQUESTED, invoice)
 
     def invoice_delete(self, invoice: "Invoice", previous_value: Any):
         if not self.active:
             return previous_value
+        # The invoice is about to be deleted, so its payload is generated right away
+        if not get_webhooks_for_event(WebhookEventType.INVOICE_DELETED):
+            return previous_value
         invoice_data = generate_invoice_payload(invoice)
         trigger_webhooks_for_event.delay(WebhookEventType.INVOICE_DELETED, invoice_data)
 
     def invoice_sent(self, invoice: "Invoice", email: str, previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        invoice_data = generate_invoice_payload(invoice)
-        trigger_webhooks_for_event.delay(WebhookEventType.INVOICE_SENT, invoice_data)
+        schedule_webhooks(WebhookEventType.INVOICE_SENT, invoice)
 
     def order_cancelled(self, order: "Order", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        order_data = generate_order_payload(order)
-        trigger_webhooks_for_event.delay(WebhookEventType.ORDER_CANCELLED, order_data)
+        schedule_webhooks(WebhookEventType.ORDER_CANCELLED, order)
 
     def order_fulfilled(self, order: "Order", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        order_data = generate_order_payload(order)
-        trigger_webhooks_for_event.delay(WebhookEventType.ORDER_FULFILLED, order_data)
+        schedule_webhooks(WebhookEventType.ORDER_FULFILLED, order)
 
     def fulfillment_created(self, fulfillment: "Fulfillment", previous_value):
         if not self.active:
             return previous_value
-        fulfillment_data = generate_fulfillment_payload(fulfillment)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.FULFILLMENT_CREATED, fulfillment_data
-        )
+        schedule_webhooks(WebhookEventType.FULFILLMENT_CREATED, fulfillment)
 
     def customer_created(self, customer: "User", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        customer_data = generate_customer_payload(customer)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.CUSTOMER_CREATED, customer_data
-        )
+        schedule_webhooks(WebhookEventType.CUSTOMER_CREATED, customer)
 
     def product_created(self, product: "Product", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        product_data = generate_product_payload(product)
-        trigger_webhooks_for_event.delay(WebhookEventType.PRODUCT_CREATED, product_data)
+        schedule_webhooks(WebhookEventType.PRODUCT_CREATED, product)
 
     def product_updated(self, product: "Product", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        product_data = generate_product_payload(product)
-        trigger_webhooks_for_event.delay(WebhookEventType.PRODUCT_UPDATED, product_data)
+        schedule_webhooks(WebhookEventType.PRODUCT_UPDATED, product)
 
     # Deprecated. This method will be removed in Saleor 3.0
     def checkout_quantity_changed(
@@ -119,23 +99,14 @@ class WebhookPlugin(BasePlugin):
     ) -> Any:
         if not self.active:
             return previous_value
-        checkout_data = generate_checkout_payload(checkout)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.CHECKOUT_QUANTITY_CHANGED, checkout_data
-        )
+        schedule_webhooks(WebhookEventType.CHECKOUT_QUANTITY_CHANGED, checkout)
 
     def checkout_created(self, checkout: "Checkout", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        checkout_data = generate_checkout_payload(checkout)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.CHECKOUT_CREATED, checkout_data
-        )
+        schedule_webhooks(WebhookEventType.CHECKOUT_CREATED, checkout)
 
     def checkout_updated(self, checkout: "Checkout", previous_value: Any) -> Any:
         if not self.active:
             return previous_value
-        checkout_data = generate_checkout_payload(checkout)
-        trigger_webhooks_for_event.delay(
-            WebhookEventType.CHECKOUT_UPADTED, checkout_data
-        )
+        schedule_webhooks(WebhookEventType.CHECKOUT_UPADTED, checkout)
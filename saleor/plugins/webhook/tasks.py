@@ -1,21 +1,47 @@
+import json
 import logging
+import time
 from enum import Enum
 from urllib.parse import urlparse, urlunparse
 
-import boto3
-import requests
-from google.cloud import pubsub_v1
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from requests.exceptions import RequestException
 
+from ...account.models import User
 from ...celeryconf import app
+from ...checkout.models import Checkout
+from ...invoice.models import Invoice
+from ...order.models import Fulfillment, Order
+from ...product.models import Product
 from ...site.models import Site
+from ...webhook import WebhookDeliveryStatus
 from ...webhook.event_types import WebhookEventType
-from ...webhook.models import Webhook
+from ...webhook.models import (
+    BufferedWebhookEvent,
+    Webhook,
+    WebhookDeadLetter,
+    WebhookDeliveryAttempt,
+)
+from ...webhook.payloads import (
+    generate_checkout_payload,
+    generate_customer_payload,
+    generate_fulfillment_payload,
+    generate_invoice_payload,
+    generate_order_payload,
+    generate_product_payload,
+)
+from ...webhook.utils import get_webhooks_for_event, invalidate_webhooks
 from . import signature_for_payload
+from .clients import get_http_session, get_pubsub_client, get_sqs_client
 
 logger = logging.getLogger(__name__)
 
-WEBHOOK_TIMEOUT = 10
+WEBHOOK_BATCH_SCHEDULED_CACHE_KEY = "webhook_batch_scheduled:{}"
+
+WEBHOOK_MAX_RETRIES = 15
 
 
 class WebhookSchemes(str, Enum):
@@ -27,59 +53,179 @@ class WebhookSchemes(str, Enum):
 
 @app.task
 def trigger_webhooks_for_event(event_type, data):
-    permissions = {}
-    required_permission = WebhookEventType.PERMISSIONS[event_type].value
-    if required_permission:
-        app_label, codename = required_permission.split(".")
-        permissions["app__permissions__content_type__app_label"] = app_label
-        permissions["app__permissions__codename"] = codename
-
-    webhooks = Webhook.objects.filter(
-        is_active=True,
-        app__is_active=True,
-        events__event_type__in=[event_type, WebhookEventType.ANY],
-        **permissions,
+    webhooks = Webhook.objects.filter(pk__in=get_webhooks_for_event(event_type))
+    for webhook in webhooks:
+        if webhook.batch_size:
+            buffer_webhook_event(webhook, event_type, data)
+        else:
+            send_webhook_request.delay(
+                webhook.pk, webhook.target_url, webhook.secret_key, event_type, data
+            )
+
+
+def buffer_webhook_event(webhook, event_type, data):
+    """Buffer the event until the batch of the webhook is sent.
+
+    The batch is sent once the webhook has `batch_size` events buffered or after
+    `batch_window` seconds since the first of them was buffered.
+    """
+    BufferedWebhookEvent.objects.create(
+        webhook=webhook, event_type=event_type, data=data
     )
-    webhooks = webhooks.select_related("app").prefetch_related(
-        "app__permissions__content_type"
+    if webhook.buffered_events.count() >= webhook.batch_size:
+        send_webhook_batches.delay(webhook.pk)
+    # The flag expires on its own, in case the scheduled task was lost
+    elif cache.add(
+        WEBHOOK_BATCH_SCHEDULED_CACHE_KEY.format(webhook.pk),
+        True,
+        timeout=webhook.batch_window + 60,
+    ):
+        send_webhook_batches.apply_async(
+            args=[webhook.pk], countdown=webhook.batch_window
+        )
+
+
+def generate_batch_payload(events):
+    """Return the JSON array of the buffered events and their payloads."""
+    return "[%s]" % ",".join(
+        '{"event_type": %s, "payload": %s}' % (json.dumps(event_type), data)
+        for event_type, data in events
     )
 
-    for webhook in webhooks:
-        send_webhook_request.delay(
-            webhook.pk, webhook.target_url, webhook.secret_key, event_type, data
+
+@app.task
+def send_webhook_batches(webhook_id):
+    # Events buffered from now on schedule the next batch
+    cache.delete(WEBHOOK_BATCH_SCHEDULED_CACHE_KEY.format(webhook_id))
+    webhook = Webhook.objects.filter(pk=webhook_id).first()
+    if webhook is None:
+        return
+    batch_size = webhook.batch_size or 1
+    while True:
+        with transaction.atomic():
+            events = list(
+                webhook.buffered_events.select_for_update(skip_locked=True).values_list(
+                    "pk", "event_type", "data"
+                )[:batch_size]
+            )
+            if not events:
+                break
+            event_types = ",".join(
+                dict.fromkeys(event_type for _, event_type, _ in events)
+            )
+            # The batch is published before the events are deleted, so they are
+            # kept buffered if publishing fails
+            send_webhook_batch_request.delay(
+                webhook.pk,
+                webhook.target_url,
+                webhook.secret_key,
+                event_types,
+                generate_batch_payload(
+                    (event_type, data) for _, event_type, data in events
+                ),
+                len(events),
+            )
+            BufferedWebhookEvent.objects.filter(
+                pk__in=[pk for pk, _, _ in events]
+            ).delete()
+
+
+# Models of the instances and their payload generators, by event type
+EVENT_PAYLOAD_GENERATORS = {
+    **{
+        event_type: (Order, generate_order_payload)
+        for event_type in (
+            WebhookEventType.ORDER_CREATED,
+            WebhookEventType.ORDER_FULLY_PAID,
+            WebhookEventType.ORDER_UPDATED,
+            WebhookEventType.ORDER_CANCELLED,
+            WebhookEventType.ORDER_FULFILLED,
         )
+    },
+    **{
+        event_type: (Invoice, generate_invoice_payload)
+        for event_type in (
+            WebhookEventType.INVOICE_REQUESTED,
+            WebhookEventType.INVOICE_DELETED,
+            WebhookEventType.INVOICE_SENT,
+        )
+    },
+    WebhookEventType.FULFILLMENT_CREATED: (Fulfillment, generate_fulfillment_payload),
+    WebhookEventType.CUSTOMER_CREATED: (User, generate_customer_payload),
+    WebhookEventType.PRODUCT_CREATED: (Product, generate_product_payload),
+    WebhookEventType.PRODUCT_UPDATED: (Product, generate_product_payload),
+    **{
+        event_type: (Checkout, generate_checkout_payload)
+        for event_type in (
+            WebhookEventType.CHECKOUT_QUANTITY_CHANGED,
+            WebhookEventType.CHECKOUT_CREATED,
+            WebhookEventType.CHECKOUT_UPADTED,
+        )
+    },
+}
 
 
-def send_webhook_using_http(target_url, message, domain, signature, event_type):
+@app.task
+def trigger_webhooks_for_instance_event(event_type, instance_pk):
+    model, generate_payload = EVENT_PAYLOAD_GENERATORS[event_type]
+    instance = model.objects.filter(pk=instance_pk).first()
+    if instance is None:
+        logger.warning(
+            "[%s ID:%r] Instance of event %r no longer exists",
+            model.__name__,
+            instance_pk,
+            event_type,
+        )
+        return
+    trigger_webhooks_for_event(event_type, generate_payload(instance))
+
+
+def schedule_webhooks(event_type, instance):
+    """Schedule sending webhooks subscribed to the event of the instance.
+
+    Nothing is done when no webhook is subscribed to the event. Otherwise the
+    payload is generated in a task, after the current transaction is committed.
+    """
+    if not get_webhooks_for_event(event_type):
+        return
+    instance_pk = instance.pk
+    transaction.on_commit(
+        lambda: trigger_webhooks_for_instance_event.delay(event_type, instance_pk)
+    )
+
+
+def send_webhook_using_http(
+    target_url, message, domain, signature, event_type, batch_size=None
+):
     headers = {
         "Content-Type": "application/json",
         "X-Saleor-Event": event_type,
         "X-Saleor-Domain": domain,
         "X-Saleor-Signature": signature,
     }
+    if batch_size is not None:
+        headers["X-Saleor-Batch-Size"] = str(batch_size)
 
     if signature:
         # This header is depreceated and will be removed in Saleor3.0
         headers["X-Saleor-HMAC-SHA256"] = f"sha1={signature}"
 
-    response = requests.post(
-        target_url, data=message, headers=headers, timeout=WEBHOOK_TIMEOUT
+    response = get_http_session(target_url).post(
+        target_url, data=message, headers=headers, timeout=settings.WEBHOOK_TIMEOUT
     )
     response.raise_for_status()
+    return response.status_code
 
 
-def send_webhook_using_aws_sqs(target_url, message, domain, signature, event_type):
+def send_webhook_using_aws_sqs(
+    target_url, message, domain, signature, event_type, batch_size=None
+):
     parts = urlparse(target_url)
     region = "us-east-1"
     hostname_parts = parts.hostname.split(".")
     if len(hostname_parts) == 4 and hostname_parts[0] == "sqs":
         region = hostname_parts[1]
-    client = boto3.client(
-        "sqs",
-        region_name=region,
-        aws_access_key_id=parts.username,
-        aws_secret_access_key=parts.password,
-    )
+    client = get_sqs_client(region, parts.username, parts.password)
     queue_url = urlunparse(
         ("https", parts.hostname, parts.path, parts.params, parts.query, parts.fragment)
     )
@@ -90,6 +236,11 @@ def send_webhook_using_aws_sqs(target_url, message, domain, signature, event_typ
     }
     if signature:
         msg_attributes["Signature"] = {"DataType": "String", "StringValue": signature}
+    if batch_size is not None:
+        msg_attributes["BatchSize"] = {
+            "DataType": "Number",
+            "StringValue": str(batch_size),
+        }
     client.send_message(
         QueueUrl=queue_url,
         MessageAttributes=msg_attributes,
@@ -98,43 +249,215 @@ def send_webhook_using_aws_sqs(target_url, message, domain, signature, event_typ
 
 
 def send_webhook_using_google_cloud_pubsub(
-    target_url, message, domain, signature, event_type
+    target_url, message, domain, signature, event_type, batch_size=None
 ):
     parts = urlparse(target_url)
-    client = pubsub_v1.PublisherClient()
+    client = get_pubsub_client()
     topic_name = parts.path[1:]  # drop the leading slash
+    attributes = {}
+    if batch_size is not None:
+        attributes["batchSize"] = str(batch_size)
     client.publish(
         topic_name,
         message,
         saleorDomain=domain,
         eventType=event_type,
         signature=signature,
+        **attributes,
     )
 
 
-@app.task(
-    autoretry_for=(RequestException,),
-    retry_backoff=60,
-    retry_kwargs={"max_retries": 15},
-)
-def send_webhook_request(webhook_id, target_url, secret, event_type, data):
+def send_webhook(target_url, secret, event_type, data, batch_size=None):
     parts = urlparse(target_url)
     domain = Site.objects.get_current().domain
     message = data.encode("utf-8")
     signature = signature_for_payload(message, secret)
+    args = (target_url, message, domain, signature, event_type, batch_size)
     if parts.scheme.lower() in [WebhookSchemes.HTTP, WebhookSchemes.HTTPS]:
-        send_webhook_using_http(target_url, message, domain, signature, event_type)
+        return send_webhook_using_http(*args)
     elif parts.scheme.lower() == WebhookSchemes.AWS_SQS:
-        send_webhook_using_aws_sqs(target_url, message, domain, signature, event_type)
+        return send_webhook_using_aws_sqs(*args)
     elif parts.scheme.lower() == WebhookSchemes.GOOGLE_CLOUD_PUBSUB:
-        send_webhook_using_google_cloud_pubsub(
-            target_url, message, domain, signature, event_type
-        )
+        return send_webhook_using_google_cloud_pubsub(*args)
+    raise ValueError("Unknown webhook scheme: %r" % (parts.scheme,))
+
+
+def _record_delivery_attempt(
+    webhook_id, event_type, status, attempt, duration, **kwargs
+):
+    try:
+        with transaction.atomic():
+            WebhookDeliveryAttempt.objects.create(
+                webhook_id=webhook_id,
+                event_type=event_type,
+                status=status,
+                attempt=attempt,
+                duration=duration,
+                **kwargs,
+            )
+    except IntegrityError:
+        # The webhook was deleted in the meantime
+        pass
+
+
+def _store_dead_letter(webhook_id, event_type, data, batch_size, error):
+    try:
+        with transaction.atomic():
+            WebhookDeadLetter.objects.create(
+                webhook_id=webhook_id,
+                event_type=event_type,
+                data=data,
+                batch_size=batch_size,
+                error=error[:255],
+            )
+    except IntegrityError:
+        pass
     else:
-        raise ValueError("Unknown webhook scheme: %r" % (parts.scheme,))
+        logger.warning(
+            "[Webhook ID:%r] Payload of event %r moved to dead letters: %s",
+            webhook_id,
+            event_type,
+            error,
+        )
+
+
+def _deactivate_failing_webhook(webhook_id):
+    max_failures = settings.WEBHOOK_MAX_CONSECUTIVE_FAILURES
+    if not max_failures:
+        return
+    attempts = WebhookDeliveryAttempt.objects.filter(webhook_id=webhook_id)
+    activated_at = (
+        Webhook.objects.filter(pk=webhook_id)
+        .values_list("activated_at", flat=True)
+        .first()
+    )
+    if activated_at:
+        # Failures from before the webhook was activated again are not counted
+        attempts = attempts.filter(created_at__gt=activated_at)
+    statuses = list(attempts.values_list("status", flat=True)[:max_failures])
+    if len(statuses) < max_failures or WebhookDeliveryStatus.SUCCESS in statuses:
+        return
+    if Webhook.objects.filter(pk=webhook_id, is_active=True).update(is_active=False):
+        # Updates do not send signals
+        invalidate_webhooks()
+        logger.warning(
+            "[Webhook ID:%r] Deactivated after %r consecutive failed deliveries",
+            webhook_id,
+            max_failures,
+        )
+
+
+def deliver_webhook(
+    task, webhook_id, target_url, secret, event_type, data, batch_size=None
+):
+    """Send the payload to the webhook target and record the delivery attempt.
+
+    Payloads which cannot be delivered, because the attempts are exhausted or
+    the webhook was deactivated in the meantime, are moved to the dead letters.
+    Return whether the payload was delivered.
+    """
+    attempt = task.request.retries + 1
+    if (
+        attempt > 1
+        and not Webhook.objects.filter(pk=webhook_id, is_active=True).exists()
+    ):
+        _store_dead_letter(
+            webhook_id, event_type, data, batch_size, "Webhook is not active."
+        )
+        return False
+    start = time.monotonic()
+    try:
+        status_code = send_webhook(target_url, secret, event_type, data, batch_size)
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+        _record_delivery_attempt(
+            webhook_id,
+            event_type,
+            WebhookDeliveryStatus.FAILED,
+            attempt,
+            time.monotonic() - start,
+            response_status_code=getattr(
+                getattr(e, "response", None), "status_code", None
+            ),
+            error=error[:255],
+        )
+        if not isinstance(e, RequestException) or attempt > WEBHOOK_MAX_RETRIES:
+            _store_dead_letter(webhook_id, event_type, data, batch_size, error)
+        _deactivate_failing_webhook(webhook_id)
+        raise
+    _record_delivery_attempt(
+        webhook_id,
+        event_type,
+        WebhookDeliveryStatus.SUCCESS,
+        attempt,
+        time.monotonic() - start,
+        response_status_code=status_code,
+    )
+    return True
+
+
+@app.task(
+    bind=True,
+    autoretry_for=(RequestException,),
+    retry_backoff=60,
+    retry_kwargs={"max_retries": WEBHOOK_MAX_RETRIES},
+)
+def send_webhook_request(self, webhook_id, target_url, secret, event_type, data):
+    if not deliver_webhook(self, webhook_id, target_url, secret, event_type, data):
+        return
     logger.debug(
         "[Webhook ID:%r] Payload sent to %r for event %r",
         webhook_id,
         target_url,
         event_type,
     )
+
+
+@app.task(
+    bind=True,
+    autoretry_for=(RequestException,),
+    retry_backoff=60,
+    retry_kwargs={"max_retries": WEBHOOK_MAX_RETRIES},
+)
+def send_webhook_batch_request(
+    self, webhook_id, target_url, secret, event_types, data, batch_size
+):
+    if not deliver_webhook(
+        self, webhook_id, target_url, secret, event_types, data, batch_size
+    ):
+        return
+    logger.debug(
+        "[Webhook ID:%r] Batch of %r events sent to %r for events %r",
+        webhook_id,
+        batch_size,
+        target_url,
+        event_types,
+    )
+
+
+def replay_dead_letters(dead_letters):
+    """Send the payloads of the dead letters again, to the current webhook targets."""
+    dead_letters = list(dead_letters.select_related("webhook"))
+    WebhookDeadLetter.objects.filter(
+        pk__in=[dead_letter.pk for dead_letter in dead_letters]
+    ).delete()
+    for dead_letter in dead_letters:
+        webhook = dead_letter.webhook
+        args = [
+            webhook.pk,
+            webhook.target_url,
+            webhook.secret_key,
+            dead_letter.event_type,
+            dead_letter.data,
+        ]
+        if dead_letter.batch_size is None:
+            send_webhook_request.delay(*args)
+        else:
+            send_webhook_batch_request.delay(*args, dead_letter.batch_size)
+
+
+@app.task
+def delete_old_webhook_delivery_attempts_task():
+    WebhookDeliveryAttempt.objects.filter(
+        created_at__lt=timezone.now() - settings.WEBHOOK_DELIVERY_ATTEMPTS_RETENTION
+    ).delete()
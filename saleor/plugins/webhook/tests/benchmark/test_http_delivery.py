@@ -0,0 +1,76 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from .....webhook.event_types import WebhookEventType
+from ...clients import clear_clients
+from ...tasks import send_webhook_using_http
+
+EVENTS_COUNT = 1000
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections_count += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWebhookHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    clear_clients()
+    yield server
+    clear_clients()
+    server.shutdown()
+    server.server_close()
+
+
+def _deliver(target_url, send):
+    message = b'[{"id": 1}]'
+    for _ in range(EVENTS_COUNT):
+        send(target_url, message, "example.com", "", WebhookEventType.ORDER_CREATED)
+
+
+def _send_without_pool(target_url, message, domain, signature, event_type):
+    """Send the webhook the way it was done before the sessions were pooled."""
+    headers = {
+        "Content-Type": "application/json",
+        "X-Saleor-Event": event_type,
+        "X-Saleor-Domain": domain,
+        "X-Saleor-Signature": signature,
+    }
+    response = requests.post(target_url, data=message, headers=headers, timeout=10)
+    response.raise_for_status()
+
+
+def test_http_deliveries_reuse_connection(stub_server):
+    host, port = stub_server.server_address
+    target_url = f"http://{host}:{port}/webhooks"
+
+    _deliver(target_url, _send_without_pool)
+    old_connections_count = stub_server.connections_count
+    stub_server.connections_count = 0
+    _deliver(target_url, send_webhook_using_http)
+    new_connections_count = stub_server.connections_count
+
+    assert old_connections_count == EVENTS_COUNT
+    assert new_connections_count == 1
@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from .. import clients
+from ..clients import clear_clients, get_http_session, get_sqs_client
+
+
+@pytest.fixture(autouse=True)
+def clear_webhook_clients():
+    clear_clients()
+    yield
+    clear_clients()
+
+
+def test_get_http_session_reuses_session_of_host():
+    # when
+    session = get_http_session("https://example.com/webhooks/1")
+
+    # then
+    assert get_http_session("https://EXAMPLE.com/webhooks/2") is session
+    assert get_http_session("http://example.com/webhooks/1") is not session
+    assert get_http_session("https://example.org/webhooks/1") is not session
+
+
+def test_get_http_session_uses_configured_pool_size(settings):
+    # given
+    settings.WEBHOOK_POOL_MAXSIZE = 3
+
+    # when
+    session = get_http_session("https://example.com/webhooks")
+
+    # then
+    assert session.get_adapter("https://example.com/")._pool_maxsize == 3
+
+
+def test_get_http_session_evicts_least_recently_used_sessions(settings):
+    # given
+    settings.WEBHOOK_MAX_POOLS = 2
+    first = get_http_session("https://first.example.com/")
+    second = get_http_session("https://second.example.com/")
+    get_http_session("https://first.example.com/")
+
+    # when
+    with patch.object(second, "close") as close_mock:
+        get_http_session("https://third.example.com/")
+
+    # then
+    close_mock.assert_not_called()
+    assert get_http_session("https://first.example.com/") is first
+    assert get_http_session("https://second.example.com/") is not second
+
+
+def test_get_http_session_does_not_store_cookies():
+    # given
+    url = "https://example.com/webhooks"
+    session = get_http_session(url)
+    cookie = requests.cookies.create_cookie("sessionid", "1", domain="example.com")
+    request = requests.Request("POST", url).prepare()
+
+    # when
+    session.cookies.set_cookie_if_ok(cookie, requests.cookies.MockRequest(request))
+
+    # then
+    assert not session.cookies
+
+
+def test_get_http_session_drops_sessions_of_parent_process(monkeypatch):
+    # given
+    session = get_http_session("https://example.com/")
+
+    # when
+    monkeypatch.setattr(clients.os, "getpid", lambda: -1)
+
+    # then
+    assert get_http_session("https://example.com/") is not session
+
+
+@patch("saleor.plugins.webhook.clients.boto3.client")
+def test_get_sqs_client_reuses_client_of_credentials(client_constructor, settings):
+    # given
+    settings.WEBHOOK_TIMEOUT = 5
+    settings.WEBHOOK_POOL_MAXSIZE = 3
+    client_constructor.side_effect = lambda *args, **kwargs: MagicMock()
+
+    # when
+    client = get_sqs_client("us-east-1", "key", "secret")
+
+    # then
+    assert get_sqs_client("us-east-1", "key", "secret") is client
+    assert get_sqs_client("us-east-1", "other-key", "secret") is not client
+    assert get_sqs_client("eu-west-1", "key", "secret") is not client
+    config = client_constructor.call_args_list[0][1]["config"]
+    assert config.connect_timeout == 5
+    assert config.read_timeout == 5
+    assert config.max_pool_connections == 3
@@ -1,9 +1,13 @@
+import json
 from unittest import mock
 
 import pytest
+from django.core.cache import cache
 
 from ....app.models import App
+from ....tests.utils import flush_post_commit_hooks
 from ....webhook.event_types import WebhookEventType
+from ....webhook.models import Webhook, WebhookEvent
 from ....webhook.payloads import (
     generate_checkout_payload,
     generate_customer_payload,
@@ -11,13 +15,38 @@ from ....webhook.payloads import (
     generate_order_payload,
     generate_product_payload,
 )
+from ....webhook.utils import get_webhooks_for_event
 from ...manager import get_plugins_manager
-from ...webhook.tasks import trigger_webhooks_for_event
+from ...webhook.tasks import (
+    WEBHOOK_BATCH_SCHEDULED_CACHE_KEY,
+    send_webhook_batches,
+    trigger_webhooks_for_event,
+    trigger_webhooks_for_instance_event,
+)
 
 first_url = "http://www.example.com/first/"
 third_url = "http://www.example.com/third/"
 
 
+@pytest.fixture
+def any_events_webhook(
+    app,
+    permission_manage_orders,
+    permission_manage_users,
+    permission_manage_products,
+    permission_manage_checkouts,
+):
+    app.permissions.add(
+        permission_manage_orders,
+        permission_manage_users,
+        permission_manage_products,
+        permission_manage_checkouts,
+    )
+    webhook = app.webhooks.create(target_url=first_url)
+    webhook.events.create(event_type=WebhookEventType.ANY)
+    return webhook
+
+
 @pytest.mark.parametrize(
     "event_name, total_webhook_calls, expected_target_urls",
     [
@@ -74,11 +103,14 @@ def test_trigger_webhooks_for_event_calls_expected_events(
     assert target_url_calls == expected_target_urls
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_order_created(mocked_webhook_trigger, settings, order_with_lines):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_order_created(
+    mocked_webhook_trigger, settings, order_with_lines, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.order_created(order_with_lines)
+    flush_post_commit_hooks()
 
     expected_data = generate_order_payload(order_with_lines)
     mocked_webhook_trigger.assert_called_once_with(
@@ -86,11 +118,14 @@ def test_order_created(mocked_webhook_trigger, settings, order_with_lines):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_customer_created(mocked_webhook_trigger, settings, customer_user):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_customer_created(
+    mocked_webhook_trigger, settings, customer_user, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.customer_created(customer_user)
+    flush_post_commit_hooks()
 
     expected_data = generate_customer_payload(customer_user)
     mocked_webhook_trigger.assert_called_once_with(
@@ -98,11 +133,14 @@ def test_customer_created(mocked_webhook_trigger, settings, customer_user):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_order_fully_paid(mocked_webhook_trigger, settings, order_with_lines):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_order_fully_paid(
+    mocked_webhook_trigger, settings, order_with_lines, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.order_fully_paid(order_with_lines)
+    flush_post_commit_hooks()
 
     expected_data = generate_order_payload(order_with_lines)
     mocked_webhook_trigger.assert_called_once_with(
@@ -110,35 +148,44 @@ def test_order_fully_paid(mocked_webhook_trigger, settings, order_with_lines):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_product_created(mocked_webhook_trigger, settings, product):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_product_created(mocked_webhook_trigger, settings, product, any_events_webhook):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.product_created(product)
+    flush_post_commit_hooks()
 
+    # The payload is generated from the saved product
+    product.refresh_from_db()
     expected_data = generate_product_payload(product)
     mocked_webhook_trigger.assert_called_once_with(
         WebhookEventType.PRODUCT_CREATED, expected_data
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_product_updated(mocked_webhook_trigger, settings, product):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_product_updated(mocked_webhook_trigger, settings, product, any_events_webhook):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.product_updated(product)
+    flush_post_commit_hooks()
 
+    # The payload is generated from the saved product
+    product.refresh_from_db()
     expected_data = generate_product_payload(product)
     mocked_webhook_trigger.assert_called_once_with(
         WebhookEventType.PRODUCT_UPDATED, expected_data
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_order_updated(mocked_webhook_trigger, settings, order_with_lines):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_order_updated(
+    mocked_webhook_trigger, settings, order_with_lines, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.order_updated(order_with_lines)
+    flush_post_commit_hooks()
 
     expected_data = generate_order_payload(order_with_lines)
     mocked_webhook_trigger.assert_called_once_with(
@@ -146,11 +193,14 @@ def test_order_updated(mocked_webhook_trigger, settings, order_with_lines):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_order_cancelled(mocked_webhook_trigger, settings, order_with_lines):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_order_cancelled(
+    mocked_webhook_trigger, settings, order_with_lines, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.order_cancelled(order_with_lines)
+    flush_post_commit_hooks()
 
     expected_data = generate_order_payload(order_with_lines)
     mocked_webhook_trigger.assert_called_once_with(
@@ -158,13 +208,14 @@ def test_order_cancelled(mocked_webhook_trigger, settings, order_with_lines):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
 def test_checkout_quantity_changed(
-    mocked_webhook_trigger, settings, checkout_with_items
+    mocked_webhook_trigger, settings, checkout_with_items, any_events_webhook
 ):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.checkout_quantity_changed(checkout_with_items)
+    flush_post_commit_hooks()
 
     expected_data = generate_checkout_payload(checkout_with_items)
     mocked_webhook_trigger.assert_called_once_with(
@@ -172,11 +223,14 @@ def test_checkout_quantity_changed(
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_checkout_created(mocked_webhook_trigger, settings, checkout_with_items):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_checkout_created(
+    mocked_webhook_trigger, settings, checkout_with_items, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.checkout_created(checkout_with_items)
+    flush_post_commit_hooks()
 
     expected_data = generate_checkout_payload(checkout_with_items)
     mocked_webhook_trigger.assert_called_once_with(
@@ -184,11 +238,14 @@ def test_checkout_created(mocked_webhook_trigger, settings, checkout_with_items)
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_checkout_updated(mocked_webhook_trigger, settings, checkout_with_items):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_checkout_updated(
+    mocked_webhook_trigger, settings, checkout_with_items, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     manager.checkout_updated(checkout_with_items)
+    flush_post_commit_hooks()
 
     expected_data = generate_checkout_payload(checkout_with_items)
     mocked_webhook_trigger.assert_called_once_with(
@@ -196,12 +253,15 @@ def test_checkout_updated(mocked_webhook_trigger, settings, checkout_with_items)
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_invoice_request(mocked_webhook_trigger, settings, fulfilled_order):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_invoice_request(
+    mocked_webhook_trigger, settings, fulfilled_order, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     invoice = fulfilled_order.invoices.first()
     manager.invoice_request(fulfilled_order, invoice, invoice.number)
+    flush_post_commit_hooks()
     expected_data = generate_invoice_payload(invoice)
     mocked_webhook_trigger.assert_called_once_with(
         WebhookEventType.INVOICE_REQUESTED, expected_data
@@ -209,7 +269,9 @@ def test_invoice_request(mocked_webhook_trigger, settings, fulfilled_order):
 
 
 @mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_invoice_delete(mocked_webhook_trigger, settings, fulfilled_order):
+def test_invoice_delete(
+    mocked_webhook_trigger, settings, fulfilled_order, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     invoice = fulfilled_order.invoices.first()
@@ -220,13 +282,242 @@ def test_invoice_delete(mocked_webhook_trigger, settings, fulfilled_order):
     )
 
 
-@mock.patch("saleor.plugins.webhook.plugin.trigger_webhooks_for_event.delay")
-def test_invoice_sent(mocked_webhook_trigger, settings, fulfilled_order):
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_event")
+def test_invoice_sent(
+    mocked_webhook_trigger, settings, fulfilled_order, any_events_webhook
+):
     settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
     manager = get_plugins_manager()
     invoice = fulfilled_order.invoices.first()
     manager.invoice_sent(invoice, fulfilled_order.user.email)
+    flush_post_commit_hooks()
     expected_data = generate_invoice_payload(invoice)
     mocked_webhook_trigger.assert_called_once_with(
         WebhookEventType.INVOICE_SENT, expected_data
     )
+
+
+@mock.patch("saleor.plugins.webhook.tasks.trigger_webhooks_for_instance_event.delay")
+def test_product_updated_without_subscribers_skips_payload(
+    mocked_instance_event_trigger, settings, product, django_assert_num_queries
+):
+    # given
+    settings.PLUGINS = ["saleor.plugins.webhook.plugin.WebhookPlugin"]
+    manager = get_plugins_manager()
+    # Warm up the subscriptions cache
+    manager.product_updated(product)
+
+    # when
+    with django_assert_num_queries(0):
+        manager.product_updated(product)
+    flush_post_commit_hooks()
+
+    # then
+    mocked_instance_event_trigger.assert_not_called()
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+def test_trigger_webhooks_for_instance_event(
+    mocked_webhook_request, product, any_events_webhook
+):
+    # when
+    trigger_webhooks_for_instance_event(WebhookEventType.PRODUCT_UPDATED, product.pk)
+
+    # then
+    product.refresh_from_db()
+    mocked_webhook_request.assert_called_once_with(
+        any_events_webhook.pk,
+        first_url,
+        None,
+        WebhookEventType.PRODUCT_UPDATED,
+        generate_product_payload(product),
+    )
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+def test_trigger_webhooks_for_deleted_instance_event(
+    mocked_webhook_request, product, any_events_webhook
+):
+    # given
+    product_pk = product.pk
+    product.delete()
+
+    # when
+    trigger_webhooks_for_instance_event(WebhookEventType.PRODUCT_UPDATED, product_pk)
+
+    # then
+    mocked_webhook_request.assert_not_called()
+
+
+def test_get_webhooks_for_event_updates_on_webhook_change(
+    app, permission_manage_products
+):
+    # given
+    app.permissions.add(permission_manage_products)
+    webhook = app.webhooks.create(target_url=first_url)
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == []
+
+    # when
+    webhook.events.create(event_type=WebhookEventType.PRODUCT_CREATED)
+
+    # then
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == [webhook.pk]
+
+    # when
+    webhook.is_active = False
+    webhook.save(update_fields=["is_active"])
+
+    # then
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == []
+
+
+def test_get_webhooks_for_event_updates_on_app_change(app, permission_manage_products):
+    # given
+    webhook = app.webhooks.create(target_url=first_url)
+    webhook.events.create(event_type=WebhookEventType.PRODUCT_CREATED)
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == []
+
+    # when
+    app.permissions.add(permission_manage_products)
+
+    # then
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == [webhook.pk]
+
+    # when
+    app.is_active = False
+    app.save(update_fields=["is_active"])
+
+    # then
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == []
+
+
+def test_get_webhooks_for_event_without_shared_cache(
+    app, permission_manage_products, local_memory_cache
+):
+    # given
+    app.permissions.add(permission_manage_products)
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == []
+
+    # when
+    # Bulk create does not send signals, like a change made by other process
+    webhook = Webhook.objects.bulk_create([Webhook(app=app, target_url=first_url)])[0]
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(webhook=webhook, event_type=WebhookEventType.PRODUCT_CREATED)]
+    )
+
+    # then
+    assert get_webhooks_for_event(WebhookEventType.PRODUCT_CREATED) == [webhook.pk]
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_batches.apply_async")
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_batches.delay")
+def test_trigger_webhooks_for_event_buffers_events_of_batched_webhook(
+    mocked_send_batches,
+    mocked_schedule_batches,
+    mocked_webhook_request,
+    any_events_webhook,
+):
+    # given
+    any_events_webhook.batch_size = 3
+    any_events_webhook.batch_window = 10
+    any_events_webhook.save(update_fields=["batch_size", "batch_window"])
+    cache.delete(WEBHOOK_BATCH_SCHEDULED_CACHE_KEY.format(any_events_webhook.pk))
+
+    # when
+    trigger_webhooks_for_event(WebhookEventType.PRODUCT_CREATED, '[{"id": 1}]')
+    trigger_webhooks_for_event(WebhookEventType.PRODUCT_UPDATED, '[{"id": 2}]')
+
+    # then
+    assert any_events_webhook.buffered_events.count() == 2
+    mocked_schedule_batches.assert_called_once_with(
+        args=[any_events_webhook.pk], countdown=10
+    )
+    mocked_send_batches.assert_not_called()
+    mocked_webhook_request.assert_not_called()
+
+    # when
+    trigger_webhooks_for_event(WebhookEventType.PRODUCT_UPDATED, '[{"id": 3}]')
+
+    # then
+    mocked_send_batches.assert_called_once_with(any_events_webhook.pk)
+    mocked_webhook_request.assert_not_called()
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_batches.delay")
+def test_trigger_webhooks_for_event_sends_batches_above_batch_size(
+    mocked_send_batches, mocked_webhook_request, any_events_webhook
+):
+    # given
+    any_events_webhook.batch_size = 2
+    any_events_webhook.save(update_fields=["batch_size"])
+    for data in ['[{"id": 1}]', '[{"id": 2}]']:
+        any_events_webhook.buffered_events.create(
+            event_type=WebhookEventType.PRODUCT_CREATED, data=data
+        )
+
+    # when
+    trigger_webhooks_for_event(WebhookEventType.PRODUCT_UPDATED, '[{"id": 3}]')
+
+    # then
+    mocked_send_batches.assert_called_once_with(any_events_webhook.pk)
+    mocked_webhook_request.assert_not_called()
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_batch_request.delay")
+def test_send_webhook_batches_keeps_events_when_publishing_fails(
+    mocked_batch_request, any_events_webhook
+):
+    # given
+    mocked_batch_request.side_effect = ConnectionError()
+    any_events_webhook.batch_size = 2
+    any_events_webhook.save(update_fields=["batch_size"])
+    any_events_webhook.buffered_events.create(
+        event_type=WebhookEventType.PRODUCT_CREATED, data='[{"id": 1}]'
+    )
+
+    # when
+    with pytest.raises(ConnectionError):
+        send_webhook_batches(any_events_webhook.pk)
+
+    # then
+    assert any_events_webhook.buffered_events.count() == 1
+
+
+@mock.patch("saleor.plugins.webhook.tasks.send_webhook_batch_request.delay")
+def test_send_webhook_batches(mocked_batch_request, any_events_webhook):
+    # given
+    any_events_webhook.batch_size = 2
+    any_events_webhook.secret_key = "secret"
+    any_events_webhook.save(update_fields=["batch_size", "secret_key"])
+    for event_type, data in [
+        (WebhookEventType.PRODUCT_CREATED, '[{"id": 1}]'),
+        (WebhookEventType.PRODUCT_UPDATED, '[{"id": 1}]'),
+        (WebhookEventType.ORDER_CREATED, '[{"id": 2}]'),
+    ]:
+        any_events_webhook.buffered_events.create(event_type=event_type, data=data)
+
+    # when
+    send_webhook_batches(any_events_webhook.pk)
+
+    # then
+    assert not any_events_webhook.buffered_events.exists()
+    assert mocked_batch_request.call_count == 2
+    first_call, second_call = mocked_batch_request.call_args_list
+    webhook_id, target_url, secret, event_types, data, batch_size = first_call[0]
+    assert (webhook_id, target_url, secret) == (
+        any_events_webhook.pk,
+        first_url,
+        "secret",
+    )
+    assert event_types == "product_created,product_updated"
+    assert batch_size == 2
+    assert json.loads(data) == [
+        {"event_type": "product_created", "payload": [{"id": 1}]},
+        {"event_type": "product_updated", "payload": [{"id": 1}]},
+    ]
+    _, _, _, event_types, data, batch_size = second_call[0]
+    assert event_types == "order_created"
+    assert batch_size == 1
+    assert json.loads(data) == [{"event_type": "order_created", "payload": [{"id": 2}]}]
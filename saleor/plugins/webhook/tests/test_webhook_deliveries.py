@@ -0,0 +1,223 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import requests
+from django.utils import timezone
+from freezegun import freeze_time
+
+from ....webhook import WebhookDeliveryStatus
+from ....webhook.models import WebhookDeadLetter, WebhookDeliveryAttempt
+from ..tasks import (
+    WEBHOOK_MAX_RETRIES,
+    delete_old_webhook_delivery_attempts_task,
+    replay_dead_letters,
+    send_webhook_request,
+)
+
+
+@pytest.fixture
+def mocked_post():
+    with patch("saleor.plugins.webhook.tasks.get_http_session") as get_session:
+        post = get_session.return_value.post
+        post.return_value.status_code = 200
+        yield post
+
+
+def test_send_webhook_request_records_delivery_attempt(
+    mocked_post, webhook, site_settings
+):
+    # when
+    send_webhook_request.apply(
+        args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+    )
+
+    # then
+    attempt = webhook.delivery_attempts.get()
+    assert attempt.event_type == "order_created"
+    assert attempt.status == WebhookDeliveryStatus.SUCCESS
+    assert attempt.attempt == 1
+    assert attempt.response_status_code == 200
+    assert attempt.duration >= 0
+    assert not webhook.dead_letters.exists()
+
+
+@patch("celery.app.trace.logger")
+def test_send_webhook_request_stores_dead_letter_after_last_retry(
+    mocked_task_logger, mocked_post, webhook, site_settings
+):
+    # given
+    response = mocked_post.return_value
+    response.status_code = 500
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "500 Server Error", response=response
+    )
+
+    # when
+    send_webhook_request.apply(
+        args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+    )
+
+    # then
+    assert mocked_post.call_count == WEBHOOK_MAX_RETRIES + 1
+    attempts = webhook.delivery_attempts.all()
+    assert len(attempts) == WEBHOOK_MAX_RETRIES + 1
+    assert {attempt.status for attempt in attempts} == {WebhookDeliveryStatus.FAILED}
+    assert {attempt.response_status_code for attempt in attempts} == {500}
+    dead_letter = webhook.dead_letters.get()
+    assert dead_letter.event_type == "order_created"
+    assert dead_letter.data == "[]"
+    assert dead_letter.batch_size is None
+    assert dead_letter.error == "500 Server Error"
+    mocked_task_logger.log.assert_called_once()
+
+
+def test_send_webhook_request_stores_dead_letter_without_retries(
+    webhook, site_settings
+):
+    # given
+    webhook.target_url = "ftp://example.com/"
+
+    # when
+    result = send_webhook_request.apply(
+        args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+    )
+
+    # then
+    assert isinstance(result.result, ValueError)
+    assert webhook.delivery_attempts.get().status == WebhookDeliveryStatus.FAILED
+    assert webhook.dead_letters.exists()
+
+
+def test_send_webhook_request_deactivates_failing_webhook(
+    mocked_post, webhook, site_settings, settings
+):
+    # given
+    settings.WEBHOOK_MAX_CONSECUTIVE_FAILURES = 3
+    mocked_post.return_value.raise_for_status.side_effect = (
+        requests.exceptions.ConnectionError()
+    )
+
+    # when
+    send_webhook_request.apply(
+        args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+    )
+
+    # then
+    assert mocked_post.call_count == 3
+    webhook.refresh_from_db()
+    assert not webhook.is_active
+    assert webhook.delivery_attempts.count() == 3
+    assert webhook.dead_letters.get().error == "Webhook is not active."
+
+
+def test_send_webhook_request_keeps_webhook_with_successful_deliveries(
+    mocked_post, webhook, site_settings, settings
+):
+    # given
+    settings.WEBHOOK_MAX_CONSECUTIVE_FAILURES = 3
+    mocked_post.return_value.raise_for_status.side_effect = [
+        requests.exceptions.ConnectionError(),
+        requests.exceptions.ConnectionError(),
+        None,
+        requests.exceptions.ConnectionError(),
+        requests.exceptions.ConnectionError(),
+        None,
+    ]
+
+    # when
+    for _ in range(2):
+        send_webhook_request.apply(
+            args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+        )
+
+    # then
+    webhook.refresh_from_db()
+    assert webhook.is_active
+    assert webhook.delivery_attempts.count() == 6
+
+
+def test_send_webhook_request_ignores_failures_before_activation(
+    mocked_post, webhook, site_settings, settings
+):
+    # given
+    settings.WEBHOOK_MAX_CONSECUTIVE_FAILURES = 3
+    with freeze_time(timezone.now() - timedelta(hours=1)):
+        WebhookDeliveryAttempt.objects.bulk_create(
+            [
+                WebhookDeliveryAttempt(
+                    webhook=webhook,
+                    event_type="order_created",
+                    status=WebhookDeliveryStatus.FAILED,
+                    attempt=1,
+                    duration=0,
+                )
+                for _ in range(3)
+            ]
+        )
+    webhook.activated_at = timezone.now()
+    webhook.save(update_fields=["activated_at"])
+    mocked_post.return_value.raise_for_status.side_effect = [
+        requests.exceptions.ConnectionError(),
+        None,
+    ]
+
+    # when
+    send_webhook_request.apply(
+        args=[webhook.pk, webhook.target_url, None, "order_created", "[]"]
+    )
+
+    # then
+    assert mocked_post.call_count == 2
+    webhook.refresh_from_db()
+    assert webhook.is_active
+    assert not webhook.dead_letters.exists()
+
+
+@patch("saleor.plugins.webhook.tasks.send_webhook_batch_request.delay")
+@patch("saleor.plugins.webhook.tasks.send_webhook_request.delay")
+def test_replay_dead_letters(mocked_request, mocked_batch_request, webhook):
+    # given
+    webhook.secret_key = "secret"
+    webhook.save(update_fields=["secret_key"])
+    webhook.dead_letters.create(event_type="order_created", data="[1]")
+    webhook.dead_letters.create(
+        event_type="order_created,order_updated", data="[2]", batch_size=2
+    )
+
+    # when
+    replay_dead_letters(WebhookDeadLetter.objects.all())
+
+    # then
+    assert not WebhookDeadLetter.objects.exists()
+    mocked_request.assert_called_once_with(
+        webhook.pk, webhook.target_url, "secret", "order_created", "[1]"
+    )
+    mocked_batch_request.assert_called_once_with(
+        webhook.pk,
+        webhook.target_url,
+        "secret",
+        "order_created,order_updated",
+        "[2]",
+        2,
+    )
+
+
+def test_delete_old_webhook_delivery_attempts_task(webhook, settings):
+    # given
+    settings.WEBHOOK_DELIVERY_ATTEMPTS_RETENTION = timedelta(days=7)
+    attempt_data = {
+        "event_type": "order_created",
+        "status": WebhookDeliveryStatus.SUCCESS,
+        "attempt": 1,
+        "duration": 0.1,
+    }
+    with freeze_time(timezone.now() - timedelta(days=8)):
+        webhook.delivery_attempts.create(**attempt_data)
+    recent_attempt = webhook.delivery_attempts.create(**attempt_data)
+
+    # when
+    delete_old_webhook_delivery_attempts_task()
+
+    # then
+    assert list(WebhookDeliveryAttempt.objects.all()) == [recent_attempt]
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import boto3
 import pytest
@@ -7,9 +7,18 @@ from django.core.serializers import serialize
 from google.cloud.pubsub_v1 import PublisherClient
 from kombu.asynchronous.aws.sqs.connection import AsyncSQSConnection
 
+from ....webhook import WebhookDeliveryStatus
 from ....webhook.event_types import WebhookEventType
 from ...webhook import signature_for_payload
-from ...webhook.tasks import trigger_webhooks_for_event
+from ...webhook.clients import clear_clients
+from ...webhook.tasks import send_webhook_batch_request, trigger_webhooks_for_event
+
+
+@pytest.fixture(autouse=True)
+def clear_webhook_clients():
+    clear_clients()
+    yield
+    clear_clients()
 
 
 def test_trigger_webhooks_with_aws_sqs(
@@ -24,7 +33,7 @@ def test_trigger_webhooks_with_aws_sqs(
     mocked_client_constructor = MagicMock(spec=boto3.client, return_value=mocked_client)
 
     monkeypatch.setattr(
-        "saleor.plugins.webhook.tasks.boto3.client", mocked_client_constructor,
+        "saleor.plugins.webhook.clients.boto3.client", mocked_client_constructor,
     )
 
     webhook.app.permissions.add(permission_manage_orders)
@@ -47,6 +56,7 @@ def test_trigger_webhooks_with_aws_sqs(
         region_name=region,
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
+        config=ANY,
     )
     mocked_client.send_message.assert_called_once_with(
         QueueUrl="https://sqs.us-east-1.amazonaws.com/account_id/queue_name",
@@ -70,7 +80,7 @@ def test_trigger_webhooks_with_aws_sqs_and_secret_key(
     mocked_client_constructor = MagicMock(spec=boto3.client, return_value=mocked_client)
 
     monkeypatch.setattr(
-        "saleor.plugins.webhook.tasks.boto3.client", mocked_client_constructor,
+        "saleor.plugins.webhook.clients.boto3.client", mocked_client_constructor,
     )
 
     webhook.app.permissions.add(permission_manage_orders)
@@ -97,6 +107,7 @@ def test_trigger_webhooks_with_aws_sqs_and_secret_key(
         region_name=region,
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
+        config=ANY,
     )
     mocked_client.send_message.assert_called_once_with(
         QueueUrl="https://sqs.us-east-1.amazonaws.com/account_id/queue_name",
@@ -119,7 +130,7 @@ def test_trigger_webhooks_with_google_pub_sub(
 ):
     mocked_publisher = MagicMock(spec=PublisherClient)
     monkeypatch.setattr(
-        "saleor.plugins.webhook.tasks.pubsub_v1.PublisherClient",
+        "saleor.plugins.webhook.clients.pubsub_v1.PublisherClient",
         lambda: mocked_publisher,
     )
     webhook.app.permissions.add(permission_manage_orders)
@@ -148,7 +159,7 @@ def test_trigger_webhooks_with_google_pub_sub_and_secret_key(
 ):
     mocked_publisher = MagicMock(spec=PublisherClient)
     monkeypatch.setattr(
-        "saleor.plugins.webhook.tasks.pubsub_v1.PublisherClient",
+        "saleor.plugins.webhook.clients.pubsub_v1.PublisherClient",
         lambda: mocked_publisher,
     )
     webhook.app.permissions.add(permission_manage_orders)
@@ -171,7 +182,9 @@ def test_trigger_webhooks_with_google_pub_sub_and_secret_key(
 
 
 @pytest.mark.vcr
-@patch("saleor.plugins.webhook.tasks.requests.post", wraps=requests.post)
+@patch.object(
+    requests.Session, "post", autospec=True, side_effect=requests.Session.post
+)
 def test_trigger_webhooks_with_http(
     mock_request,
     webhook,
@@ -196,6 +209,7 @@ def test_trigger_webhooks_with_http(
     }
 
     mock_request.assert_called_once_with(
+        ANY,
         webhook.target_url,
         data=bytes(expected_data, "utf-8"),
         headers=expected_headers,
@@ -204,7 +218,9 @@ def test_trigger_webhooks_with_http(
 
 
 @pytest.mark.vcr
-@patch("saleor.plugins.webhook.tasks.requests.post", wraps=requests.post)
+@patch.object(
+    requests.Session, "post", autospec=True, side_effect=requests.Session.post
+)
 def test_trigger_webhooks_with_http_and_secret_key(
     mock_request, webhook, order_with_lines, permission_manage_orders
 ):
@@ -228,8 +244,72 @@ def test_trigger_webhooks_with_http_and_secret_key(
     }
 
     mock_request.assert_called_once_with(
+        ANY,
         webhook.target_url,
         data=bytes(expected_data, "utf-8"),
         headers=expected_headers,
         timeout=10,
     )
+
+
+@patch("saleor.plugins.webhook.tasks.get_http_session")
+def test_send_webhook_batch_request_with_http(
+    mocked_get_session, webhook, site_settings
+):
+    # given
+    target_url = "https://example.com/webhooks"
+    data = '[{"event_type": "order_created", "payload": []}]'
+    mocked_get_session.return_value.post.return_value.status_code = 200
+
+    # when
+    send_webhook_batch_request(
+        webhook.pk, target_url, "secret_key", "order_created", data, 1
+    )
+
+    # then
+    expected_signature = signature_for_payload(data.encode("utf-8"), "secret_key")
+    mocked_get_session.assert_called_once_with(target_url)
+    mocked_get_session.return_value.post.assert_called_once_with(
+        target_url,
+        data=data.encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            "X-Saleor-Event": "order_created",
+            "X-Saleor-Domain": "mirumee.com",
+            "X-Saleor-Signature": expected_signature,
+            "X-Saleor-Batch-Size": "1",
+            "X-Saleor-HMAC-SHA256": f"sha1={expected_signature}",
+        },
+        timeout=10,
+    )
+
+
+@patch("saleor.plugins.webhook.tasks.get_http_session")
+def test_send_webhook_batch_request_retries_on_request_error(
+    mocked_get_session, webhook, site_settings
+):
+    # given
+    post = mocked_get_session.return_value.post
+    post.return_value.status_code = 200
+    post.return_value.raise_for_status.side_effect = [
+        requests.exceptions.HTTPError(),
+        None,
+    ]
+
+    # when
+    send_webhook_batch_request.apply(
+        args=[
+            webhook.pk,
+            "https://example.com/webhooks",
+            None,
+            "order_created",
+            "[]",
+            1,
+        ]
+    )
+
+    # then
+    assert post.call_count == 2
+    assert list(
+        webhook.delivery_attempts.values_list("attempt", "status").order_by("pk")
+    ) == [(1, WebhookDeliveryStatus.FAILED), (2, WebhookDeliveryStatus.SUCCESS)]
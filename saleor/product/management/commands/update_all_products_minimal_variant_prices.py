@@ -3,9 +3,11 @@ import logging
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
-from ....discount.utils import fetch_active_discounts
 from ...models import Product
-from ...utils.variant_prices import update_product_minimal_variant_price
+from ...utils.variant_prices import (
+    CHUNK_SIZE,
+    update_all_products_minimal_variant_prices,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +15,25 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = "Recalculates the minimal variant prices for all products."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes updating the products.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Number of products updated at once by a process.",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write('Updating "minimal_variant_price" field of all the products.')
-        # Fetching the discounts just once and reusing them
-        discounts = fetch_active_discounts()
         # Run the update on all the products with "progress bar" (tqdm)
-        qs = Product.objects.all()
-        for product in tqdm(qs.iterator(), total=qs.count()):
-            update_product_minimal_variant_price(product, discounts=discounts)
+        with tqdm(total=Product.objects.count()) as progress:
+            for processed in update_all_products_minimal_variant_prices(
+                workers=options["workers"], chunk_size=options["chunk_size"]
+            ):
+                progress.update(processed)
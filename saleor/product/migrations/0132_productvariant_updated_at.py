@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2020-08-24 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0131_update_ts_vector_existing_product_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productvariant",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
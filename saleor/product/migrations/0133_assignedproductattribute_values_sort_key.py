@@ -0,0 +1,31 @@
+# Generated by Django 3.1.2 on 2026-10-17 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0132_productvariant_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignedproductattribute",
+            name="values_sort_key",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE product_assignedproductattribute
+            SET values_sort_key = (
+                SELECT STRING_AGG(av.name, ',' ORDER BY av.sort_order, av.id)
+                FROM product_assignedproductattribute_values apav
+                JOIN product_attributevalue av ON av.id = apav.attributevalue_id
+                WHERE apav.assignedproductattribute_id =
+                    product_assignedproductattribute.id
+            );
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -3,13 +3,14 @@ from typing import TYPE_CHECKING, Iterable, Optional, Union
 from uuid import uuid4
 
 from django.conf import settings
-from django.contrib.postgres.aggregates import StringAgg
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import JSONField  # type: ignore
-from django.db.models import Case, Count, F, FilteredRelation, Q, Sum, Value, When
+from django.db.models import Case, F, FilteredRelation, Q, Sum, Value, When
 from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.encoding import smart_text
 from django_measurement.models import MeasurementField
@@ -20,6 +21,7 @@ from mptt.managers import TreeManager
 from mptt.models import MPTTModel
 from versatileimagefield.fields import PPOIField, VersatileImageField
 
+from ..core.cache import invalidate_now_and_on_commit
 from ..core.db.fields import SanitizedJSONField
 from ..core.models import (
     ModelWithMetadata,
@@ -181,9 +183,8 @@ class ProductsQueryset(PublishedQuerySet):
                     relation_name="attributes",
                     condition=Q(attributes__assignment_id__in=attribute_associations),
                 ),
-                # Implicit `GROUP BY` required for the `StringAgg` aggregation
-                grouped_ids=Count("id"),
-                # String aggregation of the attribute's values to efficiently sort them
+                # Attribute's values names, concatenated in advance to efficiently
+                # sort them. Refer to `AssignedProductAttribute.values_sort_key`.
                 concatenated_values=Case(
                     # If the product has no association data but has
                     # the given attribute associated to its product type,
@@ -193,16 +194,7 @@ class ProductsQueryset(PublishedQuerySet):
                         & Q(filtered_attribute=None),
                         then=models.Value(""),
                     ),
-                    default=StringAgg(
-                        F("filtered_attribute__values__name"),
-                        delimiter=",",
-                        ordering=(
-                            [
-                                f"filtered_attribute__values__{field_name}"
-                                for field_name in AttributeValue._meta.ordering or []
-                            ]
-                        ),
-                    ),
+                    default=F("filtered_attribute__values_sort_key"),
                     output_field=models.CharField(),
                 ),
                 concatenated_values_order=Case(
@@ -355,9 +347,7 @@ class ProductVariantQueryset(models.QuerySet):
     def annotate_quantities(self):
         return self.annotate(
             quantity=Coalesce(Sum("stocks__quantity"), 0),
-            quantity_allocated=Coalesce(
-                Sum("stocks__allocations__quantity_allocated"), 0
-            ),
+            quantity_allocated=Coalesce(Sum("stocks__quantity_allocated"), 0),
         )
 
     def create(self, **kwargs):
@@ -423,6 +413,7 @@ class ProductVariant(SortableModel, ModelWithMetadata):
     weight = MeasurementField(
         measurement=Weight, unit_choices=WeightUnits.CHOICES, blank=True, null=True
     )
+    updated_at = models.DateTimeField(auto_now=True, null=True)
 
     objects = ProductVariantQueryset.as_manager()
     translated = TranslationProxy()
@@ -584,6 +575,9 @@ class AssignedProductAttribute(BaseAssignedAttribute):
     assignment = models.ForeignKey(
         "AttributeProduct", on_delete=models.CASCADE, related_name="productassignments"
     )
+    # Names of the assigned values in the order of values, used to sort products
+    # by the attribute. Refer to `update_products_attributes_sort_keys`.
+    values_sort_key = models.TextField(blank=True, null=True)
 
     class Meta:
         unique_together = (("product", "assignment"),)
@@ -904,3 +898,65 @@ class CollectionTranslation(SeoModelTranslation):
 
     def __str__(self) -> str:
         return self.name
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductType)
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=CollectionProduct)
+@receiver(m2m_changed, sender=CollectionProduct)
+def handle_product_pricing_change(**_kwargs):
+    from .utils.availability import invalidate_product_availabilities
+
+    invalidate_now_and_on_commit(invalidate_product_availabilities)
+
+
+@receiver(m2m_changed, sender=AssignedProductAttribute.values.through)
+def handle_assigned_product_attribute_values_change(
+    instance, action, reverse, pk_set, **_kwargs
+):
+    from .utils.attributes import update_products_attributes_sort_keys
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        assigned_attributes = AssignedProductAttribute.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        assigned_attributes = AssignedProductAttribute.objects.filter(pk__in=pk_set)
+    else:
+        # Assignments of a cleared value are not known anymore
+        assigned_attributes = AssignedProductAttribute.objects.filter(
+            assignment__attribute_id=instance.attribute_id
+        )
+    update_products_attributes_sort_keys(assigned_attributes)
+
+
+@receiver(post_save, sender=AttributeValue)
+def handle_attribute_value_save(instance, created, **_kwargs):
+    from .utils.attributes import update_products_attributes_sort_keys
+
+    if not created:
+        update_products_attributes_sort_keys(
+            AssignedProductAttribute.objects.filter(values=instance)
+        )
+
+
+@receiver(pre_delete, sender=AttributeValue)
+def handle_attribute_value_pre_delete(instance, **_kwargs):
+    # Remember the assignments as they are removed along with the value
+    instance._assigned_product_attributes_ids = list(
+        AssignedProductAttribute.objects.filter(values=instance).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=AttributeValue)
+def handle_attribute_value_delete(instance, **_kwargs):
+    from .utils.attributes import update_products_attributes_sort_keys
+
+    assigned_attributes_ids = getattr(instance, "_assigned_product_attributes_ids", [])
+    if assigned_attributes_ids:
+        update_products_attributes_sort_keys(
+            AssignedProductAttribute.objects.filter(pk__in=assigned_attributes_ids)
+        )
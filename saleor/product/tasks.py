@@ -1,14 +1,21 @@
 from typing import Iterable, List, Optional
 
+from django.contrib.sites.models import Site
+from django.db import transaction
+from django.utils import timezone
+
 from ..celeryconf import app
 from ..discount.models import Sale
+from ..site.models import SiteSettings
 from .models import Attribute, Product, ProductType, ProductVariant
 from .utils.attributes import generate_name_for_variant
 from .utils.variant_prices import (
+    get_product_ids_chunks,
+    get_products_of_catalogues,
+    get_products_of_discount,
+    get_products_of_sales,
     update_product_minimal_variant_price,
     update_products_minimal_variant_prices,
-    update_products_minimal_variant_prices_of_catalogues,
-    update_products_minimal_variant_prices_of_discount,
 )
 
 
@@ -47,24 +54,59 @@ def update_product_minimal_variant_price_task(product_pk: int):
     update_product_minimal_variant_price(product)
 
 
+def _update_products_minimal_variant_prices_in_chunks(products):
+    """Recalculate minimal variant prices in a separate task for each chunk.
+
+    Chunks are processed in parallel by the available workers and none of the
+    tasks holds a worker for longer than it takes to update a single chunk.
+    """
+    for product_ids in get_product_ids_chunks(products):
+        update_products_minimal_variant_prices_task.delay(product_ids=product_ids)
+
+
 @app.task
 def update_products_minimal_variant_prices_of_catalogues_task(
     product_ids: Optional[List[int]] = None,
     category_ids: Optional[List[int]] = None,
     collection_ids: Optional[List[int]] = None,
 ):
-    update_products_minimal_variant_prices_of_catalogues(
-        product_ids, category_ids, collection_ids
-    )
+    products = get_products_of_catalogues(product_ids, category_ids, collection_ids)
+    _update_products_minimal_variant_prices_in_chunks(products)
 
 
 @app.task
 def update_products_minimal_variant_prices_of_discount_task(discount_pk: int):
     discount = Sale.objects.get(pk=discount_pk)
-    update_products_minimal_variant_prices_of_discount(discount)
+    _update_products_minimal_variant_prices_in_chunks(
+        get_products_of_discount(discount)
+    )
 
 
 @app.task
 def update_products_minimal_variant_prices_task(product_ids: List[int]):
     products = Product.objects.filter(pk__in=product_ids)
     update_products_minimal_variant_prices(products)
+
+
+@app.task
+def update_products_minimal_variant_prices_of_started_and_ended_sales_task():
+    """Recalculate prices of products in sales which started or ended recently.
+
+    Run periodically by Celery beat. Only sales crossing their start or end date
+    since the previous run are considered; the time of the previous run is kept
+    in site settings and, if it is unknown, all sales are.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        site_settings = SiteSettings.objects.select_for_update().get(
+            site=Site.objects.get_current()
+        )
+        sales = Sale.objects.started_or_ended(
+            site_settings.sales_boundaries_checked_at, now
+        )
+        if sales.exists():
+            _update_products_minimal_variant_prices_in_chunks(
+                get_products_of_sales(sales)
+            )
+        site_settings.sales_boundaries_checked_at = now
+        site_settings.save(update_fields=["sales_boundaries_checked_at"])
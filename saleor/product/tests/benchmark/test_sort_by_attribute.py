@@ -0,0 +1,115 @@
+import random
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.db import connection, models
+from django.db.models import Case, Count, F, FilteredRelation, Q, When
+
+from ...models import (
+    AssignedProductAttribute,
+    AttributeProduct,
+    AttributeValue,
+    Product,
+)
+from ...utils.attributes import update_products_attributes_sort_keys
+
+PRODUCTS_COUNT = 2000
+VALUES_COUNT = 20
+
+
+def _generate_catalog(product_type, category, attribute):
+    values = AttributeValue.objects.bulk_create(
+        [
+            AttributeValue(attribute=attribute, name=f"Value {i}", slug=f"value-{i}")
+            for i in range(VALUES_COUNT)
+        ]
+    )
+    products = Product.objects.bulk_create(
+        [
+            Product(
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                product_type=product_type,
+                category=category,
+            )
+            for i in range(PRODUCTS_COUNT)
+        ]
+    )
+    assignment = AttributeProduct.objects.get(
+        attribute=attribute, product_type=product_type
+    )
+    # Leave some of the products without the attribute assigned
+    assigned_attributes = AssignedProductAttribute.objects.bulk_create(
+        [
+            AssignedProductAttribute(product=product, assignment=assignment)
+            for product in products[: PRODUCTS_COUNT * 9 // 10]
+        ]
+    )
+    through_model = AssignedProductAttribute.values.through
+    random.seed(0)
+    through_model.objects.bulk_create(
+        [
+            through_model(
+                assignedproductattribute=assigned_attribute, attributevalue=value
+            )
+            for assigned_attribute in assigned_attributes
+            for value in random.sample(values, random.randint(0, 2))
+        ]
+    )
+    update_products_attributes_sort_keys(AssignedProductAttribute.objects.all())
+
+
+def _sort_by_aggregated_values(attribute):
+    """Sort products the way it was done before the sort keys were stored."""
+    assignments, product_types = zip(
+        *AttributeProduct.objects.filter(attribute=attribute).values_list(
+            "pk", "product_type_id"
+        )
+    )
+    return Product.objects.annotate(
+        filtered_attribute=FilteredRelation(
+            relation_name="attributes",
+            condition=Q(attributes__assignment_id__in=assignments),
+        ),
+        grouped_ids=Count("id"),
+        concatenated_values=Case(
+            When(
+                Q(product_type_id__in=product_types) & Q(filtered_attribute=None),
+                then=models.Value(""),
+            ),
+            default=StringAgg(
+                F("filtered_attribute__values__name"),
+                delimiter=",",
+                ordering=[
+                    f"filtered_attribute__values__{field_name}"
+                    for field_name in AttributeValue._meta.ordering or []
+                ],
+            ),
+            output_field=models.CharField(),
+        ),
+        concatenated_values_order=Case(
+            When(concatenated_values=None, then=2),
+            When(concatenated_values="", then=1),
+            default=0,
+            output_field=models.IntegerField(),
+        ),
+    ).order_by("concatenated_values_order", "concatenated_values", "name")
+
+
+def _measure(queryset):
+    sql, params = queryset.values_list("pk", flat=True).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    pks = list(queryset.values_list("pk", flat=True))
+    return pks, plan
+
+
+def test_sort_by_attribute_plan(product_type, category, color_attribute):
+    _generate_catalog(product_type, category, color_attribute)
+
+    old_pks, old_plan = _measure(_sort_by_aggregated_values(color_attribute))
+    new_pks, new_plan = _measure(Product.objects.sort_by_attribute(color_attribute.pk))
+
+    assert new_pks == old_pks
+    assert "Aggregate" in old_plan
+    assert "Aggregate" not in new_plan
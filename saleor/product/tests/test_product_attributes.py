@@ -136,3 +136,60 @@ def test_associate_attribute_to_product_instance_without_values(product):
     # Ensure the values were cleared and no new assignment entry was created
     assert new_assignment.pk == old_assignment.pk
     assert new_assignment.values.count() == 0
+
+
+def test_associate_attribute_values_updates_sort_key(product, color_attribute):
+    # given
+    red, blue = color_attribute.values.all()
+
+    # when
+    assigned_attribute = associate_attribute_values_to_instance(
+        product, color_attribute, blue, red
+    )
+
+    # then
+    assigned_attribute.refresh_from_db()
+    assert assigned_attribute.values_sort_key == "Red,Blue"
+
+
+def test_clear_attribute_values_removes_sort_key(product, color_attribute):
+    # given
+    assigned_attribute = product.attributes.get()
+
+    # when
+    assigned_attribute.values.clear()
+
+    # then
+    assigned_attribute.refresh_from_db()
+    assert assigned_attribute.values_sort_key is None
+
+
+def test_attribute_value_rename_updates_sort_key(product, color_attribute):
+    # given
+    red, blue = color_attribute.values.all()
+    assigned_attribute = associate_attribute_values_to_instance(
+        product, color_attribute, red, blue
+    )
+
+    # when
+    red.name = "Dark red"
+    red.save(update_fields=["name"])
+
+    # then
+    assigned_attribute.refresh_from_db()
+    assert assigned_attribute.values_sort_key == "Dark red,Blue"
+
+
+def test_attribute_value_delete_updates_sort_key(product, color_attribute):
+    # given
+    red, blue = color_attribute.values.all()
+    assigned_attribute = associate_attribute_values_to_instance(
+        product, color_attribute, red, blue
+    )
+
+    # when
+    red.delete()
+
+    # then
+    assigned_attribute.refresh_from_db()
+    assert assigned_attribute.values_sort_key == "Blue"
@@ -1,16 +1,27 @@
+from datetime import timedelta
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.utils import timezone
+from freezegun import freeze_time
 from graphql_relay import to_global_id
 from prices import Money
 
+from ...discount.models import Sale
+from ...discount.utils import fetch_active_discounts
 from ...graphql.tests.utils import get_graphql_content
-from ..models import ProductVariant
+from ..models import Category, Product, ProductVariant
 from ..tasks import (
-    update_products_minimal_variant_prices_of_catalogues,
+    update_products_minimal_variant_prices_of_discount_task,
+    update_products_minimal_variant_prices_of_started_and_ended_sales_task,
     update_products_minimal_variant_prices_task,
 )
-from ..utils.variant_prices import update_product_minimal_variant_price
+from ..utils.variant_prices import (
+    get_product_ids_chunks,
+    update_product_minimal_variant_price,
+    update_products_minimal_variant_prices,
+    update_products_minimal_variant_prices_of_catalogues,
+)
 
 
 def test_update_product_minimal_variant_price(product):
@@ -156,15 +167,192 @@ def test_product_variant_objects_bulk_create_updates_minimal_variant_price(produ
     assert product.minimal_variant_price == Money("1.00", "USD")
 
 
-@patch(
-    "saleor.product.management.commands"
-    ".update_all_products_minimal_variant_prices"
-    ".update_product_minimal_variant_price"
-)
-def test_management_commmand_update_all_products_minimal_variant_price(
-    mock_update_product_minimal_variant_price, product_list
+def test_management_commmand_update_all_products_minimal_variant_price(product_list,):
+    ProductVariant.objects.update(price_amount="0.50")
+
+    call_command("update_all_products_minimal_variant_prices", chunk_size=2)
+
+    for product in product_list:
+        product.refresh_from_db()
+        assert product.minimal_variant_price == Money("0.50", "USD")
+
+
+def test_update_products_minimal_variant_prices_applies_discounts(
+    product, sale, product_with_single_variant
+):
+    # given
+    variant = ProductVariant.objects.create(
+        product=product, sku="SKU_CHEAPER", price=Money("8.00", "USD")
+    )
+    product_with_single_variant.minimal_variant_price_amount = None
+    product_with_single_variant.save(update_fields=["minimal_variant_price_amount"])
+    products = Product.objects.filter(
+        pk__in=[product.pk, product_with_single_variant.pk]
+    )
+
+    # when
+    update_products_minimal_variant_prices(products)
+
+    # then
+    product.refresh_from_db()
+    product_with_single_variant.refresh_from_db()
+    assert product.minimal_variant_price == variant.get_price(fetch_active_discounts())
+    assert product.minimal_variant_price == Money("3.00", "USD")
+    assert product_with_single_variant.minimal_variant_price == (
+        product_with_single_variant.variants.get().get_price(fetch_active_discounts())
+    )
+
+
+def test_update_products_minimal_variant_prices_skips_products_without_variants(
+    product,
+):
+    # given
+    product.variants.all().delete()
+
+    # when
+    update_products_minimal_variant_prices(Product.objects.all())
+
+    # then
+    product.refresh_from_db()
+    assert product.minimal_variant_price == Money("10.00", "USD")
+
+
+def test_update_products_minimal_variant_prices_queries_per_chunk(
+    product_list, django_assert_num_queries
 ):
-    call_command("update_all_products_minimal_variant_prices")
-    call_args_list = mock_update_product_minimal_variant_price.call_args_list
-    for (args, kwargs), product in zip(call_args_list, product_list):
-        assert args[0] == product
+    # given
+    ProductVariant.objects.update(price_amount="0.50")
+    products = Product.objects.all()
+
+    # when
+    # Product pks, then products, collections, variants and update per chunk
+    with django_assert_num_queries(1 + 2 * 4):
+        update_products_minimal_variant_prices(products, discounts=[], chunk_size=2)
+
+    # then
+    for product in product_list:
+        product.refresh_from_db()
+        assert product.minimal_variant_price == Money("0.50", "USD")
+
+
+def test_get_product_ids_chunks(product_list):
+    product_ids = sorted(product.pk for product in product_list)
+
+    chunks = list(get_product_ids_chunks(Product.objects.all(), chunk_size=2))
+
+    assert chunks == [product_ids[:2], product_ids[2:]]
+    assert list(get_product_ids_chunks(product_list, chunk_size=2)) == chunks
+
+
+@patch("saleor.product.tasks.get_product_ids_chunks")
+@patch("saleor.product.tasks.update_products_minimal_variant_prices_task.delay")
+def test_update_products_minimal_variant_prices_of_discount_task_in_chunks(
+    update_prices_task_mock, get_chunks_mock, sale, product
+):
+    get_chunks_mock.return_value = [[1, 2], [3]]
+
+    update_products_minimal_variant_prices_of_discount_task(sale.pk)
+
+    assert update_prices_task_mock.call_count == 2
+    update_prices_task_mock.assert_any_call(product_ids=[1, 2])
+    update_prices_task_mock.assert_any_call(product_ids=[3])
+
+
+def test_update_minimal_variant_prices_of_started_sales(product, sale, site_settings):
+    # given
+    start_date = timezone.now() + timedelta(hours=1)
+    sale.start_date = start_date
+    sale.save(update_fields=["start_date"])
+    site_settings.sales_boundaries_checked_at = start_date - timedelta(minutes=5)
+    site_settings.save(update_fields=["sales_boundaries_checked_at"])
+
+    # when
+    with freeze_time(start_date + timedelta(minutes=1)):
+        update_products_minimal_variant_prices_of_started_and_ended_sales_task()
+
+    # then
+    product.refresh_from_db()
+    assert product.minimal_variant_price == Money("5.00", "USD")
+    site_settings.refresh_from_db()
+    assert site_settings.sales_boundaries_checked_at == (
+        start_date + timedelta(minutes=1)
+    )
+
+
+def test_update_minimal_variant_prices_of_ended_sales(product, sale, site_settings):
+    # given
+    end_date = timezone.now() + timedelta(hours=1)
+    sale.end_date = end_date
+    sale.save(update_fields=["end_date"])
+    product.minimal_variant_price_amount = 5
+    product.save(update_fields=["minimal_variant_price_amount"])
+    site_settings.sales_boundaries_checked_at = end_date - timedelta(minutes=5)
+    site_settings.save(update_fields=["sales_boundaries_checked_at"])
+
+    # when
+    with freeze_time(end_date + timedelta(minutes=1)):
+        update_products_minimal_variant_prices_of_started_and_ended_sales_task()
+
+    # then
+    product.refresh_from_db()
+    assert product.minimal_variant_price == Money("10.00", "USD")
+
+
+def test_update_minimal_variant_prices_of_started_sales_in_subcategories(
+    product, category, site_settings
+):
+    # given
+    subcategory = Category.objects.create(
+        name="Subcategory", slug="subcategory", parent=category
+    )
+    product.category = subcategory
+    product.save(update_fields=["category"])
+    start_date = timezone.now() + timedelta(hours=1)
+    sale = Sale.objects.create(name="Sale", value=5, start_date=start_date)
+    sale.categories.add(category)
+    site_settings.sales_boundaries_checked_at = start_date - timedelta(minutes=5)
+    site_settings.save(update_fields=["sales_boundaries_checked_at"])
+
+    # when
+    with freeze_time(start_date + timedelta(minutes=1)):
+        update_products_minimal_variant_prices_of_started_and_ended_sales_task()
+
+    # then
+    product.refresh_from_db()
+    assert product.minimal_variant_price == Money("5.00", "USD")
+
+
+@patch("saleor.product.tasks.update_products_minimal_variant_prices_task.delay")
+def test_update_minimal_variant_prices_of_started_sales_skips_other_sales(
+    update_prices_task_mock, product, sale, site_settings
+):
+    # given
+    checked_at = timezone.now() + timedelta(hours=1)
+    site_settings.sales_boundaries_checked_at = checked_at
+    site_settings.save(update_fields=["sales_boundaries_checked_at"])
+
+    # when
+    with freeze_time(checked_at + timedelta(minutes=5)):
+        update_products_minimal_variant_prices_of_started_and_ended_sales_task()
+
+    # then
+    update_prices_task_mock.assert_not_called()
+
+
+def test_update_minimal_variant_prices_of_sales_without_previous_check(
+    product, sale, site_settings
+):
+    # given
+    start_date = timezone.now() - timedelta(days=1)
+    sale.start_date = start_date
+    sale.save(update_fields=["start_date"])
+    assert site_settings.sales_boundaries_checked_at is None
+
+    # when
+    update_products_minimal_variant_prices_of_started_and_ended_sales_task()
+
+    # then
+    product.refresh_from_db()
+    assert product.minimal_variant_price == Money("5.00", "USD")
+    site_settings.refresh_from_db()
+    assert site_settings.sales_boundaries_checked_at is not None
@@ -1,5 +1,8 @@
 from typing import TYPE_CHECKING, Optional, Set, Union
 
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import OuterRef, QuerySet, Subquery
+
 from ..models import (
     AssignedProductAttribute,
     AssignedVariantAttribute,
@@ -87,3 +90,25 @@ def associate_attribute_values_to_instance(
     assignment = _associate_attribute_to_instance(instance, attribute.pk)
     assignment.values.set(values)
     return assignment
+
+
+def update_products_attributes_sort_keys(assigned_attributes: QuerySet):
+    """Update sort keys of the given product attribute assignments in one query.
+
+    The sort key is made of the names of the assigned values, in the order of
+    values. Assignments without values have no sort key.
+    """
+    sort_keys = (
+        AttributeValue.objects.filter(assignedproductattribute=OuterRef("pk"))
+        .order_by()
+        .values("assignedproductattribute")
+        .annotate(
+            sort_key=StringAgg(
+                "name",
+                delimiter=",",
+                ordering=list(AttributeValue._meta.ordering or []),
+            )
+        )
+        .values("sort_key")
+    )
+    assigned_attributes.update(values_sort_key=Subquery(sort_keys))
@@ -1,25 +1,29 @@
+import hashlib
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Iterable, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
 
 import opentracing
 from django.conf import settings
+from django.core.cache import cache
 from prices import MoneyRange, TaxedMoney, TaxedMoneyRange
 
 from saleor.product.models import Collection, Product, ProductVariant
 
+from ...core.cache import bump_cache_version, get_cache_version, is_cache_shared
 from ...core.utils import to_local_currency
-from ...discount import DiscountInfo
+from ...discount import DiscountInfo, DiscountInfoList
 from ...discount.utils import calculate_discounted_price
-from ...plugins.manager import get_plugins_manager
-from ...warehouse.availability import (
-    are_all_product_variants_in_stock,
-    is_product_in_stock,
+from ...plugins.manager import (
+    PLUGINS_CONFIGURATION_VERSION_CACHE_KEY,
+    get_plugins_manager,
 )
+from ...warehouse.availability import get_products_stock_availability
 from .. import ProductAvailabilityStatus
 
 if TYPE_CHECKING:
     # flake8: noqa
     from ...plugins.manager import PluginsManager
+    from ...warehouse.availability import ProductStockAvailability
 
 
 @dataclass
@@ -32,6 +36,11 @@ class ProductAvailability:
     discount_local_currency: Optional[TaxedMoneyRange]
 
 
+PRODUCT_PRICING_VERSION_CACHE_KEY = "product_pricing_version"
+PRODUCT_AVAILABILITY_CACHE_KEY = "product_availability:{}"
+PRODUCT_AVAILABILITY_CACHE_TIMEOUT = 60 * 60
+
+
 @dataclass
 class VariantAvailability:
     on_sale: bool
@@ -45,14 +54,24 @@ class VariantAvailability:
 def get_product_availability_status(
     product: "Product", country: str
 ) -> ProductAvailabilityStatus:
+    stock_availability = get_products_stock_availability([product.pk], country)[
+        product.pk
+    ]
+    return get_product_availability_status_from_stock(product, stock_availability)
+
+
+def get_product_availability_status_from_stock(
+    product: "Product", stock_availability: "ProductStockAvailability"
+) -> ProductAvailabilityStatus:
+    """Return availability status for stock availability fetched in advance."""
     is_visible = product.is_visible
-    are_all_variants_in_stock = are_all_product_variants_in_stock(product, country)
-    is_in_stock = is_product_in_stock(product, country)
+    are_all_variants_in_stock = stock_availability.all_variants_in_stock
+    is_in_stock = stock_availability.in_stock
     requires_variants = product.product_type.has_variants
 
     if not product.is_published:
         return ProductAvailabilityStatus.NOT_PUBLISHED
-    if requires_variants and not product.variants.exists():
+    if requires_variants and not stock_availability.has_variants:
         # We check the requires_variants flag here in order to not show this
         # status with product types that don't require variants, as in that
         # case variants are hidden from the UI and user doesn't manage them.
@@ -263,3 +282,76 @@ def get_variant_availability(
             price_local_currency=price_local_currency,
             discount_local_currency=discount_local_currency,
         )
+
+
+def get_product_availability_cache_key(
+    *,
+    product: Product,
+    variants: Iterable[ProductVariant],
+    collections: Iterable[Collection],
+    discounts: Iterable[DiscountInfo],
+    country: Optional[str] = None,
+    local_currency: Optional[str] = None,
+) -> str:
+    """Return a key describing the arguments of `get_product_availability`.
+
+    Product and tax data that are not part of the key are covered by cache
+    versions added in `get_cached_product_availabilities`.
+    """
+    if not isinstance(discounts, DiscountInfoList):
+        discounts = DiscountInfoList(discounts or [])
+    return repr(
+        (
+            product.pk,
+            product.is_visible,
+            str(country) if country else None,
+            local_currency,
+            discounts.cache_key,
+            sorted((variant.pk, str(variant.price)) for variant in variants),
+            sorted(collection.pk for collection in collections),
+        )
+    )
+
+
+def _get_product_availability_cache_keys(
+    keys: Iterable[str], plugins: "PluginsManager"
+) -> List[str]:
+    versions = repr(
+        (
+            get_cache_version(PRODUCT_PRICING_VERSION_CACHE_KEY),
+            get_cache_version(PLUGINS_CONFIGURATION_VERSION_CACHE_KEY),
+            [plugin.PLUGIN_ID for plugin in plugins.get_active_plugins()],
+        )
+    )
+    return [
+        PRODUCT_AVAILABILITY_CACHE_KEY.format(
+            hashlib.sha256((versions + key).encode()).hexdigest()
+        )
+        for key in keys
+    ]
+
+
+def get_cached_product_availabilities(
+    keys: Iterable[str], plugins: "PluginsManager"
+) -> List[Tuple[str, Optional[ProductAvailability]]]:
+    """Return cache keys and cached availabilities for the given keys.
+
+    Keys are the ones returned by `get_product_availability_cache_key`. Without
+    a cache shared by all processes nothing is cached.
+    """
+    if not is_cache_shared():
+        return [(key, None) for key in keys]
+    cache_keys = _get_product_availability_cache_keys(keys, plugins)
+    cached = cache.get_many(cache_keys)
+    return [(cache_key, cached.get(cache_key)) for cache_key in cache_keys]
+
+
+def cache_product_availability(cache_key: str, availability: ProductAvailability):
+    if not is_cache_shared():
+        return
+    cache.set(cache_key, availability, timeout=PRODUCT_AVAILABILITY_CACHE_TIMEOUT)
+
+
+def invalidate_product_availabilities():
+    """Drop product availabilities cached by every worker."""
+    bump_cache_version(PRODUCT_PRICING_VERSION_CACHE_KEY)
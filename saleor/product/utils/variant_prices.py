@@ -1,12 +1,24 @@
 import operator
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
+from django.db import connections
+from django.db.models import QuerySet
 from django.db.models.query_utils import Q
+from django.utils import timezone
 from prices import Money
 
-from ...discount.utils import fetch_active_discounts
-from ..models import Product
+from ...discount import DiscountInfo
+from ...discount.utils import (
+    fetch_active_discounts,
+    get_product_discounts_by_collection_ids,
+)
+from ..models import Category, Collection, CollectionProduct, Product, ProductVariant
+
+# Number of products which minimal variant prices are recalculated at once
+CHUNK_SIZE = 2000
 
 
 def _get_product_minimal_variant_price(product, discounts) -> Optional[Money]:
@@ -32,27 +44,155 @@ def update_product_minimal_variant_price(product, discounts=None, save=True):
     return product
 
 
-def update_products_minimal_variant_prices(products, discounts=None):
-    if discounts is None:
-        discounts = fetch_active_discounts()
-    changed_products_to_update = []
+def _get_products_minimal_variant_prices(
+    products: Iterable[Product], discounts: Iterable[DiscountInfo]
+) -> Dict[int, Money]:
+    """Return minimal variant prices of products having variants.
+
+    Variants' prices and products' collections are fetched for all the products
+    at once and the discounts are matched in memory.
+    """
+    product_ids = [product.pk for product in products]
+    collections = defaultdict(set)
+    collection_products = CollectionProduct.objects.filter(
+        product_id__in=product_ids
+    ).values_list("product_id", "collection_id")
+    for product_id, collection_id in collection_products:
+        collections[product_id].add(collection_id)
+    variant_prices = defaultdict(list)
+    variants = (
+        ProductVariant.objects.filter(product_id__in=product_ids)
+        .order_by()
+        .values_list("product_id", "price_amount", "currency")
+    )
+    for product_id, price_amount, currency in variants:
+        variant_prices[product_id].append(Money(price_amount, currency))
+
+    minimal_variant_prices = {}
     for product in products:
-        old_minimal_variant_price = product.minimal_variant_price
-        updated_product = update_product_minimal_variant_price(
-            product, discounts, save=False
+        prices = variant_prices.get(product.pk)
+        if not prices:
+            continue
+        product_discounts = []
+        if discounts:
+            product_discounts = list(
+                get_product_discounts_by_collection_ids(
+                    product=product,
+                    collection_ids=collections[product.pk],
+                    discounts=discounts,
+                )
+            )
+        if product_discounts:
+            prices = [
+                min(discount(price) for discount in product_discounts)
+                for price in prices
+            ]
+        minimal_variant_prices[product.pk] = min(prices)
+    return minimal_variant_prices
+
+
+def update_products_minimal_variant_prices_chunk(
+    product_ids: List[int], discounts: Iterable[DiscountInfo]
+) -> int:
+    """Recalculate minimal variant prices of products and save the changed ones.
+
+    Return the number of updated products.
+    """
+    products = list(
+        Product.objects.filter(pk__in=product_ids).only(
+            "pk", "category_id", "currency", "minimal_variant_price_amount"
         )
-        # Check if the "minimal_variant_price" has changed
-        if updated_product.minimal_variant_price != old_minimal_variant_price:
-            changed_products_to_update.append(updated_product)
-    # Bulk update the changed products
+    )
+    minimal_variant_prices = _get_products_minimal_variant_prices(products, discounts)
+    updated_at = timezone.now()
+    changed_products_to_update = []
+    for product in products:
+        minimal_variant_price = minimal_variant_prices.get(product.pk)
+        if minimal_variant_price is None:
+            continue
+        if product.minimal_variant_price != minimal_variant_price:
+            product.minimal_variant_price_amount = minimal_variant_price.amount
+            product.updated_at = updated_at
+            changed_products_to_update.append(product)
     Product.objects.bulk_update(
-        changed_products_to_update, ["minimal_variant_price_amount"]
+        changed_products_to_update, ["minimal_variant_price_amount", "updated_at"]
     )
+    return len(changed_products_to_update)
 
 
-def update_products_minimal_variant_prices_of_catalogues(
-    product_ids=None, category_ids=None, collection_ids=None
+def get_product_ids_chunks(
+    products: Iterable[Product], chunk_size: int = CHUNK_SIZE
+) -> Iterator[List[int]]:
+    """Yield sorted pks of the products, up to `chunk_size` of them at once."""
+    if isinstance(products, QuerySet):
+        product_ids = products.order_by("pk").values_list("pk", flat=True)
+        product_ids = product_ids.iterator(chunk_size=chunk_size)
+    else:
+        product_ids = iter(sorted(product.pk for product in products))
+    chunk: List[int] = []
+    for product_id in product_ids:
+        chunk.append(product_id)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def update_products_minimal_variant_prices(
+    products, discounts=None, chunk_size: int = CHUNK_SIZE
 ):
+    if discounts is None:
+        discounts = fetch_active_discounts()
+    for product_ids in get_product_ids_chunks(products, chunk_size):
+        update_products_minimal_variant_prices_chunk(product_ids, discounts)
+
+
+_worker_discounts: Optional[List[DiscountInfo]] = None
+
+
+def _init_minimal_variant_prices_worker():
+    global _worker_discounts
+    _worker_discounts = fetch_active_discounts()
+
+
+def _update_products_minimal_variant_prices_in_worker(product_ids: List[int]) -> int:
+    update_products_minimal_variant_prices_chunk(
+        product_ids, _worker_discounts  # type: ignore
+    )
+    return len(product_ids)
+
+
+def update_all_products_minimal_variant_prices(
+    workers: int = 1, chunk_size: int = CHUNK_SIZE
+) -> Iterator[int]:
+    """Recalculate minimal variant prices of all products, chunk by chunk.
+
+    Yield the number of processed products after every chunk. With more than one
+    worker, chunks are processed in a pool of processes.
+    """
+    products = Product.objects.all()
+    if workers <= 1:
+        discounts = fetch_active_discounts()
+        for product_ids in get_product_ids_chunks(products, chunk_size):
+            update_products_minimal_variant_prices_chunk(product_ids, discounts)
+            yield len(product_ids)
+        return
+
+    chunks = list(get_product_ids_chunks(products, chunk_size))
+    # Forked workers can not share database connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_minimal_variant_prices_worker
+    ) as executor:
+        yield from executor.map(
+            _update_products_minimal_variant_prices_in_worker, chunks
+        )
+
+
+def get_products_of_catalogues(
+    product_ids=None, category_ids=None, collection_ids=None
+) -> QuerySet:
     # Building the matching products query
     q_list = []
     if product_ids:
@@ -62,17 +202,45 @@ def update_products_minimal_variant_prices_of_catalogues(
     if collection_ids:
         q_list.append(Q(collectionproduct__collection_id__in=collection_ids))
     # Asserting that the function was called with some ids
-    if q_list:
-        # Querying the products
-        q_or = reduce(operator.or_, q_list)
-        products = Product.objects.filter(q_or).distinct()
+    if not q_list:
+        return Product.objects.none()
+    q_or = reduce(operator.or_, q_list)
+    return Product.objects.filter(q_or).distinct()
+
 
-        update_products_minimal_variant_prices(products)
+def update_products_minimal_variant_prices_of_catalogues(
+    product_ids=None, category_ids=None, collection_ids=None
+):
+    products = get_products_of_catalogues(product_ids, category_ids, collection_ids)
+    update_products_minimal_variant_prices(products)
 
 
-def update_products_minimal_variant_prices_of_discount(discount):
-    update_products_minimal_variant_prices_of_catalogues(
+def get_products_of_discount(discount) -> QuerySet:
+    return get_products_of_catalogues(
         product_ids=discount.products.all().values_list("id", flat=True),
         category_ids=discount.categories.all().values_list("id", flat=True),
         collection_ids=discount.collections.all().values_list("id", flat=True),
     )
+
+
+def get_products_of_sales(sales: QuerySet) -> QuerySet:
+    """Return products which prices are affected by any of the sales.
+
+    Sales applied to categories apply to their subcategories too.
+    """
+    category_ids = (
+        Category.tree.filter(sale__in=sales)
+        .get_descendants(include_self=True)
+        .values_list("pk", flat=True)
+    )
+    return get_products_of_catalogues(
+        product_ids=Product.objects.filter(sale__in=sales).values_list("pk", flat=True),
+        category_ids=list(category_ids),
+        collection_ids=Collection.objects.filter(sale__in=sales).values_list(
+            "pk", flat=True
+        ),
+    )
+
+
+def update_products_minimal_variant_prices_of_discount(discount):
+    update_products_minimal_variant_prices(get_products_of_discount(discount))
@@ -476,6 +476,47 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", None)
 
+# How often minimal variant prices of products in sales which started or ended
+# since the previous check are recalculated by Celery beat
+SALES_BOUNDARIES_CHECK_INTERVAL = timedelta(
+    seconds=parse(os.environ.get("SALES_BOUNDARIES_CHECK_INTERVAL", "5 minutes"))
+)
+CELERY_BEAT_SCHEDULE = {
+    "update-minimal-variant-prices-of-started-and-ended-sales": {
+        "task": (
+            "saleor.product.tasks."
+            "update_products_minimal_variant_prices_of_started_and_ended_sales_task"
+        ),
+        "schedule": SALES_BOUNDARIES_CHECK_INTERVAL,
+    },
+    "delete-old-webhook-delivery-attempts": {
+        "task": (
+            "saleor.plugins.webhook.tasks.delete_old_webhook_delivery_attempts_task"
+        ),
+        "schedule": timedelta(hours=1),
+    },
+}
+
+# Timeout in seconds of connecting to and waiting for a response of a webhook target
+WEBHOOK_TIMEOUT = float(os.environ.get("WEBHOOK_TIMEOUT", 10))
+
+# Maximum number of keep-alive connections a worker process holds per webhook target
+WEBHOOK_POOL_MAXSIZE = int(os.environ.get("WEBHOOK_POOL_MAXSIZE", 10))
+
+# Maximum number of webhook targets a worker process keeps connections open to
+WEBHOOK_MAX_POOLS = int(os.environ.get("WEBHOOK_MAX_POOLS", 100))
+
+# Number of consecutive failed delivery attempts after which a webhook is
+# deactivated, 0 never deactivates webhooks
+WEBHOOK_MAX_CONSECUTIVE_FAILURES = int(
+    os.environ.get("WEBHOOK_MAX_CONSECUTIVE_FAILURES", 100)
+)
+
+# How long delivery attempts of webhooks are kept for
+WEBHOOK_DELIVERY_ATTEMPTS_RETENTION = timedelta(
+    seconds=parse(os.environ.get("WEBHOOK_DELIVERY_ATTEMPTS_RETENTION", "7 days"))
+)
+
 # Change this value if your application is running behind a proxy,
 # e.g. HTTP_CF_Connecting_IP for Cloudflare or X_FORWARDED_FOR
 REAL_IP_ENVIRON = os.environ.get("REAL_IP_ENVIRON", "REMOTE_ADDR")
@@ -483,6 +524,22 @@ REAL_IP_ENVIRON = os.environ.get("REAL_IP_ENVIRON", "REMOTE_ADDR")
 # The maximum length of a graphql query to log in tracings
 OPENTRACING_MAX_QUERY_LENGTH_LOG = 2000
 
+# The number of parsed and validated GraphQL documents kept in memory per process
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.environ.get("GRAPHQL_DOCUMENT_CACHE_SIZE", 1000))
+
+# The maximum length of a query stored as a persisted query, longer queries are
+# still executed but clients have to send their full text with every request
+GRAPHQL_PERSISTED_QUERY_MAX_LENGTH = int(
+    os.environ.get("GRAPHQL_PERSISTED_QUERY_MAX_LENGTH", 20000)
+)
+
+# The maximum number of operations accepted in a single batched request
+GRAPHQL_MAX_BATCH_SIZE = int(os.environ.get("GRAPHQL_MAX_BATCH_SIZE", 50))
+
+# Number of threads executing queries from a batched request concurrently,
+# 0 executes all operations sequentially in the request thread
+GRAPHQL_BATCH_WORKERS = int(os.environ.get("GRAPHQL_BATCH_WORKERS", 0))
+
 # Slugs for menus precreated in Django migrations
 DEFAULT_MENUS = {"top_menu_name": "navbar", "bottom_menu_name": "footer"}
 
@@ -569,6 +626,8 @@ if "JAEGER_AGENT_HOST" in os.environ:
 REDIS_URL = os.environ.get("REDIS_URL")
 if REDIS_URL:
     CACHE_URL = os.environ.setdefault("CACHE_URL", REDIS_URL)
+# Data is cached across requests, e.g. plugins managers, only with a cache
+# shared by all processes, like Redis
 CACHES = {"default": django_cache_url.config()}
 
 # Default False because storefront and dashboard don't support expiration of token
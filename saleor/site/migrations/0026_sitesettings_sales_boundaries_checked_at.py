@@ -0,0 +1,18 @@
+# Generated by Django 3.1.2 on 2026-10-17 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("site", "0025_auto_20191024_0552"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitesettings",
+            name="sales_boundaries_checked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
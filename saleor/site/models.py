@@ -68,6 +68,8 @@ class SiteSettings(models.Model):
     )
     default_mail_sender_address = models.EmailField(blank=True, null=True)
     customer_set_password_url = models.CharField(max_length=255, blank=True, null=True)
+    # Time of the last check for sales which started or ended
+    sales_boundaries_checked_at = models.DateTimeField(blank=True, null=True)
     translated = TranslationProxy()
 
     class Meta:
@@ -0,0 +1,5 @@
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class SharedLocMemCache(LocMemCache):
+    """Local memory cache treated as shared, as tests run in a single process."""
@@ -16,6 +16,7 @@ from django.contrib.sites.models import Site
 from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import connection
+from django.db.models import F
 from django.forms import ModelForm
 from django.test.utils import CaptureQueriesContext as BaseCaptureQueriesContext
 from django.utils import timezone
@@ -40,6 +41,7 @@ from ..discount.models import (
     VoucherCustomer,
     VoucherTranslation,
 )
+from ..discount.utils import invalidate_discounts
 from ..giftcard.models import GiftCard
 from ..menu.models import Menu, MenuItem, MenuItemTranslation
 from ..order import OrderStatus
@@ -75,6 +77,7 @@ from ..product.models import (
 )
 from ..product.tests.utils import create_image
 from ..product.utils.attributes import associate_attribute_values_to_instance
+from ..product.utils.availability import invalidate_product_availabilities
 from ..shipping.models import (
     ShippingMethod,
     ShippingMethodTranslation,
@@ -83,6 +86,7 @@ from ..shipping.models import (
 )
 from ..site import AuthenticationBackends
 from ..site.models import AuthorizationKey, SiteSettings
+from ..warehouse.management import deallocate_stock_for_order
 from ..warehouse.models import Allocation, Stock, Warehouse
 from ..webhook.event_types import WebhookEventType
 from ..webhook.models import Webhook
@@ -194,6 +198,21 @@ def setup_dummy_gateways(settings):
     return settings
 
 
+@pytest.fixture(autouse=True)
+def clear_pricing_caches():
+    # Database changes are rolled back between tests without sending signals
+    invalidate_discounts()
+    invalidate_product_availabilities()
+
+
+@pytest.fixture
+def local_memory_cache(settings):
+    """Use a cache which is not shared by processes, like the default one."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+
 @pytest.fixture
 def sample_gateway(settings):
     settings.PLUGINS += [
@@ -1309,6 +1328,12 @@ def order_line_with_allocation_in_many_stocks(customer_user, variant_with_many_s
             Allocation(order_line=order_line, stock=stocks[1], quantity_allocated=1),
         ]
     )
+    Stock.objects.filter(pk=stocks[0].pk).update(
+        quantity_allocated=F("quantity_allocated") + 2
+    )
+    Stock.objects.filter(pk=stocks[1].pk).update(
+        quantity_allocated=F("quantity_allocated") + 1
+    )
 
     return order_line
 
@@ -1339,6 +1364,9 @@ def order_line_with_one_allocation(customer_user, variant_with_many_stocks):
     Allocation.objects.create(
         order_line=order_line, stock=stocks[0], quantity_allocated=1
     )
+    Stock.objects.filter(pk=stocks[0].pk).update(
+        quantity_allocated=F("quantity_allocated") + 1
+    )
 
     return order_line
 
@@ -1406,6 +1434,8 @@ def order_with_lines(order, product_type, category, shipping_zone, warehouse):
     Allocation.objects.create(
         order_line=line, stock=stock, quantity_allocated=line.quantity
     )
+    stock.quantity_allocated = line.quantity
+    stock.save(update_fields=["quantity_allocated"])
 
     product = Product.objects.create(
         name="Test product 2",
@@ -1438,6 +1468,8 @@ def order_with_lines(order, product_type, category, shipping_zone, warehouse):
     Allocation.objects.create(
         order_line=line, stock=stock, quantity_allocated=line.quantity
     )
+    stock.quantity_allocated = line.quantity
+    stock.save(update_fields=["quantity_allocated"])
 
     order.shipping_address = order.billing_address.get_copy()
     method = shipping_zone.shipping_methods.first()
@@ -1554,6 +1586,7 @@ def fulfillment(fulfilled_order):
 
 @pytest.fixture
 def draft_order(order_with_lines):
+    deallocate_stock_for_order(order_with_lines)
     Allocation.objects.filter(order_line__order=order_with_lines).delete()
     order_with_lines.status = OrderStatus.DRAFT
     order_with_lines.save(update_fields=["status"])
@@ -2363,6 +2396,8 @@ def stock(variant, warehouse):
 
 @pytest.fixture
 def allocation(order_line, stock):
+    stock.quantity_allocated = order_line.quantity
+    stock.save(update_fields=["quantity_allocated"])
     return Allocation.objects.create(
         order_line=order_line, stock=stock, quantity_allocated=order_line.quantity
     )
@@ -2410,6 +2445,8 @@ def allocations(order_list, stock):
             ),
         ]
     )
+    stock.quantity_allocated = sum(line.quantity for line in lines)
+    stock.save(update_fields=["quantity_allocated"])
     return Allocation.objects.bulk_create(
         [
             Allocation(
@@ -41,6 +41,8 @@ MAX_CHECKOUT_LINE_QUANTITY = 50
 
 AUTH_PASSWORD_VALIDATORS = []
 
+CACHES = {"default": {"BACKEND": "saleor.tests.cache.SharedLocMemCache"}}
+
 PASSWORD_HASHERS = ["saleor.tests.dummy_password_hasher.DummyHasher"]
 PLUGINS_MANAGER = "saleor.plugins.manager.PluginsManager"
 
@@ -1,27 +1,34 @@
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, Iterable, NamedTuple, Set
 
 from django.conf import settings
-from django.db.models import Sum
+from django.db.models import F, Sum
 from django.db.models.functions import Coalesce
 
 from ..core.exceptions import InsufficientStock
+from ..product.models import ProductVariant
 from .models import Stock, StockQuerySet
 
 if TYPE_CHECKING:
-    from ..product.models import Product, ProductVariant
+    from ..product.models import Product
+
+
+class ProductStockAvailability(NamedTuple):
+    has_variants: bool
+    in_stock: bool
+    all_variants_in_stock: bool
 
 
 def _get_quantity_allocated(stocks: StockQuerySet) -> int:
-    return stocks.aggregate(
-        quantity_allocated=Coalesce(Sum("allocations__quantity_allocated"), 0)
-    )["quantity_allocated"]
+    return stocks.aggregate(quantity_allocated=Coalesce(Sum("quantity_allocated"), 0))[
+        "quantity_allocated"
+    ]
 
 
 def _get_available_quantity(stocks: StockQuerySet) -> int:
     results = stocks.aggregate(
-        total_quantity=Coalesce(Sum("quantity", distinct=True), 0),
-        quantity_allocated=Coalesce(Sum("allocations__quantity_allocated"), 0),
+        total_quantity=Coalesce(Sum("quantity"), 0),
+        quantity_allocated=Coalesce(Sum("quantity_allocated"), 0),
     )
     total_quantity = results["total_quantity"]
     quantity_allocated = results["quantity_allocated"]
@@ -119,3 +126,72 @@ def are_all_product_variants_in_stock(product: "Product", country_code: str) ->
 
     product_variants = product.variants.exclude(id__in=variants_with_stocks).exists()
     return are_all_available and not product_variants
+
+
+def get_products_stock_availability(
+    product_ids: Iterable[int], country_code: str
+) -> Dict[int, ProductStockAvailability]:
+    """Check stock availability of many products in given country at once.
+
+    Results match `is_product_in_stock` and `are_all_product_variants_in_stock`.
+    """
+    product_ids = list(product_ids)
+    variants_by_product: Dict[int, Set[int]] = defaultdict(set)
+    for product_id, variant_id in ProductVariant.objects.filter(
+        product_id__in=product_ids
+    ).values_list("product_id", "id"):
+        variants_by_product[product_id].add(variant_id)
+
+    stocks = (
+        Stock.objects.for_country(country_code)
+        .filter(product_variant__product_id__in=product_ids)
+        .annotate_available_quantity()
+        .values_list(
+            "product_variant__product_id", "product_variant_id", "available_quantity"
+        )
+    )
+    in_stock: Dict[int, bool] = defaultdict(bool)
+    all_stocks_available: Dict[int, bool] = defaultdict(lambda: True)
+    variants_with_stocks: Dict[int, Set[int]] = defaultdict(set)
+    for product_id, variant_id, available_quantity in stocks:
+        in_stock[product_id] |= bool(available_quantity)
+        all_stocks_available[product_id] &= bool(available_quantity)
+        variants_with_stocks[product_id].add(variant_id)
+
+    return {
+        product_id: ProductStockAvailability(
+            has_variants=bool(variants_by_product[product_id]),
+            in_stock=in_stock[product_id],
+            all_variants_in_stock=(
+                all_stocks_available[product_id]
+                and variants_by_product[product_id] <= variants_with_stocks[product_id]
+            ),
+        )
+        for product_id in product_ids
+    }
+
+
+def get_in_stock_variant_ids(
+    variants: Iterable["ProductVariant"], country_code: str
+) -> Set[int]:
+    """Return ids of given variants which are available in given country.
+
+    Results match `is_variant_in_stock` called for each of the variants.
+    """
+    in_stock_ids = set()
+    tracked_variant_ids = set()
+    for variant in variants:
+        if variant.track_inventory:
+            tracked_variant_ids.add(variant.pk)
+        else:
+            in_stock_ids.add(variant.pk)
+    if tracked_variant_ids:
+        in_stock_ids.update(
+            Stock.objects.for_country(country_code)
+            .filter(
+                product_variant_id__in=tracked_variant_ids,
+                quantity__gt=F("quantity_allocated"),
+            )
+            .values_list("product_variant_id", flat=True)
+        )
+    return in_stock_ids
@@ -1,9 +1,8 @@
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
 from django.db import transaction
-from django.db.models import F, Sum
-from django.db.models.functions import Coalesce
+from django.db.models import F
 
 from ..core.exceptions import AllocationError, InsufficientStock
 from .models import Allocation, Stock, Warehouse
@@ -18,56 +17,78 @@ def allocate_stock(
 ):
     """Allocate stocks for given `order_line` in given country.
 
-    Function lock for update all stocks and allocations for variant in
-    given country and order by pk. Next, generate the dictionary
-    ({"stock_pk": "quantity_allocated"}) with actual allocated quantity for stocks.
+    Function lock for update all stocks for variant in given country and order by pk.
     Iterate by stocks and allocate as many items as needed or available in stock
     for order line, until allocated all required quantity for the order line.
+    The allocated quantity is added to `Stock.quantity_allocated` of each used stock.
     If there is less quantity in stocks then rise InsufficientStock exception.
     """
-    stocks = (
-        Stock.objects.select_for_update(of=("self",))
-        .get_variant_stocks_for_country(country_code, order_line.variant)
-        .order_by("pk")
-    )
+    _allocate_stocks([(order_line, quantity)], country_code)
 
-    quantity_allocation_list = list(
-        Allocation.objects.filter(stock__in=stocks, quantity_allocated__gt=0,)
-        .values("stock")
-        .annotate(Sum("quantity_allocated"))
-    )
-    quantity_allocation_for_stocks: Dict = defaultdict(int)
-    for allocation in quantity_allocation_list:
-        quantity_allocation_for_stocks[allocation["stock"]] += allocation[
-            "quantity_allocated__sum"
-        ]
 
-    quantity_allocated = 0
-    allocations = []
+@transaction.atomic
+def allocate_stocks(order_lines: Iterable["OrderLine"], country_code: str):
+    """Allocate stocks for the whole quantity of given `order_lines` in given country.
+
+    Function lock for update all stocks of lines' variants in given country with
+    a single query, ordered by pk, and allocates the lines the same way as
+    `allocate_stock`. Allocations of all lines are created with one query.
+    If there is less quantity in stocks for any of the lines, rise InsufficientStock
+    exception and allocate nothing.
+    """
+    _allocate_stocks([(line, line.quantity) for line in order_lines], country_code)
 
-    for stock in stocks:
-        quantity_allocated_in_stock = quantity_allocation_for_stocks.get(stock.pk, 0)
 
-        quantity_available_in_stock = stock.quantity - quantity_allocated_in_stock
+def _allocate_stocks(quantities: List[Tuple["OrderLine", int]], country_code: str):
+    variant_ids = {order_line.variant_id for order_line, _ in quantities}
+    stocks = list(
+        Stock.objects.select_for_update(of=("self",))
+        .for_country(country_code)
+        .filter(product_variant_id__in=variant_ids)
+        .order_by("pk")
+    )
+    stocks_per_variant: Dict[int, List[Stock]] = defaultdict(list)
+    for stock in stocks:
+        stocks_per_variant[stock.product_variant_id].append(stock)
 
-        quantity_to_allocate = min(
-            (quantity - quantity_allocated), quantity_available_in_stock
-        )
-        if quantity_to_allocate > 0:
-            allocations.append(
-                Allocation(
-                    order_line=order_line,
-                    stock=stock,
-                    quantity_allocated=quantity_to_allocate,
-                )
-            )
+    allocations = []
+    quantity_to_allocate_per_stock: Dict[int, int] = defaultdict(int)
 
-            quantity_allocated += quantity_to_allocate
+    for order_line, quantity in quantities:
+        quantity_allocated = 0
+        for stock in stocks_per_variant[order_line.variant_id]:
             if quantity_allocated == quantity:
-                Allocation.objects.bulk_create(allocations)
                 break
-    if not quantity_allocated == quantity:
-        raise InsufficientStock(order_line.variant)
+            quantity_available_in_stock = (
+                stock.quantity
+                - stock.quantity_allocated
+                - quantity_to_allocate_per_stock[stock.pk]
+            )
+            quantity_to_allocate = min(
+                (quantity - quantity_allocated), quantity_available_in_stock
+            )
+            if quantity_to_allocate > 0:
+                allocations.append(
+                    Allocation(
+                        order_line=order_line,
+                        stock=stock,
+                        quantity_allocated=quantity_to_allocate,
+                    )
+                )
+                quantity_to_allocate_per_stock[stock.pk] += quantity_to_allocate
+                quantity_allocated += quantity_to_allocate
+        if not quantity_allocated == quantity:
+            raise InsufficientStock(order_line.variant)
+
+    allocated_stocks = []
+    for stock in stocks:
+        if quantity_to_allocate_per_stock[stock.pk]:
+            stock.quantity_allocated = (
+                F("quantity_allocated") + quantity_to_allocate_per_stock[stock.pk]
+            )
+            allocated_stocks.append(stock)
+    Allocation.objects.bulk_create(allocations)
+    Stock.objects.bulk_update(allocated_stocks, ["quantity_allocated"])
 
 
 @transaction.atomic
@@ -77,7 +98,8 @@ def deallocate_stock(order_line: "OrderLine", quantity: int):
     Function lock for update stocks and allocations related to given `order_line`.
     Iterate over allocations sorted by `stock.pk` and deallocate as many items
     as needed of available in stock for order line, until deallocated all required
-    quantity for the order line. If there is less quantity in stocks then
+    quantity for the order line. `Stock.quantity_allocated` of affected stocks is
+    decreased accordingly. If there is less quantity in stocks then
     raise an exception.
     """
     allocations = (
@@ -86,6 +108,7 @@ def deallocate_stock(order_line: "OrderLine", quantity: int):
         .order_by("stock__pk")
     )
     quantity_dealocated = 0
+    stocks = []
     for allocation in allocations:
         quantity_to_deallocate = min(
             (quantity - quantity_dealocated), allocation.quantity_allocated
@@ -94,9 +117,13 @@ def deallocate_stock(order_line: "OrderLine", quantity: int):
             allocation.quantity_allocated = (
                 F("quantity_allocated") - quantity_to_deallocate
             )
+            stock = allocation.stock
+            stock.quantity_allocated = F("quantity_allocated") - quantity_to_deallocate
+            stocks.append(stock)
             quantity_dealocated += quantity_to_deallocate
             if quantity_dealocated == quantity:
                 Allocation.objects.bulk_update(allocations, ["quantity_allocated"])
+                Stock.objects.bulk_update(stocks, ["quantity_allocated"])
                 break
     if not quantity_dealocated == quantity:
         raise AllocationError(order_line, quantity)
@@ -139,6 +166,8 @@ def increase_stock(
             Allocation.objects.create(
                 order_line=order_line, stock=stock, quantity_allocated=quantity
             )
+        stock.quantity_allocated = F("quantity_allocated") + quantity
+        stock.save(update_fields=["quantity_allocated"])
 
 
 @transaction.atomic
@@ -154,23 +183,17 @@ def decrease_stock(order_line: "OrderLine", quantity: int, warehouse_pk: str):
     try:
         deallocate_stock(order_line, quantity)
     except AllocationError:
-        order_line.allocations.update(quantity_allocated=0)
+        _deallocate_all(order_line.allocations.all())
 
     try:
-        stock = (
-            order_line.variant.stocks.select_for_update()  # type: ignore
-            .prefetch_related("allocations")
-            .get(warehouse__pk=warehouse_pk)
+        stock = order_line.variant.stocks.select_for_update().get(  # type: ignore
+            warehouse__pk=warehouse_pk
         )
     except Stock.DoesNotExist:
         error_context = {"order_line": order_line, "warehouse_pk": warehouse_pk}
         raise InsufficientStock(order_line.variant, error_context)
 
-    quantity_allocated = stock.allocations.aggregate(
-        quantity_allocated=Coalesce(Sum("quantity_allocated"), 0)
-    )["quantity_allocated"]
-
-    if stock.quantity - quantity_allocated < quantity:
+    if stock.quantity - stock.quantity_allocated < quantity:
         error_context = {"order_line": order_line, "warehouse_pk": warehouse_pk}
         raise InsufficientStock(order_line.variant, error_context)
 
@@ -181,7 +204,27 @@ def decrease_stock(order_line: "OrderLine", quantity: int, warehouse_pk: str):
 @transaction.atomic
 def deallocate_stock_for_order(order: "Order"):
     """Remove all allocations for given order."""
-    allocations = Allocation.objects.filter(
-        order_line__order=order, quantity_allocated__gt=0
-    ).select_for_update(of=("self",))
-    allocations.update(quantity_allocated=0)
+    allocations = Allocation.objects.filter(order_line__order=order)
+    _deallocate_all(allocations)
+
+
+def _deallocate_all(allocations):
+    """Zero given allocations and release their quantity from related stocks."""
+    allocations = list(
+        allocations.filter(quantity_allocated__gt=0)
+        .select_related("stock")
+        .select_for_update(of=("self", "stock"))
+        .order_by("stock__pk")
+    )
+    quantity_to_release: Dict[int, int] = defaultdict(int)
+    stocks = {}
+    for allocation in allocations:
+        quantity_to_release[allocation.stock_id] += allocation.quantity_allocated
+        stocks[allocation.stock_id] = allocation.stock
+        allocation.quantity_allocated = 0
+    for stock_pk, stock in stocks.items():
+        stock.quantity_allocated = (
+            F("quantity_allocated") - quantity_to_release[stock_pk]
+        )
+    Stock.objects.bulk_update(stocks.values(), ["quantity_allocated"])
+    Allocation.objects.bulk_update(allocations, ["quantity_allocated"])
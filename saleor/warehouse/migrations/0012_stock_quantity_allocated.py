@@ -0,0 +1,35 @@
+# Generated by Django 3.1 on 2020-08-20 10:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_stock_quantity_allocated(apps, schema_editor):
+    Allocation = apps.get_model("warehouse", "Allocation")
+    Stock = apps.get_model("warehouse", "Stock")
+    allocated = (
+        Allocation.objects.filter(stock=OuterRef("pk"))
+        .values("stock")
+        .annotate(total=Sum("quantity_allocated"))
+        .values("total")
+    )
+    Stock.objects.update(quantity_allocated=Coalesce(Subquery(allocated), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0011_auto_20200714_0539"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stock",
+            name="quantity_allocated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            populate_stock_quantity_allocated, migrations.RunPython.noop
+        ),
+    ]
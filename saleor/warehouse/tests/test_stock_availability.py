@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 import pytest
 from django.test import override_settings
 
@@ -7,7 +9,9 @@ from ..availability import (
     check_stock_quantity,
     get_available_quantity,
     get_available_quantity_for_customer,
+    get_products_stock_availability,
     get_quantity_allocated,
+    is_product_in_stock,
 )
 from ..models import Allocation, Stock
 
@@ -170,6 +174,8 @@ def test_are_all_product_variants_in_stock_all_in_stock(stock):
 def test_are_all_product_variants_in_stock_stock_empty(allocation, variant):
     allocation.quantity_allocated = allocation.stock.quantity
     allocation.save(update_fields=["quantity_allocated"])
+    allocation.stock.quantity_allocated = allocation.stock.quantity
+    allocation.stock.save(update_fields=["quantity_allocated"])
 
     assert not are_all_product_variants_in_stock(variant.product, COUNTRY_CODE)
 
@@ -185,3 +191,34 @@ def test_are_all_product_variants_in_stock_warehouse_without_stock(
     assert are_all_product_variants_in_stock(
         variant_with_many_stocks.product, COUNTRY_CODE
     )
+
+
+def test_get_products_stock_availability(product_list, product_without_shipping):
+    in_stock_product, out_of_stock_product, partially_in_stock_product = product_list
+    Stock.objects.filter(product_variant__product=out_of_stock_product).update(
+        quantity=0
+    )
+    partially_in_stock_product.variants.create(
+        sku="variant-without-stock", price_amount=Decimal(10)
+    )
+    product_without_variants = product_without_shipping
+    product_without_variants.variants.all().delete()
+    products = product_list + [product_without_variants]
+
+    availability = get_products_stock_availability(
+        [product.pk for product in products], COUNTRY_CODE
+    )
+
+    for product in products:
+        product_availability = availability[product.pk]
+        assert product_availability.in_stock == is_product_in_stock(
+            product, COUNTRY_CODE
+        )
+        assert product_availability.all_variants_in_stock == (
+            are_all_product_variants_in_stock(product, COUNTRY_CODE)
+        )
+    assert availability[in_stock_product.pk].all_variants_in_stock
+    assert not availability[out_of_stock_product.pk].in_stock
+    assert availability[partially_in_stock_product.pk].in_stock
+    assert not availability[partially_in_stock_product.pk].all_variants_in_stock
+    assert not availability[product_without_variants.pk].has_variants
@@ -5,12 +5,13 @@ from django.db.models.functions import Coalesce
 from ...core.exceptions import InsufficientStock
 from ..management import (
     allocate_stock,
+    allocate_stocks,
     deallocate_stock,
     deallocate_stock_for_order,
     decrease_stock,
     increase_stock,
 )
-from ..models import Allocation
+from ..models import Allocation, Stock
 
 COUNTRY_CODE = "US"
 
@@ -23,6 +24,7 @@ def test_allocate_stock(order_line, stock):
 
     stock.refresh_from_db()
     assert stock.quantity == 100
+    assert stock.quantity_allocated == 50
     allocation = Allocation.objects.get(order_line=order_line, stock=stock)
     assert allocation.quantity_allocated == 50
 
@@ -81,10 +83,60 @@ def test_allocate_stock_insufficient_stocks(order_line, variant_with_many_stocks
     ).exists()
 
 
+def test_allocate_stocks(order_line, variant_with_many_stocks):
+    second_line = order_line.order.lines.create(
+        product_name=order_line.product_name,
+        product_sku=order_line.product_sku,
+        is_shipping_required=order_line.is_shipping_required,
+        quantity=3,
+        variant=variant_with_many_stocks,
+        unit_price=order_line.unit_price,
+    )
+    stocks = variant_with_many_stocks.stocks.order_by("pk")
+
+    allocate_stocks([order_line, second_line], COUNTRY_CODE)
+
+    allocations = Allocation.objects.filter(order_line=order_line)
+    assert [a.quantity_allocated for a in allocations] == [3]
+    allocations = Allocation.objects.filter(order_line=second_line).order_by("pk")
+    assert [a.quantity_allocated for a in allocations] == [1, 2]
+    assert [stock.quantity_allocated for stock in stocks] == [4, 2]
+
+
+def test_allocate_stocks_insufficient_stocks(order_line, variant_with_many_stocks):
+    second_line = order_line.order.lines.create(
+        product_name=order_line.product_name,
+        product_sku=order_line.product_sku,
+        is_shipping_required=order_line.is_shipping_required,
+        quantity=5,
+        variant=variant_with_many_stocks,
+        unit_price=order_line.unit_price,
+    )
+
+    with pytest.raises(InsufficientStock):
+        allocate_stocks([order_line, second_line], COUNTRY_CODE)
+
+    assert not Allocation.objects.exists()
+    assert not variant_with_many_stocks.stocks.filter(quantity_allocated__gt=0).exists()
+
+
+def test_allocate_stocks_number_of_queries(order_with_lines, django_assert_num_queries):
+    lines = list(order_with_lines.lines.all())
+    Allocation.objects.filter(order_line__in=lines).delete()
+    Stock.objects.update(quantity_allocated=0)
+
+    with django_assert_num_queries(5):
+        allocate_stocks(lines, COUNTRY_CODE)
+
+    for line in lines:
+        assert line.allocations.get().quantity_allocated == line.quantity
+
+
 def test_deallocate_stock(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
 
@@ -92,6 +144,7 @@ def test_deallocate_stock(allocation):
 
     stock.refresh_from_db()
     assert stock.quantity == 100
+    assert stock.quantity_allocated == 0
     allocation.refresh_from_db()
     assert allocation.quantity_allocated == 0
 
@@ -99,7 +152,8 @@ def test_deallocate_stock(allocation):
 def test_deallocate_stock_partially(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
 
@@ -107,6 +161,7 @@ def test_deallocate_stock_partially(allocation):
 
     stock.refresh_from_db()
     assert stock.quantity == 100
+    assert stock.quantity_allocated == 30
     allocation.refresh_from_db()
     assert allocation.quantity_allocated == 30
 
@@ -136,7 +191,8 @@ def test_deallocate_stock_many_allocations_partially(
 def test_increase_stock_without_allocate(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
 
@@ -151,7 +207,8 @@ def test_increase_stock_without_allocate(allocation):
 def test_increase_stock_with_allocate(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
 
@@ -159,6 +216,7 @@ def test_increase_stock_with_allocate(allocation):
 
     stock.refresh_from_db()
     assert stock.quantity == 150
+    assert stock.quantity_allocated == 130
     allocation.refresh_from_db()
     assert allocation.quantity_allocated == 130
 
@@ -179,7 +237,8 @@ def test_increase_stock_with_new_allocation(order_line, stock):
 def test_decrease_stock(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
     warehouse_pk = allocation.stock.warehouse.pk
@@ -188,6 +247,7 @@ def test_decrease_stock(allocation):
 
     stock.refresh_from_db()
     assert stock.quantity == 50
+    assert stock.quantity_allocated == 30
     allocation.refresh_from_db()
     assert allocation.quantity_allocated == 30
 
@@ -195,7 +255,8 @@ def test_decrease_stock(allocation):
 def test_decrease_stock_partially(allocation):
     stock = allocation.stock
     stock.quantity = 100
-    stock.save(update_fields=["quantity"])
+    stock.quantity_allocated = 80
+    stock.save(update_fields=["quantity", "quantity_allocated"])
     allocation.quantity_allocated = 80
     allocation.save(update_fields=["quantity_allocated"])
     warehouse_pk = allocation.stock.warehouse.pk
@@ -251,6 +312,8 @@ def test_decrease_stock_more_then_allocated(order_line_with_allocation_in_many_s
     assert allocations[1].quantity_allocated == 0
     assert allocations[0].stock.quantity == 0
     assert allocations[1].stock.quantity == 3
+    assert allocations[0].stock.quantity_allocated == 0
+    assert allocations[1].stock.quantity_allocated == 0
 
 
 def test_deallocate_stock_for_order(order_line_with_allocation_in_many_stocks,):
@@ -262,3 +325,5 @@ def test_deallocate_stock_for_order(order_line_with_allocation_in_many_stocks,):
     allocations = order_line.allocations.all()
     assert allocations[0].quantity_allocated == 0
     assert allocations[1].quantity_allocated == 0
+    assert allocations[0].stock.quantity_allocated == 0
+    assert allocations[1].stock.quantity_allocated == 0
@@ -0,0 +1,8 @@
+class WebhookDeliveryStatus:
+    SUCCESS = "success"  # payload accepted by the target
+    FAILED = "failed"  # payload not accepted by the target
+
+    CHOICES = [
+        (SUCCESS, "Success"),
+        (FAILED, "Failed"),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.1.2 on 2026-10-17 10:08
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("webhook", "0006_auto_20200731_1440"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="webhook",
+            name="batch_size",
+            field=models.PositiveIntegerField(
+                blank=True,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+        migrations.AddField(
+            model_name="webhook",
+            name="batch_window",
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.CreateModel(
+            name="BufferedWebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_type", models.CharField(max_length=128)),
+                ("data", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "webhook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buffered_events",
+                        to="webhook.webhook",
+                    ),
+                ),
+            ],
+            options={"ordering": ("pk",)},
+        ),
+    ]
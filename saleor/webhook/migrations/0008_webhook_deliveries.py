@@ -0,0 +1,86 @@
+# Generated by Django 3.1.2 on 2026-10-17 10:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("webhook", "0007_webhook_batches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="webhook",
+            name="activated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="WebhookDeliveryAttempt",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("event_type", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("success", "Success"), ("failed", "Failed")],
+                        max_length=32,
+                    ),
+                ),
+                ("attempt", models.PositiveSmallIntegerField()),
+                ("duration", models.FloatField()),
+                (
+                    "response_status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("error", models.CharField(blank=True, max_length=255)),
+                (
+                    "webhook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="delivery_attempts",
+                        to="webhook.webhook",
+                    ),
+                ),
+            ],
+            options={"ordering": ("-pk",)},
+        ),
+        migrations.CreateModel(
+            name="WebhookDeadLetter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("event_type", models.TextField()),
+                ("data", models.TextField()),
+                ("batch_size", models.PositiveIntegerField(blank=True, null=True)),
+                ("error", models.CharField(blank=True, max_length=255)),
+                (
+                    "webhook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dead_letters",
+                        to="webhook.webhook",
+                    ),
+                ),
+            ],
+            options={"ordering": ("pk",)},
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.core import validators
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 
 from ..app.models import App
+from ..core.cache import invalidate_now_and_on_commit
+from . import WebhookDeliveryStatus
 
 
 class WebhookURLField(models.URLField):
@@ -15,7 +19,16 @@ class Webhook(models.Model):
     app = models.ForeignKey(App, related_name="webhooks", on_delete=models.CASCADE)
     target_url = WebhookURLField(max_length=255)
     is_active = models.BooleanField(default=True)
+    # Delivery attempts made before the webhook was activated again do not count
+    # towards its deactivation
+    activated_at = models.DateTimeField(null=True, blank=True)
     secret_key = models.CharField(max_length=255, null=True, blank=True)
+    # Events are delivered one by one, unless the batch size is set
+    batch_size = models.PositiveIntegerField(
+        null=True, blank=True, validators=[validators.MinValueValidator(1)]
+    )
+    # Number of seconds events are buffered for before a batch is delivered
+    batch_window = models.PositiveIntegerField(default=5)
 
 
 class WebhookEvent(models.Model):
@@ -26,3 +39,60 @@ class WebhookEvent(models.Model):
 
     def __repr__(self):
         return self.event_type
+
+
+class BufferedWebhookEvent(models.Model):
+    webhook = models.ForeignKey(
+        Webhook, related_name="buffered_events", on_delete=models.CASCADE
+    )
+    event_type = models.CharField(max_length=128)
+    data = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("pk",)
+
+
+class WebhookDeliveryAttempt(models.Model):
+    webhook = models.ForeignKey(
+        Webhook, related_name="delivery_attempts", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Comma-separated event types of a batch are longer than the event type names
+    event_type = models.TextField()
+    status = models.CharField(max_length=32, choices=WebhookDeliveryStatus.CHOICES)
+    # Number of the attempt of delivering the event, starting from 1
+    attempt = models.PositiveSmallIntegerField()
+    # Time of the delivery in seconds
+    duration = models.FloatField()
+    response_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ("-pk",)
+
+
+class WebhookDeadLetter(models.Model):
+    webhook = models.ForeignKey(
+        Webhook, related_name="dead_letters", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Comma-separated event types of a batch are longer than the event type names
+    event_type = models.TextField()
+    data = models.TextField()
+    # Number of events of the batch, if the payload is a batch of events
+    batch_size = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ("pk",)
+
+
+@receiver([post_save, post_delete], sender=Webhook)
+@receiver([post_save, post_delete], sender=WebhookEvent)
+@receiver([post_save, post_delete], sender=App)
+@receiver(m2m_changed, sender=App.permissions.through)
+def handle_webhook_subscription_change(**_kwargs):
+    from .utils import invalidate_webhooks
+
+    invalidate_now_and_on_commit(invalidate_webhooks)
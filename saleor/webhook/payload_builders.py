@@ -0,0 +1,87 @@
+import json
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+import graphene
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field, Model, QuerySet
+from django.utils.encoding import is_protected_type
+
+# Payloads are built as plain dicts, with the same keys and values as the ones
+# produced by `PayloadSerializer`, and dumped to JSON once
+
+
+@lru_cache(maxsize=None)
+def get_payload_fields(
+    model: Type[Model], field_names: Tuple[str, ...]
+) -> Tuple[Field, ...]:
+    """Return fields of the model serialized the same way as by Django serializers."""
+    return tuple(
+        field
+        for field in model._meta.concrete_model._meta.local_fields
+        if field.serialize
+        and (field.attname if field.remote_field is None else field.attname[:-3])
+        in field_names
+    )
+
+
+def _serialize_value(field: Field, value: Any) -> Any:
+    if is_protected_type(value):
+        return value
+    return field.value_to_string(SimpleNamespace(**{field.attname: value}))
+
+
+def serialize_instance_fields(instance: Model, fields: Iterable[str]) -> Dict[str, Any]:
+    data = {}
+    for field in get_payload_fields(type(instance), tuple(fields)):
+        value = field.value_from_object(instance)
+        data[field.name] = (
+            value if is_protected_type(value) else field.value_to_string(instance)
+        )
+    return data
+
+
+def build_instance_payload(
+    instance: Optional[Model], fields: Iterable[str]
+) -> Optional[Dict[str, Any]]:
+    """Return the payload of the instance, or None if there is no instance."""
+    if not instance:
+        return None
+    type_name = instance._meta.object_name
+    data = {
+        "type": type_name,
+        "id": graphene.Node.to_global_id(type_name, instance.id),
+    }
+    data.update(serialize_instance_fields(instance, fields))
+    return data
+
+
+def build_queryset_payloads(
+    queryset: QuerySet,
+    fields: Iterable[str],
+    extra_data: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Return payloads of the objects of the queryset fetched with a single query.
+
+    The `extra_data` callable receives the fetched values of an object and returns
+    data added to its payload before the fields.
+    """
+    type_name = queryset.model._meta.object_name
+    model_fields = get_payload_fields(queryset.model, tuple(fields))
+    payloads = []
+    for row in queryset.values("id", *[field.attname for field in model_fields]):
+        data = {
+            "type": type_name,
+            "id": graphene.Node.to_global_id(type_name, row["id"]),
+        }
+        if extra_data:
+            data.update(extra_data(row))
+        for field in model_fields:
+            data[field.name] = _serialize_value(field, row[field.attname])
+        payloads.append(data)
+    return payloads
+
+
+def dump_payloads(payloads: List[Dict[str, Any]]) -> str:
+    return json.dumps(payloads, cls=DjangoJSONEncoder, ensure_ascii=False)
@@ -1,6 +1,7 @@
 import json
-from typing import Iterable, Optional
+from typing import Optional
 
+import graphene
 from django.db.models import QuerySet
 
 from ..account.models import User
@@ -12,12 +13,18 @@ from ..core.utils.anonymization import (
 )
 from ..invoice.models import Invoice
 from ..order import FulfillmentStatus, OrderStatus
-from ..order.models import Fulfillment, FulfillmentLine, Order, OrderLine
+from ..order.models import Fulfillment, FulfillmentLine, Order
 from ..order.utils import get_order_country
 from ..payment import ChargeStatus
 from ..product.models import Product
 from ..warehouse.models import Warehouse
 from .event_types import WebhookEventType
+from .payload_builders import (
+    build_instance_payload,
+    build_queryset_payloads,
+    dump_payloads,
+    serialize_instance_fields,
+)
 from .payload_serializers import PayloadSerializer
 from .serializers import serialize_checkout_lines
 
@@ -54,73 +61,85 @@ ORDER_FIELDS = (
     "metadata",
 )
 
+ORDER_LINE_FIELDS = (
+    "product_name",
+    "variant_name",
+    "translated_product_name",
+    "translated_variant_name",
+    "product_sku",
+    "quantity",
+    "currency",
+    "unit_price_net_amount",
+    "unit_price_gross_amount",
+    "tax_rate",
+)
 
-def generate_order_lines_payload(lines: Iterable[OrderLine]):
-    line_fields = (
-        "product_name",
-        "variant_name",
-        "translated_product_name",
-        "translated_variant_name",
-        "product_sku",
-        "quantity",
-        "currency",
-        "unit_price_net_amount",
-        "unit_price_gross_amount",
-        "tax_rate",
-    )
-    serializer = PayloadSerializer()
-    return serializer.serialize(
-        lines,
-        fields=line_fields,
-        extra_dict_data={
-            "total_price_net_amount": (lambda l: l.get_total().net.amount),
-            "total_price_gross_amount": (lambda l: l.get_total().gross.amount),
-        },
-    )
+ORDER_FULFILLMENT_FIELDS = ("status", "tracking_number", "created")
 
+ORDER_PAYMENT_FIELDS = (
+    "gateway",
+    "payment_method_type",
+    "cc_brand",
+    "is_active",
+    "created",
+    "modified",
+    "charge_status",
+    "total",
+    "captured_amount",
+    "currency",
+    "billing_email",
+    "billing_first_name",
+    "billing_last_name",
+    "billing_company_name",
+    "billing_address_1",
+    "billing_address_2",
+    "billing_city",
+    "billing_city_area",
+    "billing_postal_code",
+    "billing_country_code",
+    "billing_country_area",
+)
 
-def generate_order_payload(order: "Order"):
-    serializer = PayloadSerializer()
-    fulfillment_fields = ("status", "tracking_number", "created")
-    payment_fields = (
-        "gateway",
-        "payment_method_type",
-        "cc_brand",
-        "is_active",
-        "created",
-        "modified",
-        "charge_status",
-        "total",
-        "captured_amount",
-        "currency",
-        "billing_email",
-        "billing_first_name",
-        "billing_last_name",
-        "billing_company_name",
-        "billing_address_1",
-        "billing_address_2",
-        "billing_city",
-        "billing_city_area",
-        "billing_postal_code",
-        "billing_country_code",
-        "billing_country_area",
-    )
+SHIPPING_METHOD_FIELDS = ("name", "type", "currency", "price_amount")
 
-    shipping_method_fields = ("name", "type", "currency", "price_amount")
-    lines = order.lines.all()
-    order_data = serializer.serialize(
-        [order],
-        fields=ORDER_FIELDS,
-        additional_fields={
-            "shipping_method": (lambda o: o.shipping_method, shipping_method_fields),
-            "payments": (lambda o: o.payments.all(), payment_fields),
-            "shipping_address": (lambda o: o.shipping_address, ADDRESS_FIELDS),
-            "billing_address": (lambda o: o.billing_address, ADDRESS_FIELDS),
-            "fulfillments": (lambda o: o.fulfillments.all(), fulfillment_fields),
-        },
-        extra_dict_data={"lines": json.loads(generate_order_lines_payload(lines))},
-    )
-    return order_data
+
+def _get_order_line_totals(line: dict) -> dict:
+    quantity = line["quantity"]
+    return {
+        "total_price_net_amount": line["unit_price_net_amount"] * quantity,
+        "total_price_gross_amount": line["unit_price_gross_amount"] * quantity,
+    }
+
+
+def build_order_payload(order: "Order") -> dict:
+    data = {
+        "type": "Order",
+        "id": graphene.Node.to_global_id("Order", order.id),
+        "shipping_method": build_instance_payload(
+            order.shipping_method, SHIPPING_METHOD_FIELDS
+        ),
+        "payments": build_queryset_payloads(order.payments.all(), ORDER_PAYMENT_FIELDS)
+        or None,
+        "shipping_address": build_instance_payload(
+            order.shipping_address, ADDRESS_FIELDS
+        ),
+        "billing_address": build_instance_payload(
+            order.billing_address, ADDRESS_FIELDS
+        ),
+        "fulfillments": build_queryset_payloads(
+            order.fulfillments.all(), ORDER_FULFILLMENT_FIELDS
+        )
+        or None,
+        "lines": build_queryset_payloads(
+            order.lines.all(), ORDER_LINE_FIELDS, extra_data=_get_order_line_totals
+        ),
+    }
+    data.update(serialize_instance_fields(order, ORDER_FIELDS))
+    return data
+
+
+def generate_order_payload(order: "Order"):
+    return dump_payloads([build_order_payload(order)])
 
 
 def generate_invoice_payload(invoice: "Invoice"):
@@ -279,7 +298,7 @@ def generate_fulfillment_payload(fulfillment: Fulfillment):
             "warehouse_address": (lambda f: warehouse.address, ADDRESS_FIELDS),
         },
         extra_dict_data={
-            "order": json.loads(generate_order_payload(fulfillment.order))[0],
+            "order": build_order_payload(fulfillment.order),
             "lines": json.loads(generate_fulfillment_lines_payload(fulfillment)),
         },
     )
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ....core.utils.anonymization import anonymize_order
+from ....order.models import Order, OrderLine
+from ...payload_serializers import PayloadSerializer
+from ...payloads import (
+    ADDRESS_FIELDS,
+    ORDER_FIELDS,
+    ORDER_FULFILLMENT_FIELDS,
+    ORDER_LINE_FIELDS,
+    ORDER_PAYMENT_FIELDS,
+    SHIPPING_METHOD_FIELDS,
+    generate_order_payload,
+)
+
+LINES_COUNT = 200
+
+
+def _generate_order_payload_with_serializer(order):
+    """Generate the payload the way it was done before the payload builders."""
+    lines_data = PayloadSerializer().serialize(
+        order.lines.all(),
+        fields=ORDER_LINE_FIELDS,
+        extra_dict_data={
+            "total_price_net_amount": (lambda line: line.get_total().net.amount),
+            "total_price_gross_amount": (lambda line: line.get_total().gross.amount),
+        },
+    )
+    return PayloadSerializer().serialize(
+        [order],
+        fields=ORDER_FIELDS,
+        additional_fields={
+            "shipping_method": (lambda o: o.shipping_method, SHIPPING_METHOD_FIELDS),
+            "payments": (lambda o: o.payments.all(), ORDER_PAYMENT_FIELDS),
+            "shipping_address": (lambda o: o.shipping_address, ADDRESS_FIELDS),
+            "billing_address": (lambda o: o.billing_address, ADDRESS_FIELDS),
+            "fulfillments": (lambda o: o.fulfillments.all(), ORDER_FULFILLMENT_FIELDS),
+        },
+        extra_dict_data={"lines": json.loads(lines_data)},
+    )
+
+
+def _measure(generate_payload, order):
+    # Fetch the order again, so that no related object is cached on it
+    order = Order.objects.get(pk=order.pk)
+    with CaptureQueriesContext(connection) as queries:
+        payload = generate_payload(order)
+    return payload, len(queries)
+
+
+@pytest.fixture
+def order_with_many_lines(fulfilled_order, payment_txn_captured):
+    order = fulfilled_order
+    line = order.lines.first()
+    OrderLine.objects.bulk_create(
+        [
+            OrderLine(
+                order=order,
+                variant=line.variant,
+                product_name=f"{line.product_name} {i}",
+                variant_name=line.variant_name,
+                product_sku=f"{line.product_sku}-{i}",
+                quantity=i % 5 + 1,
+                currency=line.currency,
+                unit_price_net_amount=line.unit_price_net_amount + i,
+                unit_price_gross_amount=line.unit_price_gross_amount + i,
+                tax_rate=line.tax_rate,
+                is_shipping_required=line.is_shipping_required,
+            )
+            for i in range(LINES_COUNT - order.lines.count())
+        ]
+    )
+    order.metadata = {"key": "value"}
+    order.save(update_fields=["metadata"])
+    order.refresh_from_db()
+    return order
+
+
+def test_order_payload_queries(order_with_many_lines):
+    order = order_with_many_lines
+
+    old_payload, old_queries = _measure(_generate_order_payload_with_serializer, order)
+    new_payload, new_queries = _measure(generate_order_payload, order)
+
+    assert new_payload == old_payload
+    assert new_queries <= old_queries
+
+
+def test_order_payload_without_payments_and_fulfillments(order_with_lines):
+    order_with_lines.refresh_from_db()
+    assert generate_order_payload(
+        order_with_lines
+    ) == _generate_order_payload_with_serializer(order_with_lines)
+
+
+def test_anonymized_order_payload(order_with_many_lines):
+    anonymized_order = anonymize_order(order_with_many_lines)
+    assert generate_order_payload(
+        anonymized_order
+    ) == _generate_order_payload_with_serializer(anonymized_order)
@@ -0,0 +1,72 @@
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from django.core.cache import cache
+
+from ..app.models import App
+from ..core.cache import bump_cache_version, get_cache_version, is_cache_shared
+from .event_types import WebhookEventType
+from .models import Webhook, WebhookEvent
+
+WEBHOOKS_VERSION_CACHE_KEY = "webhooks_version"
+WEBHOOKS_CACHE_KEY = "webhooks:{}"
+WEBHOOKS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _fetch_subscriptions() -> Dict[str, List[int]]:
+    """Return pks of active webhooks subscribed to each of the event types.
+
+    A webhook is subscribed when it listens to the event or to any events and
+    its app has the permission required by the event.
+    """
+    webhooks = list(
+        Webhook.objects.filter(is_active=True, app__is_active=True)
+        .order_by("pk")
+        .values_list("pk", "app_id")
+    )
+    webhook_events: Dict[int, Set[str]] = defaultdict(set)
+    events = WebhookEvent.objects.filter(
+        webhook_id__in=[pk for pk, _ in webhooks]
+    ).values_list("webhook_id", "event_type")
+    for webhook_pk, event_type in events:
+        webhook_events[webhook_pk].add(event_type)
+    app_permissions: Dict[int, Set[str]] = defaultdict(set)
+    permissions = App.permissions.through.objects.filter(
+        app_id__in={app_pk for _, app_pk in webhooks}
+    ).values_list(
+        "app_id", "permission__content_type__app_label", "permission__codename"
+    )
+    for app_pk, app_label, codename in permissions:
+        app_permissions[app_pk].add(f"{app_label}.{codename}")
+
+    subscriptions = {}
+    for event_type, permission in WebhookEventType.PERMISSIONS.items():
+        subscriptions[event_type] = [
+            webhook_pk
+            for webhook_pk, app_pk in webhooks
+            if webhook_events[webhook_pk] & {event_type, WebhookEventType.ANY}
+            and (not permission or permission.value in app_permissions[app_pk])
+        ]
+    return subscriptions
+
+
+def get_webhooks_for_event(event_type: str) -> List[int]:
+    """Return pks of active webhooks subscribed to the event type.
+
+    Subscriptions of all events are shared between workers through the cache
+    until a webhook, its events or its app change. Without a cache shared by all
+    processes they are fetched on every call.
+    """
+    if not is_cache_shared():
+        return _fetch_subscriptions().get(event_type, [])
+    cache_key = WEBHOOKS_CACHE_KEY.format(get_cache_version(WEBHOOKS_VERSION_CACHE_KEY))
+    subscriptions = cache.get(cache_key)
+    if subscriptions is None:
+        subscriptions = _fetch_subscriptions()
+        cache.set(cache_key, subscriptions, timeout=WEBHOOKS_CACHE_TIMEOUT)
+    return subscriptions.get(event_type, [])
+
+
+def invalidate_webhooks():
+    """Make every worker fetch webhook subscriptions from the database again."""
+    bump_cache_version(WEBHOOKS_VERSION_CACHE_KEY)